@@ -0,0 +1,39 @@
+"""add generation_runs ledger
+
+Revision ID: 5b8e2c4d7a91
+Revises: 1d1fc9e113b1
+Create Date: 2026-10-19 09:12:41.502113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5b8e2c4d7a91'
+down_revision = '1d1fc9e113b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('generation_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('model', sa.String(length=64), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+    sa.Column('completion_tokens', sa.Integer(), nullable=True),
+    sa.Column('latency_ms', sa.Float(), nullable=False),
+    sa.Column('outcome', sa.String(length=32), nullable=False),
+    sa.Column('game_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('generation_runs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_generation_runs_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('generation_runs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_generation_runs_created_at'))
+
+    op.drop_table('generation_runs')
@@ -0,0 +1,43 @@
+"""add score indexes for leaderboard and per-game queries
+
+Revision ID: 8f3a61c2d9e4
+Revises: 5b8e2c4d7a91
+Create Date: 2026-10-19 11:03:27.918244
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8f3a61c2d9e4'
+down_revision = '5b8e2c4d7a91'
+branch_labels = None
+depends_on = None
+
+
+def _concurrently():
+    # build without blocking score inserts on a live Postgres table
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade():
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_scores_player_score', 'scores',
+            ['player_id', sa.text('score DESC'), 'played_at'],
+            postgresql_include=['game_id'],
+            postgresql_concurrently=concurrently,
+        )
+        op.create_index(
+            'ix_scores_game_score', 'scores',
+            ['game_id', sa.text('score DESC')],
+            postgresql_concurrently=concurrently,
+        )
+
+
+def downgrade():
+    concurrently = _concurrently()
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_scores_game_score', table_name='scores', postgresql_concurrently=concurrently)
+        op.drop_index('ix_scores_player_score', table_name='scores', postgresql_concurrently=concurrently)
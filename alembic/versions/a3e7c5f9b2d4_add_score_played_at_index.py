@@ -0,0 +1,33 @@
+"""add scores played_at index for compaction batches
+
+Revision ID: a3e7c5f9b2d4
+Revises: f6b2d9a4c1e8
+Create Date: 2026-10-19 22:05:47.183526
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a3e7c5f9b2d4'
+down_revision = 'f6b2d9a4c1e8'
+branch_labels = None
+depends_on = None
+
+
+def _concurrently():
+    # build without blocking score inserts on a live Postgres table
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_scores_played_at', 'scores', ['played_at', 'id'],
+            postgresql_concurrently=_concurrently(),
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_scores_played_at', table_name='scores', postgresql_concurrently=_concurrently())
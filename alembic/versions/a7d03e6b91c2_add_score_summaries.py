@@ -0,0 +1,46 @@
+"""add score_summaries for compacted raw scores
+
+Revision ID: a7d03e6b91c2
+Revises: e2b95f07c3a8
+Create Date: 2026-10-19 17:05:44.218330
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7d03e6b91c2'
+down_revision = 'e2b95f07c3a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'score_summaries',
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('total_score', sa.BigInteger(), nullable=False),
+        sa.Column('best', sa.Integer(), nullable=False),
+        sa.Column('best_played_at', sa.DateTime(), nullable=False),
+        sa.Column('best_score_id', sa.Integer(), nullable=False),
+        sa.Column('last_played_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['game_id'], ['games.id'], ),
+        sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+        sa.PrimaryKeyConstraint('player_id', 'game_id')
+    )
+    op.create_index(
+        'ix_score_summaries_player_best', 'score_summaries',
+        ['player_id', sa.text('best DESC'), 'best_played_at', 'best_score_id'],
+    )
+    op.create_index(
+        'ix_score_summaries_game_best', 'score_summaries',
+        ['game_id', sa.text('best DESC')],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_score_summaries_game_best', table_name='score_summaries')
+    op.drop_index('ix_score_summaries_player_best', table_name='score_summaries')
+    op.drop_table('score_summaries')
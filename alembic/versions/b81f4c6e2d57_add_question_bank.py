@@ -0,0 +1,172 @@
+"""add question bank (questions, game_questions) and move game payloads into it
+
+Revision ID: b81f4c6e2d57
+Revises: a7d03e6b91c2
+Create Date: 2026-10-19 18:31:09.550128
+
+"""
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+
+# revision identifiers, used by Alembic.
+revision = 'b81f4c6e2d57'
+down_revision = 'a7d03e6b91c2'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+
+def _tables(dialect_name):
+    json_type = postgresql.JSONB if dialect_name == "postgresql" else sa.JSON
+    games = sa.table(
+        'games',
+        sa.column('id', sa.Integer),
+        sa.column('questions_json', json_type),
+    )
+    questions = sa.table(
+        'questions',
+        sa.column('content_hash', sa.String),
+        sa.column('difficulty', sa.Integer),
+        sa.column('category', sa.String),
+        sa.column('body', json_type),
+    )
+    game_questions = sa.table(
+        'game_questions',
+        sa.column('game_id', sa.Integer),
+        sa.column('slot', sa.Integer),
+        sa.column('is_bonus', sa.Boolean),
+        sa.column('question_hash', sa.String),
+    )
+    return games, questions, game_questions
+
+
+# Frozen copies of app.services.question_bank.question_hash / split_payload as of
+# this revision: the migration must not import the app (its Settings need the
+# runtime environment) nor change behaviour when the app code does.
+def question_hash(question):
+    return hashlib.sha256(json.dumps(question, sort_keys=True).encode()).hexdigest()
+
+
+def split_payload(game_id, payload):
+    """(questions rows, game_questions rows) for one game payload."""
+    ordered = [(q, False) for q in payload["questions"]]
+    if payload.get("bonus_question"):
+        ordered.append((payload["bonus_question"], True))
+
+    questions, links = {}, []
+    for slot, (question, is_bonus) in enumerate(ordered):
+        content_hash = question_hash(question)
+        questions[content_hash] = {
+            "content_hash": content_hash,
+            "difficulty": question["difficulty"],
+            "category": question["category"],
+            "body": question,
+        }
+        links.append({"game_id": game_id, "slot": slot, "is_bonus": is_bonus, "question_hash": content_hash})
+    return list(questions.values()), links
+
+
+def split_legacy_games(bind, batch_size=BATCH_SIZE):
+    """
+    Stream games with a questions_json payload in id order, `batch_size` at
+    a time: add their questions to the bank, link them, clear the blob.
+    Every step is idempotent, so an interrupted run can simply be repeated.
+    """
+    games, questions, game_questions = _tables(bind.dialect.name)
+    dialect_insert = postgresql.insert if bind.dialect.name == "postgresql" else sqlite.insert
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(games.c.id, games.c.questions_json)
+            .where(games.c.id > last_id, games.c.questions_json.is_not(None))
+            .order_by(games.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1].id
+
+        bank, links, migrated = {}, [], []
+        for game_id, payload in rows:
+            if not isinstance(payload, dict) or not isinstance(payload.get("questions"), list):
+                continue  # not a game payload; leave the blob in place
+            game_bank, game_links = split_payload(game_id, payload)
+            bank.update((q["content_hash"], q) for q in game_bank)
+            links.extend(game_links)
+            migrated.append(game_id)
+        if not migrated:
+            continue
+
+        if bank:
+            bind.execute(
+                dialect_insert(questions).values(list(bank.values()))
+                .on_conflict_do_nothing(index_elements=['content_hash'])
+            )
+        bind.execute(game_questions.delete().where(game_questions.c.game_id.in_(migrated)))
+        if links:
+            bind.execute(game_questions.insert().values(links))
+        bind.execute(games.update().where(games.c.id.in_(migrated)).values(questions_json=None))
+
+
+def upgrade():
+    op.create_table(
+        'questions',
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('difficulty', sa.Integer(), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('body', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.create_index('ix_questions_category', 'questions', ['category'])
+    op.create_index('ix_questions_difficulty_category', 'questions', ['difficulty', 'category'])
+    op.create_table(
+        'game_questions',
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('slot', sa.Integer(), nullable=False),
+        sa.Column('is_bonus', sa.Boolean(), nullable=False),
+        sa.Column('question_hash', sa.String(length=64), nullable=False),
+        sa.ForeignKeyConstraint(['game_id'], ['games.id'], ),
+        sa.ForeignKeyConstraint(['question_hash'], ['questions.content_hash'], ),
+        sa.PrimaryKeyConstraint('game_id', 'slot')
+    )
+    op.create_index('ix_game_questions_question_hash', 'game_questions', ['question_hash'])
+    op.alter_column('games', 'questions_json', existing_type=postgresql.JSONB(astext_type=sa.Text()),
+                    nullable=True)
+
+    # readers handle both layouts, so batches commit one by one instead of
+    # holding every game row locked until the end of the migration
+    with op.get_context().autocommit_block():
+        split_legacy_games(op.get_bind())
+
+
+def downgrade():
+    # rebuild the blobs before dropping the bank
+    bind = op.get_bind()
+    bind.execute(sa.text("""
+        UPDATE games SET questions_json = jsonb_build_object(
+            'questions', coalesce((
+                SELECT jsonb_agg(q.body ORDER BY gq.slot)
+                FROM game_questions gq JOIN questions q ON q.content_hash = gq.question_hash
+                WHERE gq.game_id = games.id AND NOT gq.is_bonus
+            ), '[]'::jsonb),
+            'bonus_question', (
+                SELECT q.body
+                FROM game_questions gq JOIN questions q ON q.content_hash = gq.question_hash
+                WHERE gq.game_id = games.id AND gq.is_bonus
+            )
+        )
+        WHERE questions_json IS NULL
+    """))
+    op.alter_column('games', 'questions_json', existing_type=postgresql.JSONB(astext_type=sa.Text()),
+                    nullable=False)
+    op.drop_index('ix_game_questions_question_hash', table_name='game_questions')
+    op.drop_table('game_questions')
+    op.drop_index('ix_questions_difficulty_category', table_name='questions')
+    op.drop_index('ix_questions_category', table_name='questions')
+    op.drop_table('questions')
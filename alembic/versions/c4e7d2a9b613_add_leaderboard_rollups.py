@@ -0,0 +1,58 @@
+"""add leaderboard_rollups for day/week leaderboards
+
+Revision ID: c4e7d2a9b613
+Revises: 8f3a61c2d9e4
+Create Date: 2026-10-19 14:22:05.371902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c4e7d2a9b613'
+down_revision = '8f3a61c2d9e4'
+branch_labels = None
+depends_on = None
+
+# Seed the buckets a live leaderboard can still ask for (today, this week
+# and the one before); older history is not read by any window.
+BACKFILL = """
+INSERT INTO leaderboard_rollups (period, bucket_start, player_id, best, game_id, played_at)
+SELECT DISTINCT ON (period, bucket_start, player_id)
+       period, bucket_start, player_id, score, game_id, played_at
+FROM (
+    SELECT 'day' AS period, played_at::date AS bucket_start, id, player_id, score, game_id, played_at
+    FROM scores
+    WHERE played_at >= date_trunc('week', now() AT TIME ZONE 'utc') - interval '7 days'
+    UNION ALL
+    SELECT 'week', date_trunc('week', played_at)::date, id, player_id, score, game_id, played_at
+    FROM scores
+    WHERE played_at >= date_trunc('week', now() AT TIME ZONE 'utc') - interval '7 days'
+) s
+ORDER BY period, bucket_start, player_id, score DESC, played_at, id
+"""
+
+
+def upgrade():
+    op.create_table(
+        'leaderboard_rollups',
+        sa.Column('period', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.Date(), nullable=False),
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('best', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.Column('played_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+        sa.PrimaryKeyConstraint('period', 'bucket_start', 'player_id')
+    )
+    op.create_index(
+        'ix_leaderboard_rollups_top', 'leaderboard_rollups',
+        ['period', 'bucket_start', sa.text('best DESC'), 'player_id'],
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(BACKFILL)
+
+
+def downgrade():
+    op.drop_index('ix_leaderboard_rollups_top', table_name='leaderboard_rollups')
+    op.drop_table('leaderboard_rollups')
@@ -0,0 +1,40 @@
+"""add player_games: (player, game) pairs behind player_stats.distinct_games
+
+Revision ID: c9d4e1a7f3b5
+Revises: a3e7c5f9b2d4
+Create Date: 2026-10-19 23:10:26.947310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c9d4e1a7f3b5'
+down_revision = 'a3e7c5f9b2d4'
+branch_labels = None
+depends_on = None
+
+# Idempotent: pairs from scores submitted by the previous release between this
+# migration and the deploy are added by `python -m scripts.rebuild_player_stats`.
+BACKFILL = """
+INSERT INTO player_games (player_id, game_id)
+SELECT player_id, game_id FROM scores
+UNION
+SELECT player_id, game_id FROM score_summaries
+ON CONFLICT DO NOTHING
+"""
+
+
+def upgrade():
+    op.create_table(
+        'player_games',
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('game_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+        sa.PrimaryKeyConstraint('player_id', 'game_id')
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade():
+    op.drop_table('player_games')
@@ -0,0 +1,24 @@
+"""add questions.minhash for near-duplicate detection
+
+Revision ID: d5a0c8e3f1b7
+Revises: b81f4c6e2d57
+Create Date: 2026-10-19 19:12:40.381925
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd5a0c8e3f1b7'
+down_revision = 'b81f4c6e2d57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # nullable: existing questions are signed afterwards by scripts.backfill_minhash
+    op.add_column('questions', sa.Column('minhash', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('questions', 'minhash')
@@ -0,0 +1,52 @@
+"""add player_stats and the scores (player_id, game_id) index
+
+Revision ID: e2b95f07c3a8
+Revises: c4e7d2a9b613
+Create Date: 2026-10-19 15:48:12.604117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e2b95f07c3a8'
+down_revision = 'c4e7d2a9b613'
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+INSERT INTO player_stats (player_id, games_played, distinct_games, total_score, best, last_played_at)
+SELECT player_id, count(*), count(DISTINCT game_id), sum(score), max(score), max(played_at)
+FROM scores
+GROUP BY player_id
+"""
+
+
+def upgrade():
+    op.create_table(
+        'player_stats',
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('games_played', sa.Integer(), nullable=False),
+        sa.Column('distinct_games', sa.Integer(), nullable=False),
+        sa.Column('total_score', sa.BigInteger(), nullable=False),
+        sa.Column('best', sa.Integer(), nullable=False),
+        sa.Column('last_played_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+        sa.PrimaryKeyConstraint('player_id')
+    )
+    op.execute(BACKFILL)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_scores_player_game', 'scores', ['player_id', 'game_id'],
+            postgresql_concurrently=op.get_bind().dialect.name == "postgresql",
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_scores_player_game', table_name='scores',
+            postgresql_concurrently=op.get_bind().dialect.name == "postgresql",
+        )
+    op.drop_table('player_stats')
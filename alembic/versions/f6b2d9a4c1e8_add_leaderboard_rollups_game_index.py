@@ -0,0 +1,37 @@
+"""add leaderboard_rollups game_id index for game deletes
+
+Revision ID: f6b2d9a4c1e8
+Revises: d5a0c8e3f1b7
+Create Date: 2026-10-19 21:40:12.504318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f6b2d9a4c1e8'
+down_revision = 'd5a0c8e3f1b7'
+branch_labels = None
+depends_on = None
+
+
+def _concurrently():
+    # build without blocking score submissions on a live Postgres table
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade():
+    # DELETE ... WHERE game_id = ? on a game delete, instead of a full scan
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_leaderboard_rollups_game', 'leaderboard_rollups', ['game_id'],
+            postgresql_concurrently=_concurrently(),
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_leaderboard_rollups_game', table_name='leaderboard_rollups',
+            postgresql_concurrently=_concurrently(),
+        )
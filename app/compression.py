@@ -0,0 +1,196 @@
+# app/compression.py
+import gzip
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import brotli
+from starlette.responses import Response
+
+from .config import settings
+
+# preferred first when the client accepts several
+ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_TYPES = (b"application/json", b"text/")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The best of ENCODINGS allowed by an Accept-Encoding header (q=0 excludes), or None."""
+    allowed: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        allowed[name.strip()] = q
+    for encoding in ENCODINGS:
+        if allowed.get(encoding, allowed.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionStats:
+    """Compressed responses: bytes before/after, CPU time spent compressing, payload cache use."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_ms = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def record(self, bytes_in: int, bytes_out: int, cpu_s: float = 0.0) -> None:
+        self.responses += 1
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.cpu_ms += cpu_s * 1000
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "responses": self.responses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "bytes_saved": self.bytes_in - self.bytes_out,
+            "cpu_ms": round(self.cpu_ms, 3),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+compression_stats = CompressionStats()
+
+
+def compress(body: bytes, encoding: str, level: str = "fast") -> bytes:
+    """`level="fast"` for per-request compression, `"best"` for bodies compressed once and cached."""
+    if encoding == "br":
+        return brotli.compress(body, quality=4 if level == "fast" else 11)
+    return gzip.compress(body, compresslevel=6 if level == "fast" else 9, mtime=0)
+
+
+def _timed_compress(body: bytes, encoding: str, level: str) -> bytes:
+    started = time.thread_time()
+    compressed = compress(body, encoding, level)
+    compression_stats.record(len(body), len(compressed), time.thread_time() - started)
+    return compressed
+
+
+class CompressedPayloadCache:
+    """
+    Game bodies by game id and questions hash, identity and each encoding compressed
+    (at the highest level) on first request only; least recently used
+    entries are evicted first.
+    """
+
+    def __init__(self, max_entries: int = 1024, minimum_size: int = 500):
+        self.max_entries = max_entries
+        self.minimum_size = minimum_size
+        self._entries: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+
+    def response(self, accept_encoding: str, key: str, build: Callable[[], bytes]) -> Response:
+        """JSON response for `key`; `build()` makes the identity body on a cache miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = {"identity": build()}
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+
+        body = entry["identity"]
+        encoding = choose_encoding(accept_encoding) if len(body) >= self.minimum_size else None
+        if encoding is None:
+            return Response(body, media_type="application/json")
+
+        compressed = entry.get(encoding)
+        if compressed is None:
+            compression_stats.cache_misses += 1
+            compressed = entry[encoding] = _timed_compress(body, encoding, "best")
+        else:
+            compression_stats.cache_hits += 1
+            compression_stats.record(len(body), len(compressed))
+        return Response(compressed, media_type="application/json", headers={
+            "content-encoding": encoding,
+            "vary": "Accept-Encoding",
+        })
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+payload_cache = CompressedPayloadCache(
+    max_entries=settings.COMPRESSION_CACHE_SIZE,
+    minimum_size=settings.COMPRESSION_MIN_BYTES,
+)
+
+
+class CompressionMiddleware:
+    """
+    br/gzip for single-message JSON and text responses of at least
+    `minimum_size` bytes. Responses that already carry a Content-Encoding
+    (the precompressed game payloads) and streamed bodies pass through.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else settings.COMPRESSION_MIN_BYTES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = choose_encoding(value.decode("latin-1"))
+                break
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # held back until the body shows whether it is worth compressing
+                start = message
+                return
+            if start is None:
+                return await send(message)
+
+            held, start = start, None
+            body = message.get("body", b"")
+            headers = held.get("headers", [])
+            if message.get("more_body", False) or not self._compressible(headers, body):
+                await send(held)
+                return await send(message)
+
+            compressed = _timed_compress(body, encoding, "fast")
+            headers = [(k, v) for k, v in headers if k != b"content-length"] + [
+                (b"content-length", str(len(compressed)).encode()),
+                (b"content-encoding", encoding.encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**held, "headers": headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compressible(self, headers, body: bytes) -> bool:
+        if len(body) < self.minimum_size:
+            return False
+        content_type = b""
+        for name, value in headers:
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value
+        return content_type.startswith(COMPRESSIBLE_TYPES)
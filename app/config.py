@@ -1,4 +1,6 @@
 # app/config.py
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,6 +15,73 @@ class Settings(BaseSettings):
         "https://www.peakpuzzler.com",
     ]
     DB_ECHO: bool = False
+    # optional replica for read-only endpoints; admin writes pin the writer's reads to the primary for a while
+    READ_DATABASE_URL: str | None = None
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    OPENAI_MODEL: str = "gpt-4o"
+
+    # Connection pool (Postgres; SQLite keeps SQLAlchemy's defaults). Statement cache 0 behind pgbouncer
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Startup: connections opened per engine before serving, and the time allowed for it
+    DB_WARMUP_CONNECTIONS: int = 5
+    DB_WARMUP_TIMEOUT_SECONDS: float = 10.0
+
+    # AI call ledger: rows are buffered in memory and written in batches
+    GENERATION_LEDGER_FLUSH_SECONDS: float = 5.0
+    GENERATION_LEDGER_BATCH_SIZE: int = 200
+
+    # On-demand request profiler (X-Profile: 1 + X-Admin-Key)
+    PROFILER_INTERVAL_MS: float = 1.0
+    PROFILER_MAX_PROFILES: int = 50
+
+    # Per-game leaderboard result cache (invalidated by score submission)
+    GAME_LEADERBOARD_TTL_SECONDS: float = 5.0
+
+    # Single questions served by /games/{id}/questions/{index} (cached per game, invalidated on update/delete)
+    GAME_QUESTION_CACHE_TTL_SECONDS: float = 300.0
+    GAME_QUESTION_CACHE_SIZE: int = 4096
+
+    # In-memory all-time rank index (reloaded after this age to pick up other workers' writes)
+    RANK_INDEX_MAX_AGE_SECONDS: float = 30.0
+
+    # Live leaderboard WebSocket: top-N pushed as diffs, bursts of submissions coalesced
+    LIVE_LEADERBOARD_SIZE: int = 10
+    LIVE_LEADERBOARD_COALESCE_SECONDS: float = 0.25
+    LIVE_LEADERBOARD_REFRESH_SECONDS: float = 5.0
+    LIVE_LEADERBOARD_QUEUE_SIZE: int = 8
+
+    # Raw score compaction into score_summaries (only when a retention is set) and rollup bucket pruning
+    SCORE_RETENTION_DAYS: int | None = None
+    SCORE_COMPACTION_BATCH_SIZE: int = 5000
+    SCORE_COMPACTION_INTERVAL_SECONDS: float = 3600.0
+
+    # Game assembly from the question bank (in-memory pool, recently drawn questions avoided)
+    QUESTION_POOL_MAX_AGE_SECONDS: float = 300.0
+    QUESTION_POOL_RECENT_SIZE: int = 500
+
+    # Near-duplicate detection of generated questions (MinHash/LSH over question texts)
+    NEAR_DUPLICATE_THRESHOLD: float = 0.7
+    NEAR_DUPLICATE_REGENERATIONS: int = 1
+
+    # Response compression (br/gzip); game payloads are compressed once per questions_hash and cached
+    COMPRESSION_MIN_BYTES: int = 500
+    COMPRESSION_CACHE_SIZE: int = 1024
+
+    # Shared memory-mapped snapshot of game ids and the leaderboard top-N for multi-worker deployments (unset = off)
+    SNAPSHOT_PATH: str | None = None
+    SNAPSHOT_REFRESH_SECONDS: float = 5.0
+    SNAPSHOT_MAX_AGE_SECONDS: float = 30.0
+    SNAPSHOT_LEADERBOARD_SIZE: int = 100
+
+    # Cache invalidations sent to the other workers: none ("local"), same host ("unix") or Postgres LISTEN/NOTIFY
+    INVALIDATION_BACKEND: Literal["local", "unix", "postgres"] = "local"
+    INVALIDATION_SOCKET_DIR: str = "/tmp/peak-puzzler-invalidation"
+    INVALIDATION_CHANNEL: str = "cache_invalidation"
 
     # Pydantic v2 way to configure env file
     model_config = SettingsConfigDict(env_file=".env")
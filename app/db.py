@@ -1,14 +1,31 @@
 # app/db.py
+from typing import Any, Dict
+
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from .config import settings
 
-# Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    future=True,
-    echo=settings.DB_ECHO,
 
-)
+def engine_options(url: str) -> Dict[str, Any]:
+    """create_async_engine keyword arguments: pool sizing and asyncpg's statement cache for Postgres"""
+    options: Dict[str, Any] = {
+        "future": True,
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if make_url(url).get_backend_name() == "postgresql":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            connect_args={"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+        )
+    return options
+
+
+# Create async engine
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 # Use async_sessionmaker for async sessions
 AsyncSessionLocal = async_sessionmaker(
@@ -16,3 +33,28 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
     class_=AsyncSession
 )
+
+
+# Read-only endpoints use the replica when one is configured, else the same engine
+read_engine = (
+    create_async_engine(settings.READ_DATABASE_URL, **engine_options(settings.READ_DATABASE_URL))
+    if settings.READ_DATABASE_URL else engine
+)
+
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    expire_on_commit=False,
+    class_=AsyncSession
+)
+
+
+def dialect_insert(session: AsyncSession):
+    """
+    The session's dialect-specific `insert()` construct, which adds
+    `on_conflict_do_update` / `on_conflict_do_nothing` (Postgres and SQLite).
+    """
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
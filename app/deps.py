@@ -1,10 +1,17 @@
-from typing import AsyncGenerator
+import hashlib
+import hmac
+import math
+import time
+from typing import AsyncGenerator, Callable
 from sqlalchemy.ext.asyncio import AsyncSession
-from .db import AsyncSessionLocal
-from fastapi import Security, HTTPException
+from .db import AsyncSessionLocal, ReadSessionLocal
+from fastapi import Request, Response, Security, HTTPException
 from fastapi.security.api_key import APIKeyHeader
 from .config import settings
 
+# set on admin writes: until this unix time the writer's reads go to the primary
+PRIMARY_READS_COOKIE = "primary_reads_until"
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """Dependency for getting async DB sessions"""
@@ -19,6 +26,47 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
+def _signature(until: str) -> str:
+    return hmac.new(settings.ADMIN_API_KEY.encode(), until.encode(), hashlib.sha256).hexdigest()
+
+
+def primary_reads_cookie(until: float) -> str:
+    """`<unix time>.<HMAC>`: only the server can pin a client's reads to the primary."""
+    value = f"{until:.3f}"
+    return f"{value}.{_signature(value)}"
+
+
+def mark_primary_reads(response: Response) -> None:
+    """Read-your-writes: route this client's reads to the primary while the replica may lag."""
+    window = settings.READ_YOUR_WRITES_SECONDS
+    response.set_cookie(PRIMARY_READS_COOKIE, primary_reads_cookie(time.time() + window),
+                        max_age=math.ceil(window), httponly=True, samesite="lax")
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Whether the request carries a valid, unexpired read-your-writes pin."""
+    until, _, signature = request.cookies.get(PRIMARY_READS_COOKIE, "").rpartition(".")
+    if not until or not hmac.compare_digest(signature, _signature(until)):
+        return False
+    try:
+        return float(until) > time.time()
+    except ValueError:
+        return False
+
+
+def make_read_db(primary_factory, replica_factory) -> Callable[[Request], AsyncGenerator[AsyncSession, None]]:
+    async def read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+        """Dependency for read-only DB sessions: the replica, or the primary right after this client wrote"""
+        factory = primary_factory if reads_from_primary(request) else replica_factory
+        async with factory() as session:
+            yield session
+
+    return read_db
+
+
+get_read_db = make_read_db(AsyncSessionLocal, ReadSessionLocal)
+
+
 api_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
 
 
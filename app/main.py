@@ -1,23 +1,58 @@
 # app/main.py
 from fastapi import FastAPI, Depends
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
+from .compression import CompressionMiddleware
+from .db import ReadSessionLocal, engine, read_engine
 from .deps import get_admin_key
-from .routers import games, leaderboard, scores
+from .profiling import ProfilingMiddleware
+from .routers import admin, games, leaderboard, players, scores
+from .services.assembly import question_pool
+from .services.compaction import score_compactor
+from .services.generation_ledger import generation_ledger
+from .services.invalidation import invalidation_bus
+from .services.live_leaderboard import live_leaderboard
+from .services.near_duplicates import near_duplicates
+from .services.pool_warmup import pool_warmup
+from .services.snapshot import shared_snapshot
 from app.config import settings
 
 
+def _engines():
+    return {"primary": engine} if read_engine is engine else {"primary": engine, "replica": read_engine}
+
+
+async def prime_caches():
+    """Load what the first reads would otherwise load: all-time ranks and the assembly pool"""
+    await near_duplicates.warm()
+    async with ReadSessionLocal() as db:
+        await leaderboard.ensure_rank_index(db)
+        await question_pool.ensure(db)
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     # No auto-create in production; Alembic migrations manage schema
+    generation_ledger.start()
+    await invalidation_bus.start()
+    score_compactor.start()  # prunes leaderboard buckets; compacts only with SCORE_RETENTION_DAYS set
+    await pool_warmup.run(_engines(), prime=prime_caches)
+    shared_snapshot.start(leaderboard.build_leaderboard_query)  # no-op unless SNAPSHOT_PATH is set
     yield
+    await shared_snapshot.stop()
+    await score_compactor.stop()
+    await live_leaderboard.stop()
+    await generation_ledger.stop()
+    await invalidation_bus.stop()
 
 
 app = FastAPI(
     lifespan=lifespan,
     title="Millionaire API",
     redirect_slashes=False,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -27,14 +62,25 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)  # type: ignore[arg-type]
+app.add_middleware(ProfilingMiddleware)  # type: ignore[arg-type]
 
 app.include_router(games.router, prefix="/games", tags=["games"])
 app.include_router(scores.router, prefix="/games", tags=["scores"])
 app.include_router(leaderboard.router, prefix="/leaderboard", tags=["leaderboard"])
+app.include_router(leaderboard.game_router, prefix="/games", tags=["leaderboard"])
+app.include_router(players.router, prefix="/players", tags=["players"])
 app.include_router(games.router, prefix="/admin/games", dependencies=[Depends(get_admin_key)])
+app.include_router(admin.router, prefix="/admin", tags=["admin"], dependencies=[Depends(get_admin_key)])
 
 
 @app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "ok", "version": "1.0.0"}
+async def health_check(response: Response):
+    """Health check endpoint: 503 only while the database pool could not be warmed up"""
+    # reports the current state; a failed warm-up is retried in the background
+    pool_warmup.schedule_retry()
+    pool = pool_warmup.status()
+    if pool["state"] == "failed":
+        response.status_code = 503
+        return {"status": "unavailable", "version": "1.0.0", "pool": pool}
+    return {"status": "ok", "version": "1.0.0", "pool": pool}
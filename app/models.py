@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, BigInteger, String, Date, DateTime, Float, Index, LargeBinary, func, ForeignKey
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import declarative_base, deferred
 
 Base = declarative_base()
 
@@ -8,7 +8,9 @@ Base = declarative_base()
 class Game(Base):
     __tablename__ = "games"
     id = Column(Integer, primary_key=True)
-    questions_json = Column(JSONB, nullable=False)
+    # legacy payload; new games keep their questions in game_questions and leave this NULL.
+    # Largest column by far: only loaded when selected explicitly (or on attribute access)
+    questions_json = deferred(Column(JSONB, nullable=True))
     questions_hash = Column(String(64), unique=True, index=True)
     created_at = Column(DateTime, server_default=func.now())
 
@@ -26,3 +28,112 @@ class Score(Base):
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
     score = Column(Integer, nullable=False)
     played_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # best-per-player (leaderboard); game_id carried in the index on Postgres
+        Index(
+            "ix_scores_player_score",
+            "player_id", score.desc(), "played_at",
+            postgresql_include=["game_id"],
+        ),
+        # per-game lookups and the delete_game score wipe
+        Index("ix_scores_game_score", "game_id", score.desc()),
+        # "first attempt at this game?" check behind player_stats.distinct_games
+        Index("ix_scores_player_game", "player_id", "game_id"),
+        # compaction batches: the oldest raw scores before the retention cutoff
+        Index("ix_scores_played_at", "played_at", "id"),
+    )
+
+
+class GenerationRun(Base):
+    """One OpenAI call made by the question services (cost & latency ledger)."""
+    __tablename__ = "generation_runs"
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(16), nullable=False)  # "generate" | "update"
+    model = Column(String(64), nullable=False)
+    prompt_tokens = Column(Integer)
+    completion_tokens = Column(Integer)
+    latency_ms = Column(Float, nullable=False)
+    outcome = Column(String(32), nullable=False)
+    # no FK: runs are buffered and may outlive (or never match) a committed game
+    game_id = Column(Integer)
+    created_at = Column(DateTime, server_default=func.now(), index=True)
+
+
+class LeaderboardRollup(Base):
+    """Best score per player within one time bucket (maintained by submit_score)."""
+    __tablename__ = "leaderboard_rollups"
+    period = Column(String(8), primary_key=True)  # "day" | "week"
+    bucket_start = Column(Date, primary_key=True)
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    best = Column(Integer, nullable=False)
+    game_id = Column(Integer, nullable=False)
+    played_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_leaderboard_rollups_top", "period", "bucket_start", best.desc(), "player_id"),
+        Index("ix_leaderboard_rollups_game", "game_id"),
+    )
+
+
+class PlayerGame(Base):
+    """(player, game) pairs with at least one score; the insert that creates a pair counts a distinct game."""
+    __tablename__ = "player_games"
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    game_id = Column(Integer, primary_key=True)
+
+
+class PlayerStats(Base):
+    """Per-player aggregates, maintained by submit_score (rebuild: scripts.rebuild_player_stats)."""
+    __tablename__ = "player_stats"
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    games_played = Column(Integer, nullable=False)
+    distinct_games = Column(Integer, nullable=False)
+    total_score = Column(BigInteger, nullable=False)
+    best = Column(Integer, nullable=False)
+    last_played_at = Column(DateTime, nullable=False)
+
+
+class ScoreSummary(Base):
+    """Compacted raw scores: one row per (player, game) for attempts older than the retention window."""
+    __tablename__ = "score_summaries"
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    attempts = Column(Integer, nullable=False)
+    total_score = Column(BigInteger, nullable=False)
+    # the best attempt, with its original time and id so leaderboard tie-breaks do not change
+    best = Column(Integer, nullable=False)
+    best_played_at = Column(DateTime, nullable=False)
+    best_score_id = Column(Integer, nullable=False)
+    last_played_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_score_summaries_player_best", "player_id", best.desc(), "best_played_at", "best_score_id"),
+        Index("ix_score_summaries_game_best", "game_id", best.desc()),
+    )
+
+
+class QuestionRecord(Base):
+    """One question, stored once however many games use it (key: hash of its content)."""
+    __tablename__ = "questions"
+    content_hash = Column(String(64), primary_key=True)
+    difficulty = Column(Integer, nullable=False)
+    category = Column(String, nullable=False, index=True)
+    body = Column(JSONB, nullable=False)
+    # MinHash signature of the question text (near-duplicate detection)
+    minhash = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        # difficulty lookups, and (difficulty, category) picks
+        Index("ix_questions_difficulty_category", "difficulty", "category"),
+    )
+
+
+class GameQuestion(Base):
+    """Ordered questions of a game: slots 0..n-1, then the bonus question."""
+    __tablename__ = "game_questions"
+    game_id = Column(Integer, ForeignKey("games.id"), primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    is_bonus = Column(Boolean, nullable=False, default=False)
+    question_hash = Column(String(64), ForeignKey("questions.content_hash"), nullable=False, index=True)
@@ -0,0 +1,176 @@
+# app/profiling.py
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+
+from .config import settings
+from .deps import get_admin_key
+
+
+class SamplingProfiler:
+    """
+    Minimal wall-clock sampling profiler.
+
+    A helper thread reads the target thread's current frame via
+    `sys._current_frames()` every `interval` seconds and counts collapsed
+    stacks ("outer;inner;leaf"), the input format of flamegraph.pl and
+    speedscope. Nothing is hooked into the profiled thread itself.
+
+    The event-loop thread also runs every other request. With `root` (a
+    frame of the profiled coroutine), only stacks passing through it are
+    kept; the rest are counted in `skipped`.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.001, root=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.stacks: Counter = Counter()
+        self.skipped = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        stack = []
+        in_root = self.root is None
+        while frame is not None:
+            in_root = in_root or frame is self.root
+            stack.append(self._frame_label(frame))
+            frame = frame.f_back
+        if not stack:
+            return
+        if not in_root:
+            self.skipped += 1  # the loop was running another request (or idle)
+            return
+        self.stacks[";".join(reversed(stack))] += 1
+
+    def _run(self) -> None:
+        self._sample()
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+@dataclass
+class Profile:
+    profile_id: str
+    method: str
+    path: str
+    started_at: datetime
+    duration_ms: float
+    samples: int
+    stacks: Dict[str, int]
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text, one "frame;frame;frame count" line per stack."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+class ProfileStore:
+    """Keeps the most recent profiles in memory, oldest evicted first."""
+
+    def __init__(self, max_profiles: int = 50):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, Profile]" = OrderedDict()
+
+    def add(self, profile: Profile) -> None:
+        self._profiles[profile.profile_id] = profile
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Profile]:
+        return list(reversed(self._profiles.values()))
+
+
+profile_store = ProfileStore(max_profiles=settings.PROFILER_MAX_PROFILES)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request that carries `X-Profile: 1` and a valid `X-Admin-Key`,
+    and returns the id of the stored profile in the `X-Profile-Id` response
+    header (fetch it from `/admin/profiles/{id}`).
+
+    Unprofiled requests only pay for a scan of the raw header list.
+
+    Only the request's own task is recorded: time the event loop spends on
+    concurrent requests is left out. Work this request hands to other tasks
+    (e.g. a coalesced query run by another request) or to the threadpool
+    (sync dependencies) does not show up either.
+    """
+
+    def __init__(self, app, store: ProfileStore = profile_store, interval: Optional[float] = None):
+        self.app = app
+        self.store = store
+        self.interval = interval if interval is not None else settings.PROFILER_INTERVAL_MS / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        wants_profile = False
+        admin_key = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                wants_profile = value == b"1"
+            elif name == b"x-admin-key":
+                admin_key = value.decode("latin-1")
+        if not wants_profile:
+            return await self.app(scope, receive, send)
+
+        try:
+            await get_admin_key(admin_key)
+        except HTTPException:
+            # not an admin: serve the request normally, unprofiled
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ]
+            await send(message)
+
+        started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        # this coroutine's frame is on the stack whenever the loop is running this request
+        profiler = SamplingProfiler(threading.get_ident(), self.interval, root=sys._getframe())
+        t0 = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            stacks = profiler.stop()
+            self.store.add(Profile(
+                profile_id=profile_id,
+                method=scope["method"],
+                path=scope["path"],
+                started_at=started_at,
+                duration_ms=(time.perf_counter() - t0) * 1000,
+                samples=sum(stacks.values()),
+                stacks=dict(stacks),
+            ))
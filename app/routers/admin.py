@@ -0,0 +1,85 @@
+# app/routers/admin.py
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..compression import compression_stats
+from ..deps import get_db
+from ..models import GenerationRun
+from ..profiling import profile_store
+from ..schemas import CompressionStatsRead, GenerationStats, ProfileSummary
+from ..services.generation_ledger import generation_ledger, summarize_runs
+
+router = APIRouter()
+
+
+@router.get(
+    "/generation-stats",
+    response_model=List[GenerationStats],
+    summary="(Admin) Daily latency percentiles and token totals of AI calls"
+)
+async def generation_stats(
+        days: int = Query(7, ge=1, le=90),
+        db: AsyncSession = Depends(get_db)
+):
+    # make sure the report includes calls still sitting in the write buffer
+    await generation_ledger.flush()
+
+    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+    result = await db.execute(
+        select(
+            GenerationRun.created_at,
+            GenerationRun.model,
+            GenerationRun.outcome,
+            GenerationRun.latency_ms,
+            GenerationRun.prompt_tokens,
+            GenerationRun.completion_tokens,
+        )
+        .where(GenerationRun.created_at >= since)
+        .order_by(GenerationRun.created_at)
+    )
+    return summarize_runs(result.all())
+
+
+@router.get(
+    "/compression-stats",
+    response_model=CompressionStatsRead,
+    summary="(Admin) Bytes saved by response compression and the CPU time it cost"
+)
+async def get_compression_stats():
+    return compression_stats.snapshot()
+
+
+@router.get("/profiles", response_model=List[ProfileSummary], summary="(Admin) Recently captured request profiles")
+async def list_profiles():
+    return [
+        ProfileSummary(
+            profile_id=p.profile_id,
+            method=p.method,
+            path=p.path,
+            started_at=p.started_at,
+            duration_ms=p.duration_ms,
+            samples=p.samples,
+        )
+        for p in profile_store.list()
+    ]
+
+
+@router.get(
+    "/profiles/{profile_id}",
+    response_class=PlainTextResponse,
+    summary="(Admin) Collapsed stacks of a profiled request (flamegraph.pl / speedscope input)"
+)
+async def get_profile(profile_id: str):
+    """
+    Stacks sampled while the event loop was running this request's task. Concurrent
+    requests are filtered out; work handed to other tasks or the threadpool is missing.
+    """
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile.collapsed())
@@ -1,84 +1,125 @@
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Path, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, exists, update
 from sqlalchemy.exc import IntegrityError
-from typing import Dict, Any
+from typing import Callable, List, Optional, Tuple
 
 from starlette import status
 
-from ..deps import get_db, get_admin_key
-from ..models import Game, Score
-from ..schemas import GameCreate, GameRead, Question, ExistsResponse, GameUpdate
+from ..compression import payload_cache
+from ..config import settings
+from ..deps import get_admin_key, get_db, get_read_db, mark_primary_reads
+from ..models import Game, GameQuestion, Score, ScoreSummary
+from ..schemas import GameCreate, GameQuestions, GameRead, ExistsResponse, GameUpdate, Question
+from ..services.assembly import assemble_game, question_pool
+from ..services.cache import game_leaderboard_cache, game_question_cache
 from ..services.game_update import update_game_questions
-from ..services.questions import generate_questions
+from ..services import player_stats
+from ..services.generation_ledger import generation_ledger
+from ..services.invalidation import invalidation_bus
+from ..services.near_duplicates import log_near_duplicates, near_duplicates
+from ..services.question_bank import (
+    EncodedGame, StoredGame, canonical_json, encode_game, load_game_payload, payload_questions,
+    question_hash, replace_game_questions, store_game_questions,
+)
+from ..services.live_leaderboard import live_leaderboard
+from ..services.ranking import rank_index
+from ..services.rollups import forget_game
+from ..services.single_flight import single_flight
+from ..services.snapshot import shared_snapshot
+from ..services.questions import generate_game
 
 router = APIRouter()
 
 
-def _build_game_response(game_id: int, game_data: Dict[str, Any]) -> GameRead:
-    """Helper to build consistent GameRead responses"""
-    return GameRead(
-        game_id=game_id,
-        questions=[Question.model_validate(q) for q in game_data["questions"]],
-        bonus_question=(Question.model_validate(game_data["bonus_question"])
-                        if game_data.get("bonus_question") else None)
+def _game_response(request: Request, game_id: int, questions_hash: str, canonical: Callable[[], bytes]) -> Response:
+    """
+    A GameRead body spliced from the payload's canonical encoding (no re-validation or
+    re-encoding), served from the per-hash cache, precompressed for the client when it can be
+    """
+    return payload_cache.response(
+        request.headers.get("accept-encoding", ""),
+        # the id too: a deleted game's questions may come back under a new id
+        f"{game_id}:{questions_hash}",
+        lambda: b'{"game_id":%d,' % game_id + canonical()[1:],
     )
 
 
-@router.post("/", response_model=GameRead)
-async def create_game(
-        _: GameCreate = None,
-        _admin_key: str = Depends(get_admin_key),
-        db: AsyncSession = Depends(get_db)
-):
-    """Create a new game with 15 questions and a bonus question, or fetch existing game with same questions"""
-
-    # Generate questions with OpenAI
-    questions, bonus_question, questions_hash = await generate_questions()
+def _build_game_response(request: Request, game: StoredGame) -> Response:
+    """Helper to build consistent GameRead responses"""
+    return _game_response(request, game.game_id, game.questions_hash, lambda: canonical_json({
+        "questions": game.payload["questions"],
+        "bonus_question": game.payload.get("bonus_question"),
+    }))
 
-    # Prepare the query once
-    stmt = select(Game).where(Game.questions_hash == questions_hash)
 
+async def _save_game(request: Request, db: AsyncSession, game: EncodedGame,
+                     new_questions: bool = True) -> Tuple[int, Response]:
+    """Store a new game, or return the existing game with the same questions"""
     # Check if a game with this hash already exists
-    result = await db.execute(stmt)
-    existing_game = result.scalars().first()
+    existing_game = await load_game_payload(db, Game.questions_hash == game.questions_hash)
 
     if existing_game:
         # Return existing game if found
-        return _build_game_response(existing_game.id, existing_game.questions_json)
-
-    # Create new game record
-    game_data = {
-        "questions": [q.model_dump() for q in questions],
-        "bonus_question": bonus_question.model_dump() if bonus_question else None
-    }
-    new_game = Game(
-        questions_json=game_data,
-        questions_hash=questions_hash
-    )
-    db.add(new_game)
+        return existing_game.game_id, _build_game_response(request, existing_game)
 
-    # flush so new_game.id is populated
-    await db.flush()
-    # reloads all columns from the DB
-    await db.refresh(new_game)
+    # Create new game record; its questions go to the question bank
+    new_game = Game(questions_hash=game.questions_hash)
+    db.add(new_game)
 
     try:
-        return GameRead(
-            game_id=new_game.id,
-            questions=questions,
-            bonus_question=bonus_question
-        )
+        # flush so new_game.id is populated (no refresh: the response is built from memory)
+        await db.flush()
+        await store_game_questions(db, new_game.id, game.payload, new_questions=new_questions)
+        if new_questions:
+            question_pool.add(game.payload)
+            near_duplicates.add(game.payload)
+        return new_game.id, _game_response(request, new_game.id, game.questions_hash, lambda: game.canonical)
     except IntegrityError:
         # Race condition: another inserted same hash
         await db.rollback()
-        # Re-use the same query from above
-        result = await db.execute(stmt)
-        existing = result.scalars().first()
+        # Re-use the same lookup from above
+        existing = await load_game_payload(db, Game.questions_hash == game.questions_hash)
         if not existing:
             # Very unlikely, but handle it gracefully
             raise HTTPException(status_code=500, detail="Failed to retrieve game after conflict")
-        return _build_game_response(existing.id, existing.questions_json)
+        return existing.game_id, _build_game_response(request, existing)
+
+
+@router.post("/", response_model=GameRead)
+async def create_game(
+        request: Request,
+        options: Optional[GameCreate] = None,
+        _admin_key: str = Depends(get_admin_key),
+        db: AsyncSession = Depends(get_db)
+):
+    """Create a new game with 15 questions and a bonus question, or fetch existing game with same questions"""
+
+    if options is not None and options.mode == "assemble":
+        # Reuse questions from the bank: no AI call, nothing for the ledger
+        _, response = await _save_game(request, db, await assemble_game(db), new_questions=False)
+        mark_primary_reads(response)
+        return response
+
+    with generation_ledger.scope() as run:
+        # Generate questions with OpenAI
+        game = await generate_game()
+
+        # Reworded copies of stored questions: ask again, keep the attempt with fewest
+        found = await near_duplicates.find(db, game.payload)
+        for _ in range(settings.NEAR_DUPLICATE_REGENERATIONS if found else 0):
+            retry = await generate_game()
+            retry_found = await near_duplicates.find(db, retry.payload)
+            if len(retry_found) < len(found):
+                game, found = retry, retry_found
+            if not found:
+                break
+
+        run.game_id, response = await _save_game(request, db, game)
+        log_near_duplicates(run.game_id, found)
+        mark_primary_reads(response)
+        return response
 
 
 @router.delete(
@@ -88,86 +129,124 @@ async def create_game(
 )
 async def delete_game(
         game_id: int,
+        background_tasks: BackgroundTasks,
+        response: Response,
         _admin_key: str = Depends(get_admin_key),
         db: AsyncSession = Depends(get_db)
 ):
-    # 1) make sure it exists
-    result = await db.execute(select(Game).where(Game.id == game_id))
-    game = result.scalars().first()
-    if not game:
+    # 1) wipe out any scores for that game, raw and compacted
+    removed = await db.execute(
+        delete(Score).where(Score.game_id == game_id).returning(Score.player_id)
+    )
+    player_ids = set(removed.scalars())
+    removed = await db.execute(
+        delete(ScoreSummary).where(ScoreSummary.game_id == game_id).returning(ScoreSummary.player_id)
+    )
+    player_ids.update(removed.scalars())
+
+    # 2) unlink its questions (they stay in the bank for other games)
+    await db.execute(delete(GameQuestion).where(GameQuestion.game_id == game_id))
+
+    # 3) now delete the game row itself; if it never existed, the get_db rollback undoes step 1
+    result = await db.execute(delete(Game).where(Game.id == game_id).returning(Game.id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(404, "Game not found")
 
-    # 2) wipe out any scores for that game
-    await db.execute(
-        delete(Score).where(Score.game_id == game_id)
+    # 4) rebuild any day/week bucket whose best came from this game
+    await forget_game(db, game_id)
+    # 5) recompute the stats of everyone who had played it
+    await player_stats.forget_game(db, game_id)
+    await player_stats.rebuild_players(db, player_ids)
+    game_leaderboard_cache.invalidate(game_id)
+    game_question_cache.invalidate(game_id)
+    rank_index.invalidate()
+    shared_snapshot.forget_game(game_id)
+    # again after commit and on every worker, so a reload racing the delete is not kept for max_age
+    background_tasks.add_task(
+        invalidation_bus.publish,
+        f"game:{game_id}", f"game_deleted:{game_id}", f"game_leaderboard:{game_id}", "leaderboard:all",
     )
-
-    # 3) now delete the game row itself
-    await db.delete(game)
+    background_tasks.add_task(live_leaderboard.notify)
+    mark_primary_reads(response)
     return
 
 
 @router.get("/list")
-async def list_games(db: AsyncSession = Depends(get_db)):
+async def list_games(db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(Game.id, Game.created_at).order_by(Game.created_at))
     return [{"game_id": gid, "created_at": at} for gid, at in result.all()]
 
 
 @router.get("/random", response_model=GameRead)
-async def random_game(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Game).order_by(func.random()).limit(1))
-    game = result.scalars().first()
+async def random_game(request: Request, db: AsyncSession = Depends(get_read_db)):
+    # with a shared snapshot, draw the id from it and load just that game
+    snapshot_id = shared_snapshot.random_game_id()
+    if snapshot_id is not None:
+        game = await load_game_payload(db, Game.id == snapshot_id)
+        if game:
+            return _build_game_response(request, game)
+
+    # pick the id first so the random sort never carries the questions
+    random_id = select(Game.id).order_by(func.random()).limit(1).scalar_subquery()
+    game = await load_game_payload(db, Game.id == random_id)
     if not game:
         raise HTTPException(404, "No games available")
-    return _build_game_response(game.id, game.questions_json)
+    return _build_game_response(request, game)
 
 
 @router.get("/{game_id}", response_model=GameRead)
-async def get_game(game_id: int, db: AsyncSession = Depends(get_db)):
+async def get_game(game_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
     """Get a specific game by ID"""
-    stmt = select(Game).where(Game.id == game_id)
-    result = await db.execute(stmt)
-    game = result.scalars().first()
+    # one statement: bank questions outer-joined in slot order (or the legacy blob),
+    # shared by identical concurrent requests (same engine: replica or primary)
+    game = await single_flight.do((db.bind, "game", game_id), lambda: load_game_payload(db, Game.id == game_id))
 
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    return _build_game_response(game.id, game.questions_json)
+    return _build_game_response(request, game)
 
 
 @router.put("/{game_id}", response_model=GameRead, summary="(Admin) Update an existing game via AI prompt")
 async def update_game(
         game_id: int,
         payload: GameUpdate,
+        request: Request,
         _admin_key: str = Depends(get_admin_key),
         db: AsyncSession = Depends(get_db)
 ):
-    # 1) fetch existing game
-    result = await db.execute(select(Game).where(Game.id == game_id))
-    game: Game = result.scalars().first()
-    if not game:
+    # 1) fetch existing questions
+    existing = await load_game_payload(db, Game.id == game_id)
+    if existing is None:
         raise HTTPException(status_code=404, detail="Game not found")
+    existing_json = existing.payload
 
     # 2) call AI to update questions
-    existing_json = game.questions_json
-    questions, bonus, new_hash = await update_game_questions(existing_json, payload.prompt)
-
-    # 3) update DB record
-    updated_payload = {
-        "questions": [q.model_dump() for q in questions],
-        "bonus_question": bonus.model_dump() if bonus else None
-    }
-    game.questions_json = updated_payload
-    game.questions_hash = new_hash
-    await db.commit()
-    await db.refresh(game)
+    with generation_ledger.scope() as run:
+        run.game_id = game_id
+        questions, bonus, new_hash = await update_game_questions(existing_json, payload.prompt)
 
-    # 4) build response
-    return GameRead(
-        game_id=game.id,
-        questions=questions,
-        bonus_question=bonus
+    # 3) flag reworded copies of other stored questions (the admin asked for this edit: no retry)
+    updated = encode_game(GameQuestions(questions=questions, bonus_question=bonus))
+    updated_payload = updated.payload
+    own = {question_hash(q) for q in payload_questions(existing_json)}
+    log_near_duplicates(game_id, await near_duplicates.find(db, updated_payload, ignore=own))
+
+    # 4) update DB record
+    await db.execute(
+        update(Game)
+        .where(Game.id == game_id)
+        .values(questions_json=None, questions_hash=new_hash)
     )
+    await replace_game_questions(db, game_id, updated_payload)
+    await db.commit()
+    await invalidation_bus.publish(f"game:{game_id}")
+    near_duplicates.add(updated_payload)
+
+    # 5) build response from the same encoding
+    response = _game_response(request, game_id, new_hash, lambda: updated.canonical)
+    mark_primary_reads(response)
+    return response
 
 
 @router.get(
@@ -177,9 +256,57 @@ async def update_game(
 )
 async def game_exists(
         game_id: int,
+        db: AsyncSession = Depends(get_read_db)
+):
+    # listed in the shared snapshot: no query; anything else is checked in the table
+    if shared_snapshot.has_game(game_id):
+        return ExistsResponse(exists=True)
+    # primary-key probe; never touches the row's columns
+    result = await db.execute(select(exists().where(Game.id == game_id)))
+    return ExistsResponse(exists=result.scalar_one())
+
+
+QuestionBodies = Tuple[List[bytes], Optional[bytes]]
+
+
+async def _question_bodies(game_id: int, db: AsyncSession) -> QuestionBodies:
+    """
+    Every question of the game encoded on its own, extracted once per game and cached.
+    Read from the primary: a lagging replica would keep old questions cached for the TTL.
+    """
+    bodies = game_question_cache.get(game_id)
+    if bodies is None:
+        game = await load_game_payload(db, Game.id == game_id)
+        if not game:
+            raise HTTPException(status_code=404, detail="Game not found")
+        bonus = game.payload.get("bonus_question")
+        bodies = (
+            [orjson.dumps(q, option=orjson.OPT_SORT_KEYS) for q in game.payload["questions"]],
+            orjson.dumps(bonus, option=orjson.OPT_SORT_KEYS) if bonus else None,
+        )
+        game_question_cache.set(game_id, bodies)
+    return bodies
+
+
+@router.get(
+    "/{game_id}/questions/{index}",
+    response_model=Question,
+    summary="One question of a game (0-based), for loading a game as it is played"
+)
+async def get_game_question(
+        game_id: int,
+        index: int = Path(ge=0),
         db: AsyncSession = Depends(get_db)
 ):
-    stmt = select(func.count()).select_from(Game).where(Game.id == game_id)
-    result = await db.execute(stmt)
-    count = result.scalar_one()
-    return ExistsResponse(exists=bool(count))
+    questions, _ = await _question_bodies(game_id, db)
+    if index >= len(questions):
+        raise HTTPException(status_code=404, detail="Question not found")
+    return Response(questions[index], media_type="application/json")
+
+
+@router.get("/{game_id}/bonus", response_model=Question, summary="The bonus question of a game")
+async def get_game_bonus(game_id: int, db: AsyncSession = Depends(get_db)):
+    _, bonus = await _question_bodies(game_id, db)
+    if bonus is None:
+        raise HTTPException(status_code=404, detail="Game has no bonus question")
+    return Response(bonus, media_type="application/json")
@@ -1,62 +1,361 @@
 # app/routers/leaderboard.py
-from fastapi import APIRouter, Depends
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from typing import List
+from sqlalchemy import and_, or_, select, func, true, union_all
+from sqlalchemy.orm import aliased
+from typing import List, Literal, Optional, Tuple
 
-from ..deps import get_db
-from ..models import Player, Score
-from ..schemas import LeaderboardEntry
+from ..deps import get_db, get_read_db, reads_from_primary
+from ..models import Game, Player, Score, ScoreSummary
+from ..schemas import LeaderboardEntry, PlayerRank
+from ..services.cache import game_leaderboard_cache
+from ..services.live_leaderboard import live_leaderboard
+from ..services.ranking import rank_index
+from ..services.rollups import build_window_leaderboard_query, window_rank
+from ..services.single_flight import single_flight
+from ..services.snapshot import shared_snapshot
 
 router = APIRouter()
+# mounted under /games
+game_router = APIRouter()
+
+# rows cached per game; any `limit` up to this is served from the cache
+GAME_LEADERBOARD_SIZE = 100
+
+
+def _best_raw_subquery(dialect_name: str):
+    """Each player's best raw score row. Served from ix_scores_player_score."""
+    if dialect_name == "postgresql":
+        # DISTINCT ON walks the (player_id, score DESC, played_at) index once
+        return (
+            select(
+                Score.player_id,
+                Score.score.label("best"),
+                Score.game_id,
+                Score.played_at,
+                Score.id.label("score_id"),
+            )
+            .distinct(Score.player_id)
+            .order_by(Score.player_id, Score.score.desc(), Score.played_at, Score.id)
+            .subquery()
+        )
+
+    # portable fallback (SQLite): one index seek per player for the id of its best row;
+    # a row_number() window over all scores is ~30x slower on SQLite at 1M rows
+    top = aliased(Score)
+    best_id = (
+        select(top.id)
+        .where(top.player_id == Player.id)
+        .order_by(top.score.desc(), top.played_at, top.id)
+        .limit(1)
+        .correlate(Player)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Player.id.label("player_id"),
+            Score.score.label("best"),
+            Score.game_id,
+            Score.played_at,
+            Score.id.label("score_id"),
+        )
+        .select_from(Player)
+        .join(Score, Score.id == best_id)
+        .subquery()
+    )
+
+
+def _best_summary_subquery(dialect_name: str):
+    """Each player's best compacted score. Served from ix_score_summaries_player_best."""
+    order = (ScoreSummary.best.desc(), ScoreSummary.best_played_at, ScoreSummary.best_score_id)
+    columns = (
+        ScoreSummary.player_id,
+        ScoreSummary.best,
+        ScoreSummary.game_id,
+        ScoreSummary.best_played_at.label("played_at"),
+        ScoreSummary.best_score_id.label("score_id"),
+    )
+    if dialect_name == "postgresql":
+        return (
+            select(*columns)
+            .distinct(ScoreSummary.player_id)
+            .order_by(ScoreSummary.player_id, *order)
+            .subquery()
+        )
+
+    top = aliased(ScoreSummary)
+    best_game = (
+        select(top.game_id)
+        .where(top.player_id == Player.id)
+        .order_by(top.best.desc(), top.best_played_at, top.best_score_id)
+        .limit(1)
+        .correlate(Player)
+        .scalar_subquery()
+    )
+    return (
+        select(*columns)
+        .select_from(Player)
+        .join(ScoreSummary, and_(ScoreSummary.player_id == Player.id, ScoreSummary.game_id == best_game))
+        .subquery()
+    )
+
+
+def best_scores_subquery(dialect_name: str):
+    """
+    One row per player: their best score and the game/time it was first set
+    (ties go to the earliest attempt), over raw scores and compacted
+    summaries alike. Each side contributes at most one row per player.
+    """
+    candidates = union_all(
+        select(_best_raw_subquery(dialect_name)),
+        select(_best_summary_subquery(dialect_name)),
+    ).subquery()
+    order = (candidates.c.best.desc(), candidates.c.played_at, candidates.c.score_id)
+
+    if dialect_name == "postgresql":
+        return (
+            select(candidates)
+            .distinct(candidates.c.player_id)
+            .order_by(candidates.c.player_id, *order)
+            .subquery()
+        )
+
+    ranked = select(
+        candidates,
+        func.row_number().over(partition_by=candidates.c.player_id, order_by=order).label("rn"),
+    ).subquery()
+    return (
+        select(ranked.c.player_id, ranked.c.best, ranked.c.game_id, ranked.c.played_at, ranked.c.score_id)
+        .where(ranked.c.rn == 1)
+        .subquery()
+    )
+
+
+def build_leaderboard_query(limit: Optional[int], dialect_name: str,
+                            after: Optional[Tuple[int, int]] = None):
+    """
+    Best score per player, with the game and time it was set, highest first.
+    `after` is a (best, player_id) keyset cursor.
+    """
+    best = best_scores_subquery(dialect_name)
+    stmt = (
+        select(
+            best.c.player_id,
+            Player.name.label("player"),
+            best.c.best,
+            best.c.game_id,
+            best.c.played_at,
+        )
+        .select_from(best)
+        .join(Player, Player.id == best.c.player_id)  # type: ignore[arg-type]
+        .order_by(best.c.best.desc(), best.c.player_id)
+        .limit(limit)
+    )
+    if after is not None:
+        after_best, after_player_id = after
+        stmt = stmt.where(or_(
+            best.c.best < after_best,
+            and_(best.c.best == after_best, best.c.player_id > after_player_id),
+        ))
+    return stmt
+
+
+def _entry(r) -> dict:
+    return {
+        "player_id": r.player_id,
+        "player": r.player,
+        "best": r.best,
+        "game_id": r.game_id,
+        "played_at": r.played_at,
+    }
+
+
+async def ensure_rank_index(db: AsyncSession) -> None:
+    await rank_index.ensure(db, build_leaderboard_query(None, db.bind.dialect.name))
 
 
 @router.get("/", response_model=List[LeaderboardEntry])
 async def get_leaderboard(
+        request: Request,
         limit: int = 10,
+        window: Literal["day", "week", "all"] = "all",
+        after_best: Optional[int] = None,
+        after_player_id: Optional[int] = None,
+        db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Best score per player, highest first. Pass the `best` and `player_id`
+    of the last entry as `after_best` / `after_player_id` for the next page.
+    """
+    if (after_best is None) != (after_player_id is None):
+        raise HTTPException(status_code=422, detail="after_best and after_player_id go together")
+    after = (after_best, after_player_id) if after_best is not None else None
+
+    if window == "all":
+        # first page from the shared snapshot when one is configured and fresh,
+        # unless the client just wrote and must read its own writes
+        top = None
+        if after is None and not reads_from_primary(request):
+            top = shared_snapshot.leaderboard(limit)
+        if top is not None:
+            return top
+        # later pages read the same query as page 1 (not this worker's rank
+        # index), so paging never skips or repeats a player between workers
+        stmt = build_leaderboard_query(limit, db.bind.dialect.name, after=after)
+    else:
+        # current UTC day / ISO week, read from its rollup bucket
+        stmt = build_window_leaderboard_query(window, limit, after=after)
+
+    async def load() -> List[dict]:
+        result = await db.execute(stmt)
+        # map to dicts for Pydantic
+        return [_entry(r) for r in result.all()]
+
+    # identical concurrent requests (same engine: replica or primary) share one query
+    return await single_flight.do((db.bind, "leaderboard", window, limit, after), load)
+
+
+@router.get(
+    "/player/{name}",
+    response_model=PlayerRank,
+    summary="A player's rank, best score and the entries around them"
+)
+async def get_player_rank(
+        name: str,
+        window: Literal["day", "week", "all"] = "all",
+        radius: int = Query(5, ge=0, le=50),
         db: AsyncSession = Depends(get_db)
 ):
-    # 1. subquery: best score per player
-    subq = (
+    if window == "all":
+        await ensure_rank_index(db)
+        found = rank_index.rank(name, radius)
+    else:
+        found = await window_rank(db, window, name, radius)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Player has no score on this leaderboard")
+    entry, around = found
+    return {**entry, "around": around}
+
+
+async def load_live_top(db: AsyncSession, size: int) -> List[dict]:
+    result = await db.execute(build_leaderboard_query(size, db.bind.dialect.name))
+    return [_entry(r) for r in result.all()]
+
+
+@router.websocket("/ws")
+async def live_leaderboard_ws(websocket: WebSocket):
+    """
+    Sends {"type": "snapshot", "entries": [...]} once, then
+    {"type": "diff", "changed": [...], "removed": [...], "size": n} whenever
+    the all-time top-N changes. A snapshot may be resent at any time if
+    the client fell behind; `version` increases with every message.
+    """
+    await websocket.accept()
+    sub = await live_leaderboard.subscribe(load_live_top)
+
+    async def pump():
+        while True:
+            await websocket.send_text(await sub.get())
+
+    sender = asyncio.create_task(pump())
+    try:
+        # clients do not send anything; this only waits for the disconnect
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        sender.cancel()
+        live_leaderboard.unsubscribe(sub)
+
+
+def build_game_leaderboard_query(game_id: int, limit: int):
+    """
+    Best score per player on one game, highest first, over raw scores
+    (ix_scores_game_score range) and compacted summaries (one row per player).
+    Joined onto the game row: no row at all means no such game, and a game
+    without scores yields one row of NULLs.
+    """
+    candidates = union_all(
         select(
             Score.player_id,
-            func.max(Score.score).label("best_score")
+            Score.score,
+            Score.played_at,
+            Score.id.label("score_id"),
+        ).where(Score.game_id == game_id),
+        select(
+            ScoreSummary.player_id,
+            ScoreSummary.best,
+            ScoreSummary.best_played_at,
+            ScoreSummary.best_score_id,
+        ).where(ScoreSummary.game_id == game_id),
+    ).subquery()
+    ranked = (
+        select(
+            candidates.c.player_id,
+            candidates.c.score,
+            candidates.c.played_at,
+            func.row_number().over(
+                partition_by=candidates.c.player_id,
+                order_by=(candidates.c.score.desc(), candidates.c.played_at, candidates.c.score_id),
+            ).label("rn"),
         )
-        .group_by(Score.player_id)
         .subquery()
     )
-
-    # 2. join Player → subq → Score to fetch the game_id and played_at for that best_score
-    query = (
+    board = (
         select(
             Player.name.label("player"),
-            subq.c.best_score.label("best"),
-            Score.game_id.label("game_id"),
-            Score.played_at.label("played_at"),
+            ranked.c.score.label("best"),
+            ranked.c.played_at,
+            ranked.c.player_id,
         )
-        .select_from(Player)
-        .join(subq, Player.id == subq.c.player_id)  # type: ignore[arg-type]
-        .join(
-            Score,
-            and_(
-                Score.player_id == subq.c.player_id,
-                Score.score == subq.c.best_score,
-            )
-        )
-        .order_by(subq.c.best_score.desc())
+        .select_from(ranked)
+        .join(Player, Player.id == ranked.c.player_id)  # type: ignore[arg-type]
+        .where(ranked.c.rn == 1)
+        .order_by(ranked.c.score.desc(), ranked.c.player_id)
         .limit(limit)
+        .subquery()
     )
+    return (
+        select(board.c.player, board.c.best, board.c.played_at)
+        .select_from(Game)
+        .outerjoin(board, true())
+        .where(Game.id == game_id)
+        .order_by(board.c.best.desc(), board.c.player_id)
+    )
+
 
-    result = await db.execute(query)
-    rows = result.all()
+@game_router.get(
+    "/{game_id}/leaderboard",
+    response_model=List[LeaderboardEntry],
+    summary="Top scores on one game (best per player)"
+)
+async def get_game_leaderboard(
+        game_id: int,
+        limit: int = Query(10, ge=1, le=GAME_LEADERBOARD_SIZE),
+        db: AsyncSession = Depends(get_db)
+):
+    async def load() -> List[dict]:
+        result = (await db.execute(build_game_leaderboard_query(game_id, GAME_LEADERBOARD_SIZE))).all()
+        if not result:
+            raise HTTPException(status_code=404, detail="Game not found")
+        loaded = [
+            {
+                "player": r.player,
+                "best": r.best,
+                "game_id": game_id,
+                "played_at": r.played_at,
+            }
+            for r in result
+            if r.player is not None
+        ]
+        game_leaderboard_cache.set(game_id, loaded)
+        return loaded
 
-    # 3. map to dicts for Pydantic
-    return [
-        {
-            "player": r.player,
-            "best": r.best,
-            "game_id": r.game_id,
-            "played_at": r.played_at,
-        }
-        for r in rows
-    ]
+    rows = game_leaderboard_cache.get(game_id)
+    if rows is None:
+        # a burst of misses (new game, expired entry) runs the query once
+        rows = await single_flight.do((db.bind, "game_leaderboard", game_id), load)
+    return rows[:limit]
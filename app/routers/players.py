@@ -0,0 +1,36 @@
+# app/routers/players.py
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from ..deps import get_db
+from ..models import Player, PlayerStats
+from ..schemas import PlayerStatsRead
+
+router = APIRouter()
+
+
+@router.get("/{name}/stats", response_model=PlayerStatsRead, summary="A player's lifetime statistics")
+async def get_player_stats(
+        name: str,
+        db: AsyncSession = Depends(get_db)
+):
+    # one primary-key row, however many scores the player has
+    result = await db.execute(
+        select(Player.name, PlayerStats)
+        .join(PlayerStats, PlayerStats.player_id == Player.id)  # type: ignore[arg-type]
+        .where(Player.name == name)
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    stats = row.PlayerStats
+    return {
+        "player": row.name,
+        "games_played": stats.games_played,
+        "distinct_games": stats.distinct_games,
+        "best": stats.best,
+        "average": round(stats.total_score / stats.games_played, 2),
+        "last_played_at": stats.last_played_at,
+    }
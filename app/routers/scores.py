@@ -1,45 +1,146 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Date, DateTime, Integer, String, func, select, insert, literal, union_all
 
+from ..db import dialect_insert
 from ..deps import get_db
-from ..models import Game, Player, Score
+from ..models import Game, LeaderboardRollup, Player, PlayerGame, PlayerStats, Score
 from ..schemas import ScoreCreate
+from ..services.cache import game_leaderboard_cache
+from ..services.invalidation import invalidation_bus
+from ..services import player_stats
+from ..services.live_leaderboard import live_leaderboard
+from ..services.ranking import rank_index
+from ..services.rollups import PERIODS, bucket_start, bucket_upsert, record_score, utcnow
 
 router = APIRouter()
 
 
+def submit_statement(player_name: str, game_id: int, score: int, played_at: datetime):
+    """
+    Postgres: the whole submission as one statement of data-modifying CTEs
+    (player, score, day/week buckets, player_games pair, player_stats).
+    They share one snapshot and see each other only through RETURNING.
+    Yields (score id, player id), or no row when the game does not exist or
+    the player was just created by a transaction this snapshot cannot see.
+    """
+    new_player = (
+        postgresql.insert(Player).values(name=player_name)
+        .on_conflict_do_nothing(index_elements=[Player.name])
+        .returning(Player.id)
+        .cte("new_player")
+    )
+    # a new row comes from the insert; an existing one (left untouched) from the lookup
+    player = union_all(
+        select(new_player.c.id),
+        select(Player.id).where(Player.name == player_name),
+    ).cte("player")
+    new_score = (
+        insert(Score)
+        .from_select(
+            ["player_id", "game_id", "score", "played_at"],
+            select(player.c.id, Game.id, literal(score, Integer), literal(played_at, DateTime))
+            .where(Game.id == game_id)
+            .limit(1)
+        )
+        .returning(Score.id, Score.player_id)
+        .cte("new_score")
+    )
+    buckets = bucket_upsert(postgresql.insert(LeaderboardRollup).from_select(
+        ["period", "bucket_start", "player_id", "best", "game_id", "played_at"],
+        union_all(*(
+            select(literal(period, String), literal(bucket_start(period, played_at), Date), new_score.c.player_id,
+                   literal(score, Integer), literal(game_id, Integer), literal(played_at, DateTime))
+            for period in PERIODS
+        )),
+    )).cte("buckets")
+    first_attempt = (
+        postgresql.insert(PlayerGame)
+        .from_select(["player_id", "game_id"], select(new_score.c.player_id, literal(game_id, Integer)))
+        .on_conflict_do_nothing(index_elements=[PlayerGame.player_id, PlayerGame.game_id])
+        .returning(PlayerGame.player_id)
+        .cte("first_attempt")
+    )
+    stats = player_stats.stats_upsert(postgresql.insert(PlayerStats).from_select(
+        ["player_id", "games_played", "distinct_games", "total_score", "best", "last_played_at"],
+        select(
+            new_score.c.player_id,
+            literal(1, Integer),
+            select(func.count()).select_from(first_attempt).scalar_subquery(),
+            literal(score, Integer),
+            literal(score, Integer),
+            literal(played_at, DateTime),
+        ),
+    )).cte("stats")
+    return select(new_score.c.id, new_score.c.player_id).add_cte(buckets, stats)
+
+
+async def _submit_statements(db: AsyncSession, player_name: str, game_id: int, score: int,
+                             played_at: datetime) -> Optional[int]:
+    """The same submission one statement at a time (SQLite, and the rare Postgres misses); the player id."""
+    # Create the player if new; an existing row is left untouched (no dead tuple or row lock
+    # per submission), so RETURNING is empty and its id is read back
+    player_id = (await db.execute(
+        dialect_insert(db)(Player)
+        .values(name=player_name)
+        .on_conflict_do_nothing(index_elements=[Player.name])
+        .returning(Player.id)
+    )).scalar_one_or_none()
+    if player_id is None:
+        player_id = (await db.execute(
+            select(Player.id).where(Player.name == player_name)
+        )).scalar_one()
+
+    # Create score, only if the game exists; the get_db rollback undoes the player insert otherwise
+    result = await db.execute(
+        insert(Score)
+        .from_select(
+            ["player_id", "game_id", "score", "played_at"],
+            select(literal(player_id), Game.id, literal(score), literal(played_at))
+            .where(Game.id == game_id)
+        )
+        .returning(Score.id)
+    )
+    if result.scalar_one_or_none() is None:
+        return None
+
+    # fold it into the day/week leaderboard buckets and the player's stats row
+    await record_score(db, player_id, game_id, score, played_at)
+    await player_stats.record_score(db, player_id, game_id, score, played_at)
+    return player_id
+
+
 @router.post("/{game_id}/score", status_code=201)
 async def submit_score(
         game_id: int,
         score_data: ScoreCreate,
+        background_tasks: BackgroundTasks,
         db: AsyncSession = Depends(get_db)
 ):
     """Submit a score for a game"""
-    # Verify game exists
-    result = await db.execute(select(Game).where(Game.id == game_id))
-    game = result.scalars().first()
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+    played_at = utcnow()
+    row = None
+    if db.bind.dialect.name == "postgresql":
+        row = (await db.execute(submit_statement(score_data.player_name, game_id, score_data.score, played_at))).first()
+    if row is not None:
+        player_id = row.player_id
+    else:
+        # also tells a missing game apart from a player row the one-statement snapshot could not see
+        player_id = await _submit_statements(db, score_data.player_name, game_id, score_data.score, played_at)
+        if player_id is None:
+            raise HTTPException(status_code=404, detail="Game not found")
 
-    # Find or create player
-    result = await db.execute(
-        select(Player).where(Player.name == score_data.player_name)
-    )
-    player = result.scalars().first()
-
-    if not player:
-        player = Player(name=score_data.player_name)
-        db.add(player)
-        await db.flush()  # Generate ID without committing transaction
-
-    # Create score
-    new_score = Score(
-        player_id=player.id,
-        game_id=game_id,
-        score=score_data.score
+    # drop this game's cached leaderboard now, and again (on every worker) once get_db has committed,
+    # so a read racing the commit cannot re-cache the old ranking
+    game_leaderboard_cache.invalidate(game_id)
+    background_tasks.add_task(invalidation_bus.publish, f"game_leaderboard:{game_id}")
+    background_tasks.add_task(
+        rank_index.offer, player_id, score_data.player_name, score_data.score, game_id, played_at
     )
-    db.add(new_score)
-    # Removed redundant db.commit(); commit is handled by get_db dependency
+    background_tasks.add_task(live_leaderboard.notify)
 
     return {"message": "Score submitted successfully"}
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Literal, Optional
+from datetime import date, datetime
 
 
 class Question(BaseModel):
@@ -12,10 +12,16 @@ class Question(BaseModel):
     hint: Optional[str]
 
 
+class GameQuestions(BaseModel):
+    """A game's questions without its id: AI output and the stored payload"""
+    questions: List[Question]
+    bonus_question: Optional[Question] = None
+
+
 class GameCreate(BaseModel):
-    """(reserved) additional options for game creation (e.g. category, difficulty)"""
-    # no fields yet
-    pass
+    """Options for game creation"""
+    # "generate": new questions from OpenAI; "assemble": reuse questions from the bank
+    mode: Literal["generate", "assemble"] = "generate"
 
 
 class GameRead(BaseModel):
@@ -41,7 +47,60 @@ class LeaderboardEntry(BaseModel):
     best: int
     game_id: int
     played_at: Optional[datetime]
+    # with `best`, the keyset cursor for the next page
+    player_id: Optional[int] = None
+
+
+class RankedEntry(LeaderboardEntry):
+    rank: int
+
+
+class PlayerRank(RankedEntry):
+    around: List[RankedEntry]
+
+
+class PlayerStatsRead(BaseModel):
+    player: str
+    games_played: int
+    distinct_games: int
+    best: int
+    average: float
+    last_played_at: datetime
 
 
 class ExistsResponse(BaseModel):
     exists: bool
+
+
+class GenerationStats(BaseModel):
+    """Per-day, per-model aggregate of the AI call ledger."""
+    day: date
+    model: str
+    runs: int
+    failures: int
+    latency_p50_ms: float
+    latency_p90_ms: float
+    latency_p99_ms: float
+    latency_max_ms: float
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+
+
+class CompressionStatsRead(BaseModel):
+    responses: int
+    bytes_in: int
+    bytes_out: int
+    bytes_saved: int
+    cpu_ms: float
+    cache_hits: int
+    cache_misses: int
+
+
+class ProfileSummary(BaseModel):
+    profile_id: str
+    method: str
+    path: str
+    started_at: datetime
+    duration_ms: float
+    samples: int
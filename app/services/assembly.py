@@ -0,0 +1,155 @@
+# app/services/assembly.py
+"""
+Builds new games from questions already in the bank instead of asking
+OpenAI: one question per difficulty 1–15, at most two per category, plus
+a difficulty 8–10 bonus.
+"""
+import asyncio
+import random
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..models import QuestionRecord
+from .question_bank import EncodedGame, GamePayload, decode_game, payload_questions, question_hash
+
+DIFFICULTIES = range(1, 16)
+BONUS_DIFFICULTIES = range(8, 11)
+MAX_PER_CATEGORY = 2
+# a greedy draw can paint itself into a corner on a sparse bank; retry a few times
+DRAW_ATTEMPTS = 20
+
+
+class QuestionPool:
+    """
+    The bank indexed by difficulty, then category, held in memory so a
+    draw runs no queries.
+
+    Loaded lazily, extended in place with this worker's new questions and
+    reloaded once older than `max_age` to pick up other workers' games.
+    The last `recent_size` drawn questions are skipped while the bank can
+    still fill a game without them.
+    """
+
+    def __init__(self, max_age: float = 300.0, recent_size: int = 500, rng: Optional[random.Random] = None):
+        self.max_age = max_age
+        self.rng = rng or random.Random()
+        self._index: Dict[int, Dict[str, List[str]]] = {}
+        self._bodies: Dict[str, dict] = {}
+        self._recent: Deque[str] = deque(maxlen=recent_size)
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    # ── loading ──────────────────────────────────────────────────────────
+    def _fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.max_age
+
+    def _insert(self, content_hash: str, difficulty: int, category: str, body: dict) -> None:
+        if content_hash in self._bodies:
+            return
+        self._bodies[content_hash] = body
+        self._index.setdefault(difficulty, {}).setdefault(category, []).append(content_hash)
+
+    async def ensure(self, db: AsyncSession) -> None:
+        if self._fresh():
+            return
+        async with self._lock:
+            if self._fresh():
+                return
+            rows = (await db.execute(select(
+                QuestionRecord.content_hash, QuestionRecord.difficulty,
+                QuestionRecord.category, QuestionRecord.body,
+            ))).all()
+            self._index, self._bodies = {}, {}
+            for r in rows:
+                self._insert(r.content_hash, r.difficulty, r.category, r.body)
+            self._loaded_at = time.monotonic()
+
+    def add(self, payload: GamePayload) -> None:
+        """Index the questions of a game this worker just stored."""
+        if self._loaded_at is None:
+            return
+        for q in payload_questions(payload):
+            self._insert(question_hash(q), q["difficulty"], q["category"], q)
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def reset(self) -> None:
+        self._index = {}
+        self._bodies = {}
+        self._recent.clear()
+        self._loaded_at = None
+
+    # ── drawing ──────────────────────────────────────────────────────────
+    def _draw(self, exclude: Set[str]) -> Optional[Tuple[List[str], str]]:
+        rng = self.rng
+        # scarcest difficulties first, while every category is still open to them
+        order = sorted(DIFFICULTIES, key=lambda d: (len(self._index.get(d, ())), rng.random()))
+        per_category: Counter = Counter()
+        picks: Dict[int, str] = {}
+        for difficulty in order:
+            by_category = self._index.get(difficulty, {})
+            categories = [c for c in by_category if per_category[c] < MAX_PER_CATEGORY]
+            rng.shuffle(categories)
+            for category in categories:
+                candidates = [h for h in by_category[category] if h not in exclude]
+                if candidates:
+                    picks[difficulty] = rng.choice(candidates)
+                    per_category[category] += 1
+                    break
+            else:
+                return None
+
+        chosen = set(picks.values())
+        bonus = [
+            h
+            for difficulty in BONUS_DIFFICULTIES
+            for hashes in self._index.get(difficulty, {}).values()
+            for h in hashes
+            if h not in exclude and h not in chosen
+        ]
+        if not bonus:
+            return None
+        return [picks[d] for d in DIFFICULTIES], rng.choice(bonus)
+
+    def _draw_any(self, exclude: Set[str]) -> Optional[Tuple[List[str], str]]:
+        for _ in range(DRAW_ATTEMPTS):
+            drawn = self._draw(exclude)
+            if drawn is not None:
+                return drawn
+        return None
+
+    async def draw(self, db: AsyncSession) -> Optional[GamePayload]:
+        """A new game payload from the bank, or None if the bank cannot fill one."""
+        await self.ensure(db)
+        # recently used questions are avoided, not forbidden
+        drawn = self._draw_any(set(self._recent)) or self._draw_any(set())
+        if drawn is None:
+            return None
+        picks, bonus = drawn
+        self._recent.extend(picks)
+        self._recent.append(bonus)
+        return {
+            "questions": [self._bodies[h] for h in picks],
+            "bonus_question": self._bodies[bonus],
+        }
+
+
+question_pool = QuestionPool(
+    max_age=settings.QUESTION_POOL_MAX_AGE_SECONDS,
+    recent_size=settings.QUESTION_POOL_RECENT_SIZE,
+)
+
+
+async def assemble_game(db: AsyncSession) -> EncodedGame:
+    """Assemble a game from the bank, encoded like a generated one"""
+    payload = await question_pool.draw(db)
+    if payload is None:
+        raise HTTPException(409, "Not enough questions in the bank to assemble a game")
+    return decode_game(payload)
@@ -0,0 +1,56 @@
+# app/services/cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from ..config import settings
+from .invalidation import invalidation_bus
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache whose entries expire `ttl` seconds after
+    being set. Not shared between workers: keep TTLs short.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# top scores per game, keyed by game id
+game_leaderboard_cache = TTLCache(ttl=settings.GAME_LEADERBOARD_TTL_SECONDS)
+
+# each question of a game encoded separately, keyed by game id: [question bytes, ...], bonus bytes or None
+game_question_cache = TTLCache(ttl=settings.GAME_QUESTION_CACHE_TTL_SECONDS,
+                               max_entries=settings.GAME_QUESTION_CACHE_SIZE)
+
+invalidation_bus.subscribe("game", lambda key: game_question_cache.invalidate(int(key)))
+invalidation_bus.subscribe("game_leaderboard", lambda key: game_leaderboard_cache.invalidate(int(key)))
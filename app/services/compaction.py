@@ -0,0 +1,187 @@
+# app/services/compaction.py
+"""
+Folds raw scores older than the retention window into score_summaries
+(one row per player and game) and deletes them, in bounded batches of
+short transactions. Leaderboards read raw scores and summaries together,
+and a summary keeps the time and id of its best attempt, so results and
+tie-breaks are unchanged by compaction.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from ..config import settings
+from ..db import AsyncSessionLocal, dialect_insert
+from ..models import Score, ScoreSummary
+from .rollups import prune_buckets, utcnow
+
+logger = logging.getLogger(__name__)
+
+# day/week buckets are rebuilt from raw scores when a game is deleted,
+# so raw rows must outlive the oldest bucket a window can read
+MIN_RETENTION_DAYS = 8
+
+
+def fold(rows: Iterable[Any]) -> Dict[Tuple[int, int], Dict[str, Any]]:
+    """Summaries of raw (id, player_id, game_id, score, played_at) rows per (player, game)."""
+    summaries: Dict[Tuple[int, int], Dict[str, Any]] = {}
+    for r in rows:
+        key = (r.player_id, r.game_id)
+        s = summaries.get(key)
+        if s is None:
+            summaries[key] = {
+                "player_id": r.player_id,
+                "game_id": r.game_id,
+                "attempts": 1,
+                "total_score": r.score,
+                "best": r.score,
+                "best_played_at": r.played_at,
+                "best_score_id": r.id,
+                "last_played_at": r.played_at,
+            }
+            continue
+        s["attempts"] += 1
+        s["total_score"] += r.score
+        s["last_played_at"] = max(s["last_played_at"], r.played_at)
+        if (-r.score, r.played_at, r.id) < (-s["best"], s["best_played_at"], s["best_score_id"]):
+            s["best"], s["best_played_at"], s["best_score_id"] = r.score, r.played_at, r.id
+    return summaries
+
+
+async def compact_batch(db: AsyncSession, cutoff: datetime, batch_size: int) -> int:
+    """Move up to `batch_size` of the oldest raw scores before `cutoff` into summaries."""
+    oldest = aliased(Score)
+    moved = (await db.execute(
+        delete(Score)
+        .where(Score.id.in_(
+            # a range of ix_scores_played_at: a short or empty last batch stops at the
+            # cutoff instead of walking the rest of the table
+            select(oldest.id)
+            .where(oldest.played_at < cutoff)
+            .order_by(oldest.played_at, oldest.id)
+            .limit(batch_size)
+        ))
+        .returning(Score.id, Score.player_id, Score.game_id, Score.score, Score.played_at)
+    )).all()
+    if not moved:
+        return 0
+
+    stmt = dialect_insert(db)(ScoreSummary).values(list(fold(moved).values()))
+    new = stmt.excluded
+    # same order as the leaderboard: higher score, then earlier attempt, then lower id
+    better = or_(
+        new.best > ScoreSummary.best,
+        and_(
+            new.best == ScoreSummary.best,
+            or_(
+                new.best_played_at < ScoreSummary.best_played_at,
+                and_(
+                    new.best_played_at == ScoreSummary.best_played_at,
+                    new.best_score_id < ScoreSummary.best_score_id,
+                ),
+            ),
+        ),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ScoreSummary.player_id, ScoreSummary.game_id],
+        set_={
+            "attempts": ScoreSummary.attempts + new.attempts,
+            "total_score": ScoreSummary.total_score + new.total_score,
+            "best": case((better, new.best), else_=ScoreSummary.best),
+            "best_played_at": case((better, new.best_played_at), else_=ScoreSummary.best_played_at),
+            "best_score_id": case((better, new.best_score_id), else_=ScoreSummary.best_score_id),
+            "last_played_at": case(
+                (new.last_played_at > ScoreSummary.last_played_at, new.last_played_at),
+                else_=ScoreSummary.last_played_at,
+            ),
+        },
+    )
+    await db.execute(stmt)
+    return len(moved)
+
+
+async def compact(session_factory, cutoff: datetime, batch_size: int = 5_000, pause: float = 0.0) -> int:
+    """Compact everything before `cutoff`, one transaction per batch; returns rows moved."""
+    total = 0
+    while True:
+        async with session_factory() as session:
+            moved = await compact_batch(session, cutoff, batch_size)
+            await session.commit()
+        total += moved
+        if moved < batch_size:
+            return total
+        logger.info("Compacted %d raw scores so far", total)
+        # let submissions interleave with a long backlog
+        await asyncio.sleep(pause)
+
+
+def retention_cutoff(retention_days: int, now: Optional[datetime] = None) -> datetime:
+    if retention_days < MIN_RETENTION_DAYS:
+        raise ValueError(f"score retention must be at least {MIN_RETENTION_DAYS} days")
+    return (now or utcnow()) - timedelta(days=retention_days)
+
+
+class ScoreCompactor:
+    """
+    Every `interval` seconds, prunes expired day/week buckets and (when
+    `retention_days` is set) runs `compact` for scores older than it.
+    """
+
+    def __init__(self, retention_days: Optional[int], batch_size: int = 5_000, interval: float = 3600.0,
+                 pause: float = 0.05, session_factory=AsyncSessionLocal):
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pause = pause
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        async with self.session_factory() as session:
+            pruned = await prune_buckets(session, now)
+            await session.commit()
+        if pruned:
+            logger.info("Pruned %d expired leaderboard buckets", pruned)
+        if self.retention_days is None:
+            return 0
+
+        cutoff = retention_cutoff(self.retention_days, now)
+        moved = await compact(self.session_factory, cutoff, self.batch_size, self.pause)
+        if moved:
+            logger.info("Compacted %d raw scores played before %s", moved, cutoff)
+        return moved
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Score compaction failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.retention_days is not None:
+            retention_cutoff(self.retention_days)  # fail fast on a too-short retention
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+score_compactor = ScoreCompactor(
+    retention_days=settings.SCORE_RETENTION_DAYS,
+    batch_size=settings.SCORE_COMPACTION_BATCH_SIZE,
+    interval=settings.SCORE_COMPACTION_INTERVAL_SECONDS,
+)
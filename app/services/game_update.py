@@ -1,16 +1,16 @@
 import json
-import hashlib
 import textwrap
+import time
 from typing import List, Optional, Tuple, Union, Any
 
 from fastapi import HTTPException
-from openai import AsyncOpenAI
 from pydantic import ValidationError
 
 from ..config import settings
 from ..schemas import Question
-
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+from .generation_ledger import generation_ledger
+from .openai_client import get_openai_client
+from .question_bank import decode_game, is_invalid_json
 
 
 async def update_game_questions(
@@ -63,10 +63,13 @@ async def update_game_questions(
     Return only the updated JSON payload as specified.
     """)
 
+    started = time.perf_counter()
+    resp = None
+    outcome = "error"
     try:
         # 3) Call the AI
-        resp = await client.chat.completions.create(
-            model="gpt-4o",
+        resp = await get_openai_client().chat.completions.create(
+            model=settings.OPENAI_MODEL,
             temperature=0.7,
             top_p=0.9,
             messages=[
@@ -76,40 +79,30 @@ async def update_game_questions(
             response_format={"type": "json_object"}
         )
 
-        # 4) Extract and normalize the AI response
+        # 4) Validate the whole payload in one pass (JSON text, or an already parsed object)
         raw: Union[str, Any] = resp.choices[0].message.content
-        if isinstance(raw, str):
-            try:
-                new_data = json.loads(raw)
-            except json.JSONDecodeError:
-                raise HTTPException(status_code=502, detail="AI returned invalid JSON string for update")
-        elif isinstance(raw, dict):
-            new_data = raw
-        else:
+        if not isinstance(raw, (str, dict)):
+            outcome = "invalid_json"
             raise HTTPException(status_code=502, detail="AI returned unexpected type for update payload")
+        try:
+            game = decode_game(raw)
+        except ValidationError as ve:
+            if is_invalid_json(ve):
+                outcome = "invalid_json"
+                raise HTTPException(status_code=502, detail="AI returned invalid JSON string for update")
+            raise
 
-        # 5) Validate with Pydantic
-        questions = [Question.model_validate(q) for q in new_data["questions"]]
-        bonus_q = (
-            Question.model_validate(new_data.get("bonus_question"))
-            if new_data.get("bonus_question") else None
-        )
-
-        # 6) Compute a new hash for idempotency
-        canonical = {
-            "questions": [q.model_dump() for q in questions],
-            "bonus_question": bonus_q.model_dump() if bonus_q else None
-        }
-        new_hash = hashlib.sha256(
-            json.dumps(canonical, sort_keys=True).encode()
-        ).hexdigest()
-
-        return questions, bonus_q, new_hash
+        # 5) The new hash (for idempotency) comes from the same single encoding
+        outcome = "success"
+        return game.questions, game.bonus_question, game.questions_hash
 
     except ValidationError as ve:
+        outcome = "invalid_schema"
         raise HTTPException(status_code=502, detail=f"Updated data failed validation: {ve}")
     except HTTPException:
         # re-raise HTTPExceptions
         raise
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"AI update failed: {e}")
+    finally:
+        generation_ledger.record_call("update", settings.OPENAI_MODEL, started, outcome, resp)
@@ -0,0 +1,198 @@
+# app/services/generation_ledger.py
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import insert
+
+from ..config import settings
+from ..db import AsyncSessionLocal
+from ..models import GenerationRun
+from ..stats import percentile
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    # naive UTC, matching the DateTime columns
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _as_int(value: Any) -> Optional[int]:
+    return value if isinstance(value, int) else None
+
+
+@dataclass
+class GenerationRecord:
+    kind: str
+    model: str
+    outcome: str
+    latency_ms: float
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    game_id: Optional[int] = None
+    created_at: datetime = field(default_factory=_utcnow)
+
+
+@dataclass
+class RunScope:
+    """Collects the records of one request until its game id is known."""
+    game_id: Optional[int] = None
+    records: List[GenerationRecord] = field(default_factory=list)
+
+
+_current_scope: ContextVar[Optional[RunScope]] = ContextVar("generation_run_scope", default=None)
+
+
+class GenerationLedger:
+    """
+    In-memory buffer of AI calls, written to `generation_runs` in batches
+    by a background task so recording never waits on the database.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, flush_interval: float = 5.0,
+                 batch_size: int = 200, max_buffer: int = 10_000):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self._buffer: List[GenerationRecord] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ── recording ────────────────────────────────────────────────────────
+    def record(self, record: GenerationRecord) -> None:
+        scope = _current_scope.get()
+        if scope is not None:
+            scope.records.append(record)
+        else:
+            self._enqueue([record])
+
+    def record_call(self, kind: str, model: str, started: float, outcome: str, resp: Any = None) -> None:
+        """Record an OpenAI call; `started` is a `time.perf_counter()` value."""
+        usage = getattr(resp, "usage", None)
+        self.record(GenerationRecord(
+            kind=kind,
+            model=model,
+            outcome=outcome,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            prompt_tokens=_as_int(getattr(usage, "prompt_tokens", None)),
+            completion_tokens=_as_int(getattr(usage, "completion_tokens", None)),
+        ))
+
+    @contextmanager
+    def scope(self) -> Iterator[RunScope]:
+        """
+        Hold records made inside the block and stamp them with `scope.game_id`
+        on exit, so the ledger links each AI call to the game it produced.
+        """
+        run = RunScope()
+        token = _current_scope.set(run)
+        try:
+            yield run
+        finally:
+            _current_scope.reset(token)
+            for rec in run.records:
+                rec.game_id = run.game_id
+            self._enqueue(run.records)
+
+    def _enqueue(self, records: List[GenerationRecord]) -> None:
+        if not records:
+            return
+        self._buffer.extend(records)
+        if len(self._buffer) > self.max_buffer:
+            dropped = len(self._buffer) - self.max_buffer
+            del self._buffer[:dropped]
+            logger.warning("Generation ledger buffer full, dropped %d records", dropped)
+        if self._wakeup is not None and len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def reset(self) -> None:
+        self._buffer.clear()
+
+    # ── writing ──────────────────────────────────────────────────────────
+    async def flush(self) -> int:
+        """Write all buffered records in one INSERT; returns the number written."""
+        if not self._buffer:
+            return 0
+        batch, self._buffer = self._buffer, []
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(GenerationRun), [asdict(r) for r in batch])
+                await session.commit()
+        except Exception:
+            logger.exception("Failed to write %d generation runs; will retry", len(batch))
+            self._buffer[:0] = batch
+            return 0
+        return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+        await self.flush()
+
+
+generation_ledger = GenerationLedger(
+    flush_interval=settings.GENERATION_LEDGER_FLUSH_SECONDS,
+    batch_size=settings.GENERATION_LEDGER_BATCH_SIZE,
+)
+
+
+# ── reporting ────────────────────────────────────────────────────────────
+def summarize_runs(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """
+    Aggregate ledger rows (created_at, model, outcome, latency_ms,
+    prompt_tokens, completion_tokens) into one entry per (day, model).
+    """
+    groups: Dict[tuple, list] = defaultdict(list)
+    for r in rows:
+        groups[(r.created_at.date(), r.model)].append(r)
+
+    stats = []
+    for (day, model), runs in sorted(groups.items()):
+        latencies = sorted(r.latency_ms for r in runs)
+        prompt = sum(r.prompt_tokens or 0 for r in runs)
+        completion = sum(r.completion_tokens or 0 for r in runs)
+        stats.append({
+            "day": day,
+            "model": model,
+            "runs": len(runs),
+            "failures": sum(1 for r in runs if r.outcome != "success"),
+            "latency_p50_ms": percentile(latencies, 50),
+            "latency_p90_ms": percentile(latencies, 90),
+            "latency_p99_ms": percentile(latencies, 99),
+            "latency_max_ms": latencies[-1],
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "total_tokens": prompt + completion,
+        })
+    return stats
@@ -0,0 +1,286 @@
+# app/services/invalidation.py
+"""
+Cross-worker cache invalidation. Mutating routes publish keys such as
+"game:42" or "game_leaderboard:42" once their transaction has committed;
+every worker (this one included) passes each key to the handlers
+subscribed to its topic (the part before the colon), which drop their
+cached entries.
+
+Backends carry the keys to the other workers:
+
+* "local": none (a single worker, or tests)
+* "unix": a datagram socket per worker in INVALIDATION_SOCKET_DIR, each
+  publish sent to every other socket there (workers on one host)
+* "postgres": LISTEN/NOTIFY on INVALIDATION_CHANNEL (workers on any host)
+
+Keys are only sent for topics some cache subscribes to, in messages of at
+most MAX_MESSAGE_BYTES (NOTIFY payloads must stay under 8000 bytes).
+Delivery is best effort: a lost message leaves an entry cached until its
+TTL or max age, as before.
+"""
+import asyncio
+import glob
+import logging
+import os
+import socket
+import uuid
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import orjson
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[Sequence[str]], None]
+
+MAX_MESSAGE_BYTES = 4000
+# LISTEN connection lost: first retry after this, doubling up to the max
+RECONNECT_MIN_SECONDS = 0.5
+RECONNECT_MAX_SECONDS = 30.0
+
+
+def _encode(origin: str, keys: Sequence[str]) -> bytes:
+    return orjson.dumps({"origin": origin, "keys": list(keys)})
+
+
+def _messages(origin: str, keys: Sequence[str]) -> Iterator[bytes]:
+    """`keys` split into as few messages of at most MAX_MESSAGE_BYTES as it takes."""
+    batch: List[str] = []
+    size = len(_encode(origin, []))
+    for key in keys:
+        key_size = len(orjson.dumps(key)) + 1
+        if batch and size + key_size > MAX_MESSAGE_BYTES:
+            yield _encode(origin, batch)
+            batch, size = [], len(_encode(origin, []))
+        batch.append(key)
+        size += key_size
+    if batch:
+        yield _encode(origin, batch)
+
+
+def _decode(data) -> Optional[dict]:
+    try:
+        message = orjson.loads(data)
+        if isinstance(message["origin"], str) and isinstance(message["keys"], list):
+            return message
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        pass
+    logger.warning("Ignoring malformed invalidation message")
+    return None
+
+
+class LocalBackend:
+    """No other workers to reach."""
+
+    async def start(self, deliver: Deliver) -> None:
+        pass
+
+    async def send(self, keys: Sequence[str]) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class UnixSocketBackend:
+    """One datagram socket per worker in `directory`; a publish is sent to all the others."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.path = os.path.join(directory, f"{self.origin}.sock")
+        self._sock: Optional[socket.socket] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.bind(self.path)
+        self._sock = sock
+
+        def on_readable():
+            while True:
+                try:
+                    data = sock.recv(65536)
+                except (BlockingIOError, InterruptedError):
+                    return
+                message = _decode(data)
+                if message is not None:
+                    deliver(message["keys"])
+
+        asyncio.get_running_loop().add_reader(sock.fileno(), on_readable)
+
+    async def send(self, keys: Sequence[str]) -> None:
+        if self._sock is None:
+            return
+        messages = list(_messages(self.origin, keys))
+        for path in glob.glob(os.path.join(self.directory, "*.sock")):
+            if path == self.path:
+                continue
+            try:
+                for data in messages:
+                    self._sock.sendto(data, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # left behind by a worker that exited without unbinding
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                logger.warning("Invalidation dropped: %s is not reading", path)
+
+    async def stop(self) -> None:
+        if self._sock is not None:
+            asyncio.get_running_loop().remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class PostgresBackend:
+    """
+    LISTEN/NOTIFY on one dedicated asyncpg connection; a worker ignores its
+    own notifications. A lost connection is reopened with backoff; what was
+    published meanwhile is not replayed.
+    """
+
+    def __init__(self, database_url: str, channel: str):
+        from sqlalchemy.engine import make_url
+
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.channel = channel
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._conn = None
+        self._deliver: Optional[Deliver] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._lock = asyncio.Lock()
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self._stopping = False
+        try:
+            await self._connect()
+        except Exception:
+            logger.exception("Invalidation LISTEN connection failed; retrying in the background")
+            self._schedule_reconnect()
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        conn.add_termination_listener(self._on_terminated)
+        await conn.add_listener(self.channel, self._on_notify)
+        self._conn = conn
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str) -> None:
+        message = _decode(payload)
+        if message is not None and message["origin"] != self.origin:
+            self._deliver(message["keys"])
+
+    def _on_terminated(self, _conn) -> None:
+        self._conn = None
+        if not self._stopping:
+            logger.warning("Invalidation LISTEN connection lost; reconnecting")
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self) -> None:
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = RECONNECT_MIN_SECONDS
+        while not self._stopping:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except Exception as exc:
+                logger.warning("Invalidation reconnect failed (%s); next try in %.1fs", type(exc).__name__, delay)
+                delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+            else:
+                logger.info("Invalidation LISTEN connection restored")
+                return
+
+    async def send(self, keys: Sequence[str]) -> None:
+        conn = self._conn
+        if conn is None or conn.is_closed():
+            logger.warning("Invalidation not sent (no LISTEN connection): %s", list(keys))
+            return
+        # one connection: NOTIFYs from concurrent requests take turns
+        async with self._lock:
+            for data in _messages(self.origin, keys):
+                await conn.execute("SELECT pg_notify($1, $2)", self.channel, data.decode())
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            try:
+                await self._reconnect_task
+            except asyncio.CancelledError:
+                pass
+            self._reconnect_task = None
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+
+def make_backend(name: str):
+    if name == "unix":
+        return UnixSocketBackend(settings.INVALIDATION_SOCKET_DIR)
+    if name == "postgres":
+        return PostgresBackend(settings.DATABASE_URL, settings.INVALIDATION_CHANNEL)
+    return LocalBackend()
+
+
+class InvalidationBus:
+    """Topic subscriptions of this worker's caches, and the backend reaching the other workers."""
+
+    def __init__(self, backend=None):
+        self.backend = backend or LocalBackend()
+        self._handlers: Dict[str, List[Callable[[str], None]]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: Callable[[str], None]) -> None:
+        """`handler(key)` for each published "topic:key"."""
+        self._handlers[topic].append(handler)
+
+    def deliver(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            topic, _, arg = key.partition(":")
+            for handler in self._handlers.get(topic, ()):
+                try:
+                    handler(arg)
+                except Exception:
+                    logger.exception("Invalidation handler failed for %s", key)
+
+    async def publish(self, *keys: str) -> None:
+        """Invalidate here at once, then on the other workers; never raises."""
+        self.deliver(keys)
+        # every worker runs the same subscriptions: nobody would act on the rest
+        keys = tuple(k for k in keys if k.partition(":")[0] in self._handlers)
+        if not keys:
+            return
+        try:
+            await self.backend.send(keys)
+        except Exception:
+            logger.exception("Invalidation not sent to other workers: %s", keys)
+
+    async def start(self) -> None:
+        await self.backend.start(self.deliver)
+
+    async def stop(self) -> None:
+        await self.backend.stop()
+
+    async def use(self, backend) -> None:
+        """Switch backends (stopping the current one, starting the new one)."""
+        await self.stop()
+        self.backend = backend
+        await self.start()
+
+
+invalidation_bus = InvalidationBus(make_backend(settings.INVALIDATION_BACKEND))
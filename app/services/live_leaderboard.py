@@ -0,0 +1,170 @@
+# app/services/live_leaderboard.py
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from ..config import settings
+from ..db import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# loads the current top `size` entries (dicts with player, best, ...)
+TopLoader = Callable[[Any, int], Awaitable[List[Dict[str, Any]]]]
+
+
+def _json_default(value: Any) -> str:
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _encode(message: Dict[str, Any]) -> str:
+    return json.dumps(message, default=_json_default, separators=(",", ":"))
+
+
+def diff_entries(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Positions whose entry changed and players who dropped out of the
+    top-N; applying them to `old` (then truncating to `size`) gives `new`.
+    """
+    changed = [
+        {**entry, "rank": i + 1}
+        for i, entry in enumerate(new)
+        if i >= len(old) or old[i] != entry
+    ]
+    still_listed = {e["player"] for e in new}
+    removed = [e["player"] for e in old if e["player"] not in still_listed]
+    return {"changed": changed, "removed": removed, "size": len(new)}
+
+
+class Subscriber:
+    """One connection's outbox of pre-encoded messages."""
+
+    def __init__(self, max_queue: int):
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=max_queue)
+
+    def push(self, text: str, snapshot: Callable[[], str]) -> None:
+        try:
+            self.queue.put_nowait(text)
+        except asyncio.QueueFull:
+            # too slow to keep up: drop its backlog and resync with the full state
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(snapshot())
+
+    async def get(self) -> str:
+        return await self.queue.get()
+
+
+class LeaderboardBroadcaster:
+    """
+    Fans the live top-N out to WebSocket subscribers.
+
+    Score submissions only set a flag; a single task waits `coalesce`
+    seconds to absorb the burst, reloads the top-N once, computes one diff
+    and hands the same encoded message to every subscriber. It also
+    reloads every `refresh` seconds so other workers' writes reach this
+    worker's viewers. Nothing is queried while nobody is subscribed.
+    """
+
+    def __init__(self, size: int = 10, coalesce: float = 0.25, refresh: float = 5.0,
+                 max_queue: int = 8, session_factory=AsyncSessionLocal):
+        self.size = size
+        self.coalesce = coalesce
+        self.refresh = refresh
+        self.max_queue = max_queue
+        self.session_factory = session_factory
+        self.subscribers: Set[Subscriber] = set()
+        self.version = 0
+        self._top: Optional[List[Dict[str, Any]]] = None
+        self._loader: Optional[TopLoader] = None
+        self._dirty: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ── state ────────────────────────────────────────────────────────────
+    async def _load(self) -> List[Dict[str, Any]]:
+        async with self.session_factory() as session:
+            return await self._loader(session, self.size)
+
+    def snapshot_message(self) -> str:
+        return _encode({
+            "type": "snapshot",
+            "version": self.version,
+            "entries": [{**e, "rank": i + 1} for i, e in enumerate(self._top or [])],
+        })
+
+    async def refresh_now(self) -> bool:
+        """Reload the top-N and broadcast a diff; returns whether anything changed."""
+        top = await self._load()
+        if self._top is not None and top == self._top:
+            return False
+        diff = diff_entries(self._top or [], top)
+        self._top = top
+        self.version += 1
+        text = _encode({"type": "diff", "version": self.version, **diff})
+        for sub in list(self.subscribers):
+            sub.push(text, self.snapshot_message)
+        return True
+
+    # ── subscriptions ────────────────────────────────────────────────────
+    async def subscribe(self, loader: TopLoader) -> Subscriber:
+        """Register a viewer; its first message is a snapshot of the current top-N."""
+        self._start(loader)
+        if not self.subscribers or self._top is None:
+            # nobody was watching, so the cached top-N may be stale
+            self._top = await self._load()
+            self.version += 1
+        sub = Subscriber(self.max_queue)
+        self.subscribers.add(sub)
+        sub.push(self.snapshot_message(), self.snapshot_message)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self.subscribers.discard(sub)
+
+    def notify(self) -> None:
+        """Called after a score commit; cheap enough to call on every submission."""
+        if self._dirty is not None and self.subscribers:
+            self._dirty.set()
+
+    # ── background task ──────────────────────────────────────────────────
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._dirty.wait(), timeout=self.refresh)
+                # let the rest of the burst land before reloading once
+                await asyncio.sleep(self.coalesce)
+            except asyncio.TimeoutError:
+                pass
+            self._dirty.clear()
+            if not self.subscribers:
+                continue
+            try:
+                await self.refresh_now()
+            except Exception:
+                logger.exception("Live leaderboard refresh failed")
+
+    def _start(self, loader: TopLoader) -> None:
+        self._loader = loader
+        if self._task is None:
+            self._dirty = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._dirty = None
+        self._top = None
+        self.subscribers.clear()
+
+
+live_leaderboard = LeaderboardBroadcaster(
+    size=settings.LIVE_LEADERBOARD_SIZE,
+    coalesce=settings.LIVE_LEADERBOARD_COALESCE_SECONDS,
+    refresh=settings.LIVE_LEADERBOARD_REFRESH_SECONDS,
+    max_queue=settings.LIVE_LEADERBOARD_QUEUE_SIZE,
+)
@@ -0,0 +1,58 @@
+# app/services/minhash.py
+"""
+MinHash signatures of question texts.
+
+A text is cut into character shingles, each hashed to 32 bits, and
+summarised by the minimum of NUM_PERM random permutations of those hashes
+(computed for all permutations at once with NumPy). The share of equal
+positions in two signatures estimates the Jaccard similarity of the
+shingle sets.
+"""
+import re
+import zlib
+
+import numpy as np
+
+SHINGLE_SIZE = 5
+BANDS = 16
+ROWS = 8
+NUM_PERM = BANDS * ROWS
+# smallest prime above 2**32; (a * x + b) stays below 2**63 with a, b < 2**31
+_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+# fixed seed: stored signatures must stay comparable across processes and releases
+_rng = np.random.default_rng(20261019)
+_A = _rng.integers(1, 2 ** 31, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2 ** 31, size=NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """crc32 of every `size`-character window of the normalised text."""
+    normalised = _NON_WORD.sub(" ", text.lower()).strip()
+    if len(normalised) <= size:
+        windows = {normalised}
+    else:
+        windows = {normalised[i:i + size] for i in range(len(normalised) - size + 1)}
+    return np.fromiter((zlib.crc32(w.encode()) for w in windows), dtype=np.uint64, count=len(windows))
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32 values) of a question text."""
+    hashed = (_A[:, None] * shingles(text)[None, :] + _B[:, None]) % _PRIME
+    return np.minimum(hashed.min(axis=1), _MAX_HASH).astype(np.uint32)
+
+
+def signature_bytes(text: str) -> bytes:
+    """Signature as stored in `questions.minhash`."""
+    return signature(text).tobytes()
+
+
+def from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
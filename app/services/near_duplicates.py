@@ -0,0 +1,175 @@
+# app/services/near_duplicates.py
+"""
+Near-duplicate question detection: the MinHash signatures stored with the
+question bank are split into BANDS bands of ROWS values and indexed by
+band (locality-sensitive hashing). Questions whose texts share about
+`threshold` of their shingles collide in at least one band with high
+probability; candidates from colliding bands are confirmed by comparing
+full signatures.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..db import AsyncSessionLocal
+from ..models import QuestionRecord
+from .minhash import BANDS, ROWS, from_bytes, signature, signature_bytes, similarity
+from .question_bank import GamePayload, payload_questions, question_hash
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NearDuplicate:
+    question: str
+    existing_hash: str
+    similarity: float
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over the signatures stored in `questions.minhash`.
+
+    Loaded once (at startup, or lazily on first use) and extended in place
+    with the questions this worker stores; questions added by other
+    workers are seen after `invalidate()` or a restart.
+    """
+
+    def __init__(self, threshold: float = 0.7, session_factory=AsyncSessionLocal):
+        self.threshold = threshold
+        self.session_factory = session_factory
+        self._buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(BANDS)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    # ── loading ──────────────────────────────────────────────────────────
+    def _insert(self, content_hash: str, sig: np.ndarray) -> None:
+        if content_hash in self._signatures:
+            return
+        self._signatures[content_hash] = sig
+        for band, key in enumerate(self._band_keys(sig)):
+            self._buckets[band].setdefault(key, []).append(content_hash)
+
+    @staticmethod
+    def _band_keys(sig: np.ndarray) -> Iterable[bytes]:
+        return (sig[band * ROWS:(band + 1) * ROWS].tobytes() for band in range(BANDS))
+
+    async def ensure(self, db: AsyncSession) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            rows = await db.execute(
+                select(QuestionRecord.content_hash, QuestionRecord.minhash)
+                .where(QuestionRecord.minhash.is_not(None))
+            )
+            self.reset()
+            for content_hash, minhash in rows:
+                self._insert(content_hash, from_bytes(minhash))
+            self._loaded = True
+
+    async def warm(self) -> None:
+        """Load the index through its own session (application startup)."""
+        try:
+            async with self.session_factory() as session:
+                await self.ensure(session)
+        except Exception:
+            logger.exception("Near-duplicate index not loaded; it will load on first use")
+
+    def add(self, payload: GamePayload) -> None:
+        """Index the questions of a game this worker just stored."""
+        if not self._loaded:
+            return
+        for q in payload_questions(payload):
+            self._insert(question_hash(q), signature(q["q"]))
+
+    def invalidate(self) -> None:
+        self._loaded = False
+
+    def reset(self) -> None:
+        self._buckets = [{} for _ in range(BANDS)]
+        self._signatures = {}
+        self._loaded = False
+
+    # ── queries ──────────────────────────────────────────────────────────
+    def query(self, text: str, ignore: Set[str] = frozenset()) -> Optional[Tuple[str, float]]:
+        """(content hash, similarity) of the closest stored question at or above the threshold."""
+        sig = signature(text)
+        candidates = set()
+        for band, key in enumerate(self._band_keys(sig)):
+            candidates.update(self._buckets[band].get(key, ()))
+        best = None
+        for content_hash in candidates - ignore:
+            score = similarity(sig, self._signatures[content_hash])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (content_hash, score)
+        return best
+
+    async def find(self, db: AsyncSession, payload: GamePayload,
+                   ignore: Set[str] = frozenset()) -> List[NearDuplicate]:
+        """
+        Questions of `payload` that reword a stored question. Exact copies
+        are not reported: the bank already stores those once.
+        """
+        await self.ensure(db)
+        found = []
+        for q in payload_questions(payload):
+            match = self.query(q["q"], ignore | {question_hash(q)})
+            if match is not None:
+                found.append(NearDuplicate(question=q["q"], existing_hash=match[0], similarity=match[1]))
+        return found
+
+    def pairs(self) -> List[Tuple[str, str, float]]:
+        """Every near-duplicate pair in the index, most similar first."""
+        seen: Set[Tuple[str, str]] = set()
+        found = []
+        for buckets in self._buckets:
+            for hashes in buckets.values():
+                for i, a in enumerate(hashes):
+                    for b in hashes[i + 1:]:
+                        pair = (a, b) if a < b else (b, a)
+                        if pair in seen:
+                            continue
+                        seen.add(pair)
+                        score = similarity(self._signatures[a], self._signatures[b])
+                        if score >= self.threshold:
+                            found.append((*pair, score))
+        return sorted(found, key=lambda p: -p[2])
+
+
+near_duplicates = NearDuplicateIndex(threshold=settings.NEAR_DUPLICATE_THRESHOLD)
+
+
+def log_near_duplicates(game_id: Optional[int], found: List[NearDuplicate]) -> None:
+    for dup in found:
+        logger.warning("Game %s: question %r is a near-duplicate of %s (similarity %.2f)",
+                       game_id, dup.question, dup.existing_hash, dup.similarity)
+
+
+async def backfill_signatures(session_factory, batch_size: int = 1000) -> int:
+    """Sign bank questions stored without a signature, one transaction per batch; returns the count."""
+    signed = 0
+    while True:
+        async with session_factory() as session:
+            rows = (await session.execute(
+                select(QuestionRecord.content_hash, QuestionRecord.body)
+                .where(QuestionRecord.minhash.is_(None))
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                return signed
+            await session.execute(update(QuestionRecord), [
+                {"content_hash": content_hash, "minhash": signature_bytes(body["q"])}
+                for content_hash, body in rows
+            ])
+            await session.commit()
+        signed += len(rows)
+        logger.info("Signed %d questions", signed)
@@ -0,0 +1,23 @@
+# app/services/openai_client.py
+"""
+The AsyncOpenAI client shared by generation and updates. `openai` (and the
+httpx client it builds) is imported on the first AI call, not when the app
+is imported: instances that only serve reads never load it.
+"""
+from typing import TYPE_CHECKING, Optional
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+_client: Optional["AsyncOpenAI"] = None
+
+
+def get_openai_client() -> "AsyncOpenAI":
+    global _client
+    if _client is None:
+        from openai import AsyncOpenAI
+
+        _client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    return _client
@@ -0,0 +1,150 @@
+# app/services/player_stats.py
+"""
+player_stats keeps one aggregate row per player so the stats endpoint
+never scans a heavy player's scores. submit_score folds each score in;
+`rebuild` recomputes rows from scratch with set-based statements.
+
+`distinct_games` grows only when a score creates its (player, game) row in
+player_games. The primary key decides, so two concurrent first attempts
+at the same game count once (an EXISTS check cannot see the other
+transaction's uncommitted score).
+"""
+import logging
+from datetime import datetime
+from typing import Callable, Iterable
+
+from sqlalchemy import case, delete, func, insert, literal, select, union, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import dialect_insert
+from ..models import Player, PlayerGame, PlayerStats, Score, ScoreSummary
+
+logger = logging.getLogger(__name__)
+
+
+async def record_score(db: AsyncSession, player_id: int, game_id: int, score: int, played_at: datetime) -> None:
+    """Fold a just-inserted score into the player's row (pair insert + one upsert)."""
+    first_attempt = (await db.execute(
+        dialect_insert(db)(PlayerGame)
+        .values(player_id=player_id, game_id=game_id)
+        .on_conflict_do_nothing(index_elements=[PlayerGame.player_id, PlayerGame.game_id])
+        .returning(PlayerGame.player_id)
+    )).first() is not None
+    await db.execute(stats_upsert(dialect_insert(db)(PlayerStats).values(
+        player_id=player_id,
+        games_played=1,
+        distinct_games=int(first_attempt),
+        total_score=score,
+        best=score,
+        last_played_at=played_at,
+    )))
+
+
+def stats_upsert(stmt):
+    """
+    ON CONFLICT clause of an INSERT of one score's player_stats row (with
+    `distinct_games` 1 for a first attempt at the game, else 0).
+    """
+    new = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[PlayerStats.player_id],
+        set_={
+            "games_played": PlayerStats.games_played + 1,
+            "distinct_games": PlayerStats.distinct_games + new.distinct_games,
+            "total_score": PlayerStats.total_score + new.total_score,
+            "best": case((new.best > PlayerStats.best, new.best), else_=PlayerStats.best),
+            "last_played_at": case(
+                (new.last_played_at > PlayerStats.last_played_at, new.last_played_at),
+                else_=PlayerStats.last_played_at,
+            ),
+        },
+    )
+
+
+async def forget_game(db: AsyncSession, game_id: int) -> None:
+    """Drop the deleted game's (player, game) pairs; run `rebuild_players` for the stats."""
+    await db.execute(delete(PlayerGame).where(PlayerGame.game_id == game_id))
+
+
+async def _rebuild(db: AsyncSession, column_filter: Callable) -> None:
+    """
+    Recompute the rows of the players selected by `column_filter(player_id
+    column)` with one DELETE and one INSERT ... SELECT ... GROUP BY over
+    raw scores and compacted summaries.
+    """
+    rows = union_all(
+        select(
+            Score.player_id,
+            Score.game_id,
+            literal(1).label("attempts"),
+            Score.score.label("total_score"),
+            Score.score.label("best"),
+            Score.played_at.label("last_played_at"),
+        ).where(column_filter(Score.player_id)),
+        select(
+            ScoreSummary.player_id,
+            ScoreSummary.game_id,
+            ScoreSummary.attempts,
+            ScoreSummary.total_score,
+            ScoreSummary.best,
+            ScoreSummary.last_played_at,
+        ).where(column_filter(ScoreSummary.player_id)),
+    ).subquery()
+
+    await db.execute(delete(PlayerStats).where(column_filter(PlayerStats.player_id)))
+    await db.execute(
+        insert(PlayerStats).from_select(
+            ["player_id", "games_played", "distinct_games", "total_score", "best", "last_played_at"],
+            select(
+                rows.c.player_id,
+                func.sum(rows.c.attempts),
+                func.count(rows.c.game_id.distinct()),
+                func.sum(rows.c.total_score),
+                func.max(rows.c.best),
+                func.max(rows.c.last_played_at),
+            )
+            .group_by(rows.c.player_id),
+        )
+    )
+
+
+async def rebuild_players(db: AsyncSession, player_ids: Iterable[int]) -> None:
+    ids = set(player_ids)
+    if ids:
+        await _rebuild(db, lambda column: column.in_(ids))
+
+
+async def rebuild_range(db: AsyncSession, first_id: int, last_id: int) -> None:
+    """Recompute the rows of a player id range and add any (player, game) pair missing from player_games."""
+    def in_range(column):
+        return column.between(first_id, last_id)
+
+    await _rebuild(db, in_range)
+    pairs = union(
+        select(Score.player_id, Score.game_id).where(in_range(Score.player_id)),
+        select(ScoreSummary.player_id, ScoreSummary.game_id).where(in_range(ScoreSummary.player_id)),
+    ).subquery()
+    # the WHERE lets SQLite parse ON CONFLICT after INSERT ... SELECT
+    await db.execute(
+        dialect_insert(db)(PlayerGame)
+        .from_select(["player_id", "game_id"], select(pairs.c.player_id, pairs.c.game_id).where(literal(True)))
+        .on_conflict_do_nothing(index_elements=[PlayerGame.player_id, PlayerGame.game_id])
+    )
+
+
+async def rebuild_all(session_factory, batch_size: int = 5_000) -> int:
+    """Recompute every player's row, `batch_size` player ids per transaction; returns batches run."""
+    async with session_factory() as session:
+        lo, hi = (await session.execute(select(func.min(Player.id), func.max(Player.id)))).one()
+    if lo is None:
+        return 0
+
+    batches = 0
+    for first_id in range(lo, hi + 1, batch_size):
+        last_id = min(first_id + batch_size - 1, hi)
+        async with session_factory() as session:
+            await rebuild_range(session, first_id, last_id)
+            await session.commit()
+        batches += 1
+        logger.info("Rebuilt player_stats for player ids %d..%d", first_id, last_id)
+    return batches
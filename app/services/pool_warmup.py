@@ -0,0 +1,127 @@
+# app/services/pool_warmup.py
+"""
+Startup warm-up: open connections on each engine before the first request
+needs them, then prime the hot in-memory caches. `/health` reports the
+result so a load balancer only routes to warm instances.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _connections_to_open(engine: AsyncEngine, wanted: int) -> int:
+    pool = engine.sync_engine.pool
+    if isinstance(pool, QueuePool):
+        # connections above pool_size are closed when returned, so opening them warms nothing
+        return max(0, min(wanted, pool.size()))
+    # single-connection pools (in-memory SQLite)
+    return min(wanted, 1)
+
+
+async def _open_connections(engine: AsyncEngine, count: int) -> None:
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await engine.connect())
+        # connect + round trip, in parallel, then all go back to the pool
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in connections))
+    finally:
+        for conn in connections:
+            await conn.close()
+
+
+class PoolWarmup:
+    """
+    State of the startup warm-up: "pending" until `run()`, then "ready" or
+    "failed". Only connection failures fail it; a cache that cannot be
+    primed is logged and loads on first use.
+    """
+
+    def __init__(self, connections: int = 5, timeout: float = 10.0):
+        self.connections = connections
+        self.timeout = timeout
+        self._lock = asyncio.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.warmed = 0
+        self.duration_ms: Optional[float] = None
+        self._engines: Dict[str, AsyncEngine] = {}
+        self._retry_task: Optional[asyncio.Task] = None
+
+    async def run(self, engines: Dict[str, AsyncEngine],
+                  prime: Optional[Callable[[], Awaitable[Any]]] = None) -> bool:
+        """Warm every engine (by name: "primary", "replica"), then `prime()` the caches."""
+        self._engines = dict(engines)
+        started = time.perf_counter()
+        try:
+            counts = {name: _connections_to_open(e, self.connections) for name, e in self._engines.items()}
+            await asyncio.wait_for(
+                asyncio.gather(*(_open_connections(e, counts[name]) for name, e in self._engines.items())),
+                self.timeout,
+            )
+        except Exception as exc:
+            self.state = "failed"
+            # the type only: /health is public and driver messages name hosts
+            self.error = type(exc).__name__
+            logger.exception("Connection pool warm-up failed")
+        else:
+            self.state = "ready"
+            self.error = None
+            self.warmed = sum(counts.values())
+            if prime is not None:
+                try:
+                    await asyncio.wait_for(prime(), self.timeout)
+                except Exception:
+                    logger.exception("Cache priming failed; caches will load on first use")
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+        return self.state == "ready"
+
+    async def retry(self) -> bool:
+        """Warm up again after a failure (the database came back), without priming; one at a time."""
+        async with self._lock:
+            if self.state != "failed":
+                return self.state == "ready"
+            return await self.run(self._engines)
+
+    def schedule_retry(self) -> None:
+        """
+        After a failure, start a background `retry()` unless one is running.
+        Never waits for it: health probes keep answering within their own
+        timeout while the database is down.
+        """
+        if self.state == "failed" and (self._retry_task is None or self._retry_task.done()):
+            self._retry_task = asyncio.create_task(self.retry())
+
+    def status(self) -> Dict[str, Any]:
+        pools = {}
+        for name, engine in self._engines.items():
+            pool = engine.sync_engine.pool
+            pools[name] = {"class": type(pool).__name__}
+            if isinstance(pool, QueuePool):
+                pools[name].update(size=pool.size(), checked_in=pool.checkedin(),
+                                   checked_out=pool.checkedout(), overflow=pool.overflow())
+        return {
+            "state": self.state,
+            "warmed_connections": self.warmed,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+            "pools": pools,
+        }
+
+
+pool_warmup = PoolWarmup(
+    connections=settings.DB_WARMUP_CONNECTIONS,
+    timeout=settings.DB_WARMUP_TIMEOUT_SECONDS,
+)
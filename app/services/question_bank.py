@@ -0,0 +1,167 @@
+# app/services/question_bank.py
+"""
+Questions are stored once each in `questions`, keyed by a hash of their
+content, and games reference them in order through `game_questions`.
+Games created before the bank keep their payload in `games.questions_json`
+until migrated; readers handle both.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import dialect_insert
+from ..models import Game, GameQuestion, QuestionRecord
+from ..schemas import GameQuestions, Question
+from .minhash import signature_bytes
+
+GamePayload = Dict[str, Any]
+
+game_questions_adapter = TypeAdapter(GameQuestions)
+
+
+def question_hash(question: Dict[str, Any]) -> str:
+    """Content hash of one question dict (json.dumps with sorted keys; bank keys depend on it)."""
+    return hashlib.sha256(json.dumps(question, sort_keys=True).encode()).hexdigest()
+
+
+def canonical_json(payload: GamePayload) -> bytes:
+    """Sorted-key orjson encoding of a payload: what is served for a game."""
+    return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+
+
+def payload_hash(payload: GamePayload) -> str:
+    """
+    `games.questions_hash` of a {"questions": [...], "bonus_question": ...}
+    payload. Kept on json.dumps with sorted keys (not the orjson bytes, which
+    differ in whitespace and escaping) so stored games keep deduplicating.
+    """
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+@dataclass
+class EncodedGame:
+    """A validated game, dumped to plain dicts once and encoded once."""
+    questions: List[Question]
+    bonus_question: Optional[Question]
+    payload: GamePayload
+    canonical: bytes
+
+    @property
+    def questions_hash(self) -> str:
+        return payload_hash(self.payload)
+
+
+def is_invalid_json(error: ValidationError) -> bool:
+    """Whether validate_json failed on the JSON syntax rather than the schema."""
+    return any(e["type"] == "json_invalid" for e in error.errors())
+
+
+def encode_game(game: GameQuestions) -> EncodedGame:
+    payload = game.model_dump()
+    return EncodedGame(game.questions, game.bonus_question, payload, canonical_json(payload))
+
+
+def decode_game(data: Union[str, bytes, GamePayload]) -> EncodedGame:
+    """Validate a whole payload in one pass (JSON text/bytes straight from the AI, or dicts)."""
+    if isinstance(data, (str, bytes)):
+        return encode_game(game_questions_adapter.validate_json(data))
+    return encode_game(game_questions_adapter.validate_python(data))
+
+
+def payload_questions(payload: GamePayload) -> List[Dict[str, Any]]:
+    """The regular questions, then the bonus question if any."""
+    questions = list(payload["questions"])
+    if payload.get("bonus_question"):
+        questions.append(payload["bonus_question"])
+    return questions
+
+
+def split_payload(game_id: int, payload: GamePayload) -> Tuple[List[dict], List[dict]]:
+    """(questions rows, game_questions rows) for one game payload."""
+    ordered = [(q, False) for q in payload["questions"]]
+    if payload.get("bonus_question"):
+        ordered.append((payload["bonus_question"], True))
+
+    questions: Dict[str, dict] = {}
+    links = []
+    for slot, (question, is_bonus) in enumerate(ordered):
+        content_hash = question_hash(question)
+        questions[content_hash] = {
+            "content_hash": content_hash,
+            "difficulty": question["difficulty"],
+            "category": question["category"],
+            "body": question,
+        }
+        links.append({"game_id": game_id, "slot": slot, "is_bonus": is_bonus, "question_hash": content_hash})
+    return list(questions.values()), links
+
+
+async def store_game_questions(db: AsyncSession, game_id: int, payload: GamePayload,
+                               new_questions: bool = True) -> None:
+    """
+    Add the game's questions to the bank (existing ones are reused) and link
+    them in order; `new_questions=False` skips the bank when all are in it.
+    """
+    questions, links = split_payload(game_id, payload)
+    if new_questions:
+        for row in questions:
+            row["minhash"] = signature_bytes(row["body"]["q"])
+        await db.execute(
+            dialect_insert(db)(QuestionRecord).values(questions)
+            .on_conflict_do_nothing(index_elements=[QuestionRecord.content_hash])
+        )
+    await db.execute(insert(GameQuestion).values(links))
+
+
+async def replace_game_questions(db: AsyncSession, game_id: int, payload: GamePayload) -> None:
+    await db.execute(delete(GameQuestion).where(GameQuestion.game_id == game_id))
+    await store_game_questions(db, game_id, payload)
+
+
+def game_payload_query(*criteria):
+    """
+    One statement for a game's payload: the legacy blob plus its bank
+    questions in slot order (outer joined, so legacy games yield one row).
+    """
+    return (
+        select(Game.id, Game.questions_hash, Game.questions_json, GameQuestion.is_bonus, QuestionRecord.body)
+        .outerjoin(GameQuestion, GameQuestion.game_id == Game.id)  # type: ignore[arg-type]
+        .outerjoin(QuestionRecord, QuestionRecord.content_hash == GameQuestion.question_hash)  # type: ignore[arg-type]
+        .where(*criteria)
+        .order_by(GameQuestion.slot)
+    )
+
+
+class StoredGame(NamedTuple):
+    game_id: int
+    payload: GamePayload
+    questions_hash: str
+
+
+def payload_from_rows(rows: Iterable[Any]) -> Optional[StoredGame]:
+    """(game id, {"questions": [...], "bonus_question": ...}, hash) from game_payload_query rows."""
+    rows = list(rows)
+    if not rows:
+        return None
+    game_id, questions_hash, legacy = rows[0].id, rows[0].questions_hash, rows[0].questions_json
+    if legacy is not None:
+        return StoredGame(game_id, legacy, questions_hash)
+    payload: GamePayload = {"questions": [], "bonus_question": None}
+    for r in rows:
+        if r.body is None:
+            continue
+        if r.is_bonus:
+            payload["bonus_question"] = r.body
+        else:
+            payload["questions"].append(r.body)
+    return StoredGame(game_id, payload, questions_hash)
+
+
+async def load_game_payload(db: AsyncSession, *criteria) -> Optional[StoredGame]:
+    return payload_from_rows((await db.execute(game_payload_query(*criteria))).all())
@@ -1,18 +1,16 @@
 # app/services/questions.py
-import hashlib
-import json
 import textwrap
+import time
 from typing import List, Tuple, Optional
 
 from fastapi import HTTPException
-from openai import AsyncOpenAI  # Use AsyncOpenAI
 from pydantic import ValidationError
 
 from ..config import settings
 from ..schemas import Question
-
-# Create async client instance
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+from .generation_ledger import generation_ledger
+from .openai_client import get_openai_client
+from .question_bank import EncodedGame, decode_game, is_invalid_json
 
 
 async def generate_questions(num_questions: int = 15) -> Tuple[List[Question], Optional[Question], str]:
@@ -20,6 +18,12 @@ async def generate_questions(num_questions: int = 15) -> Tuple[List[Question], O
     Generate questions using OpenAI with increasing difficulty and hints
     Returns: (regular_questions, bonus_question, hash)
     """
+    game = await generate_game(num_questions)
+    return game.questions, game.bonus_question, game.questions_hash
+
+
+async def generate_game(num_questions: int = 15) -> EncodedGame:
+    """Generate a game with OpenAI, validated, dumped and encoded once"""
 
     prompt = textwrap.dedent(f"""
         You are an expert Who Wants to Be a Millionaire question writer.  
@@ -49,10 +53,13 @@ async def generate_questions(num_questions: int = 15) -> Tuple[List[Question], O
         Example “hard” format for inspiration: “During WWII, codebreakers at Bletchley Park named one of their 
         machines after a local fruit. What was it called and what cipher did it tackle?” """)
 
+    started = time.perf_counter()
+    resp = None
+    outcome = "error"
     try:
         # 1) call the API
-        resp = await client.chat.completions.create(
-            model="gpt-4o",
+        resp = await get_openai_client().chat.completions.create(
+            model=settings.OPENAI_MODEL,
             temperature=0.8,
             top_p=0.9,
             messages=[
@@ -63,32 +70,17 @@ async def generate_questions(num_questions: int = 15) -> Tuple[List[Question], O
             ],
             response_format={"type": "json_object"}
         )
-        # 2) parse the string payload to a Python dict
-        payload = resp.choices[0].message.content
-        data = json.loads(payload)
-
-        # 3) convert into Pydantic models (can raise ValidationError)
-        questions = [Question.model_validate(q) for q in data["questions"]]
-        bonus_q = (
-            Question.model_validate(data["bonus_question"])
-            if data.get("bonus_question")
-            else None
-        )
-
-        # 4) build the hash
-        game_data = {
-            "questions": [q.model_dump() for q in questions],
-            "bonus_question": bonus_q.model_dump() if bonus_q else None
-        }
-        questions_hash = hashlib.sha256(
-            json.dumps(game_data, sort_keys=True).encode()
-        ).hexdigest()
+        # 2) validate the whole payload straight from the JSON text, then dump and encode it once
+        game = decode_game(resp.choices[0].message.content)
 
-        return questions, bonus_q, questions_hash
+        outcome = "success"
+        return game
 
-    except json.JSONDecodeError:
-        raise HTTPException(502, "OpenAI returned invalid JSON")
     except ValidationError as ve:
+        if is_invalid_json(ve):
+            outcome = "invalid_json"
+            raise HTTPException(502, "OpenAI returned invalid JSON")
+        outcome = "invalid_schema"
         raise HTTPException(502, f"Malformed question schema: {ve}")
     except HTTPException:
         # re-raise our own HTTPExceptions untouched
@@ -96,3 +88,5 @@ async def generate_questions(num_questions: int = 15) -> Tuple[List[Question], O
     except Exception as e:
         # catch *everything* else and turn it into JSON
         raise HTTPException(503, f"Question generation failed: {e}")
+    finally:
+        generation_ledger.record_call("generate", settings.OPENAI_MODEL, started, outcome, resp)
@@ -0,0 +1,133 @@
+# app/services/ranking.py
+import asyncio
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from .invalidation import invalidation_bus
+
+# sort key: best descending, then player id ascending (the leaderboard order)
+RankKey = Tuple[int, int]
+
+
+def _key(best: int, player_id: int) -> RankKey:
+    return (-best, player_id)
+
+
+class RankIndex:
+    """
+    All-time best score per player kept in one sorted list, so a player's
+    rank is a binary search. Serves /leaderboard/player/{name}; leaderboard
+    pages read the database, as this copy lags other workers' writes.
+
+    Loaded lazily from the leaderboard query, updated in place by this
+    worker's score submissions, and reloaded once older than `max_age`
+    (or after `invalidate()`) so other workers' writes show up.
+    """
+
+    def __init__(self, max_age: float = 30.0):
+        self.max_age = max_age
+        self._keys: List[RankKey] = []
+        self._entries: Dict[int, Dict[str, Any]] = {}
+        self._ids_by_name: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        # submissions seen while a reload is reading the table
+        self._pending: Optional[List[tuple]] = None
+
+    # ── loading ──────────────────────────────────────────────────────────
+    def _fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.max_age
+
+    async def ensure(self, db: AsyncSession, load_stmt) -> None:
+        """(Re)load from `load_stmt` (player_id, player, best, game_id, played_at rows) if stale."""
+        if self._fresh():
+            return
+        async with self._lock:
+            if self._fresh():
+                return
+            self._pending = []
+            try:
+                rows = (await db.execute(load_stmt)).all()
+                self._keys = sorted(_key(r.best, r.player_id) for r in rows)
+                self._entries = {
+                    r.player_id: {
+                        "player_id": r.player_id,
+                        "player": r.player,
+                        "best": r.best,
+                        "game_id": r.game_id,
+                        "played_at": r.played_at,
+                    }
+                    for r in rows
+                }
+                self._ids_by_name = {r.player: r.player_id for r in rows}
+                self._loaded_at = time.monotonic()
+                pending = self._pending
+            finally:
+                self._pending = None
+            for args in pending:
+                self.offer(*args)
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def reset(self) -> None:
+        self._keys = []
+        self._entries = {}
+        self._ids_by_name = {}
+        self._loaded_at = None
+
+    # ── updates ──────────────────────────────────────────────────────────
+    def offer(self, player_id: int, player: str, score: int, game_id: int, played_at: datetime) -> None:
+        """Fold in a committed score; ties keep the earlier attempt."""
+        if self._pending is not None:
+            self._pending.append((player_id, player, score, game_id, played_at))
+            return
+        if self._loaded_at is None:
+            return
+        current = self._entries.get(player_id)
+        if current is not None:
+            if score <= current["best"]:
+                return
+            old = _key(current["best"], player_id)
+            del self._keys[bisect_left(self._keys, old)]
+        insort(self._keys, _key(score, player_id))
+        self._entries[player_id] = {
+            "player_id": player_id,
+            "player": player,
+            "best": score,
+            "game_id": game_id,
+            "played_at": played_at,
+        }
+        self._ids_by_name[player] = player_id
+
+    # ── queries ──────────────────────────────────────────────────────────
+    def _entry_at(self, position: int) -> Dict[str, Any]:
+        entry = self._entries[self._keys[position][1]]
+        return {**entry, "rank": position + 1}
+
+    def rank(self, player: str, radius: int = 0) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """(player's entry with rank, entries within `radius` places of it) or None."""
+        player_id = self._ids_by_name.get(player)
+        if player_id is None:
+            return None
+        entry = self._entries[player_id]
+        position = bisect_left(self._keys, _key(entry["best"], player_id))
+        lo, hi = max(0, position - radius), min(len(self._keys), position + radius + 1)
+        return self._entry_at(position), [self._entry_at(i) for i in range(lo, hi)]
+
+    def page(self, limit: int, after: Optional[RankKey] = None) -> List[Dict[str, Any]]:
+        """`limit` entries following the (best, player_id) cursor, or from the top."""
+        start = 0 if after is None else bisect_right(self._keys, _key(*after))
+        return [self._entry_at(i) for i in range(start, min(len(self._keys), start + limit))]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+rank_index = RankIndex(max_age=settings.RANK_INDEX_MAX_AGE_SECONDS)
+invalidation_bus.subscribe("leaderboard", lambda _key: rank_index.invalidate())
@@ -0,0 +1,231 @@
+# app/services/rollups.py
+"""
+Per-player best scores per time bucket ("day", "week"), so windowed
+leaderboards read one bucket instead of scanning scores by played_at.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db import dialect_insert
+from ..models import LeaderboardRollup, Player, Score
+
+PERIODS = ("day", "week")
+# buckets that ended before this are never read by a window, only pruned
+BUCKET_RETENTION = timedelta(days=7)
+
+
+def utcnow() -> datetime:
+    # naive UTC, matching the DateTime columns
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_start(period: str, ts: datetime) -> date:
+    """First day of the bucket containing `ts` (weeks start on Monday)."""
+    day = ts.date()
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def bucket_end(period: str, start: date) -> date:
+    return start + timedelta(days=7 if period == "week" else 1)
+
+
+def bucket_rows(player_id: int, game_id: int, score: int, played_at: datetime) -> List[Dict[str, Any]]:
+    """The day and week bucket rows of one score."""
+    return [
+        {
+            "period": period,
+            "bucket_start": bucket_start(period, played_at),
+            "player_id": player_id,
+            "best": score,
+            "game_id": game_id,
+            "played_at": played_at,
+        }
+        for period in PERIODS
+    ]
+
+
+def bucket_upsert(stmt):
+    """ON CONFLICT clause of an INSERT of bucket rows: a higher score replaces the bucket's best."""
+    # keep the earliest attempt on ties, like the all-time leaderboard
+    return stmt.on_conflict_do_update(
+        index_elements=[LeaderboardRollup.period, LeaderboardRollup.bucket_start, LeaderboardRollup.player_id],
+        set_={
+            "best": stmt.excluded.best,
+            "game_id": stmt.excluded.game_id,
+            "played_at": stmt.excluded.played_at,
+        },
+        where=stmt.excluded.best > LeaderboardRollup.best,
+    )
+
+
+async def record_score(db: AsyncSession, player_id: int, game_id: int, score: int, played_at: datetime) -> None:
+    """Fold one new score into its day and week buckets with a single upsert."""
+    await db.execute(bucket_upsert(
+        dialect_insert(db)(LeaderboardRollup).values(bucket_rows(player_id, game_id, score, played_at))
+    ))
+
+
+async def forget_game(db: AsyncSession, game_id: int) -> None:
+    """
+    Drop bucket entries whose best came from a deleted game, then recompute
+    those buckets from the remaining scores. Run after the game's scores
+    are deleted.
+    """
+    removed = (await db.execute(
+        delete(LeaderboardRollup)
+        .where(LeaderboardRollup.game_id == game_id)
+        .returning(LeaderboardRollup.period, LeaderboardRollup.bucket_start, LeaderboardRollup.player_id)
+    )).all()
+    if not removed:
+        return
+
+    lo = min(r.bucket_start for r in removed)
+    hi = max(bucket_end(r.period, r.bucket_start) for r in removed)
+    result = await db.execute(
+        select(Score.id, Score.player_id, Score.game_id, Score.score, Score.played_at)
+        .where(
+            Score.player_id.in_({r.player_id for r in removed}),
+            Score.played_at >= datetime.combine(lo, datetime.min.time()),
+            Score.played_at < datetime.combine(hi, datetime.min.time()),
+        )
+    )
+    candidates = result.all()
+
+    best: Dict[Tuple[str, date, int], tuple] = {}
+    for r in removed:
+        for s in candidates:
+            if s.player_id != r.player_id or bucket_start(r.period, s.played_at) != r.bucket_start:
+                continue
+            key = (r.period, r.bucket_start, r.player_id)
+            rank = (-s.score, s.played_at, s.id)
+            if key not in best or rank < best[key][0]:
+                best[key] = (rank, s)
+    if best:
+        await db.execute(dialect_insert(db)(LeaderboardRollup).values([
+            {
+                "period": period,
+                "bucket_start": start,
+                "player_id": player_id,
+                "best": s.score,
+                "game_id": s.game_id,
+                "played_at": s.played_at,
+            }
+            for (period, start, player_id), (_, s) in best.items()
+        ]))
+
+
+async def prune_buckets(db: AsyncSession, now: Optional[datetime] = None) -> int:
+    """Delete buckets older than the one containing `now - BUCKET_RETENTION`; returns rows deleted."""
+    before = (now or utcnow()) - BUCKET_RETENTION
+    result = await db.execute(delete(LeaderboardRollup).where(or_(*(
+        and_(LeaderboardRollup.period == period, LeaderboardRollup.bucket_start < bucket_start(period, before))
+        for period in PERIODS
+    ))))
+    return result.rowcount
+
+
+def _current_bucket(period: str, now: Optional[datetime]):
+    start = bucket_start(period, now or utcnow())
+    return and_(LeaderboardRollup.period == period, LeaderboardRollup.bucket_start == start)
+
+
+def _ranked_before(best: int, player_id: int):
+    """Rows ordered ahead of (best, player_id) in leaderboard order."""
+    return or_(
+        LeaderboardRollup.best > best,
+        and_(LeaderboardRollup.best == best, LeaderboardRollup.player_id < player_id),
+    )
+
+
+def _ranked_after(best: int, player_id: int):
+    return or_(
+        LeaderboardRollup.best < best,
+        and_(LeaderboardRollup.best == best, LeaderboardRollup.player_id > player_id),
+    )
+
+
+def _entry_columns():
+    return (
+        LeaderboardRollup.player_id,
+        Player.name.label("player"),
+        LeaderboardRollup.best,
+        LeaderboardRollup.game_id,
+        LeaderboardRollup.played_at,
+    )
+
+
+def build_window_leaderboard_query(period: str, limit: int, now: Optional[datetime] = None,
+                                   after: Optional[Tuple[int, int]] = None):
+    """
+    Entries of the current day/week bucket, read as a range of
+    ix_leaderboard_rollups_top; `after` is a (best, player_id) keyset cursor.
+    """
+    stmt = (
+        select(*_entry_columns())
+        .join(Player, Player.id == LeaderboardRollup.player_id)  # type: ignore[arg-type]
+        .where(_current_bucket(period, now))
+    )
+    if after is not None:
+        stmt = stmt.where(_ranked_after(*after))
+    return stmt.order_by(LeaderboardRollup.best.desc(), LeaderboardRollup.player_id).limit(limit)
+
+
+def _as_entry(row, rank: int) -> Dict[str, Any]:
+    return {
+        "player_id": row.player_id,
+        "player": row.player,
+        "best": row.best,
+        "game_id": row.game_id,
+        "played_at": row.played_at,
+        "rank": rank,
+    }
+
+
+async def window_rank(db: AsyncSession, period: str, player: str, radius: int = 0,
+                      now: Optional[datetime] = None) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """
+    A player's rank in the current day/week bucket and the entries within
+    `radius` places of it, or None if they have no score in the bucket.
+    The rank is a count over the index range ahead of the player.
+    """
+    current = _current_bucket(period, now)
+    me = (await db.execute(
+        select(*_entry_columns())
+        .join(Player, Player.id == LeaderboardRollup.player_id)  # type: ignore[arg-type]
+        .where(current, Player.name == player)
+    )).one_or_none()
+    if me is None:
+        return None
+
+    ahead = (await db.execute(
+        select(func.count())
+        .select_from(LeaderboardRollup)
+        .where(current, _ranked_before(me.best, me.player_id))
+    )).scalar_one()
+    rank = ahead + 1
+
+    above: list = []
+    below: list = []
+    if radius:
+        above = (await db.execute(
+            select(*_entry_columns())
+            .join(Player, Player.id == LeaderboardRollup.player_id)  # type: ignore[arg-type]
+            .where(current, _ranked_before(me.best, me.player_id))
+            .order_by(LeaderboardRollup.best, LeaderboardRollup.player_id.desc())
+            .limit(radius)
+        )).all()[::-1]
+        below = (await db.execute(
+            build_window_leaderboard_query(period, radius, now, after=(me.best, me.player_id))
+        )).all()
+
+    around = (
+        [_as_entry(r, rank - len(above) + i) for i, r in enumerate(above)]
+        + [_as_entry(me, rank)]
+        + [_as_entry(r, rank + 1 + i) for i, r in enumerate(below)]
+    )
+    return _as_entry(me, rank), around
@@ -0,0 +1,60 @@
+# app/services/single_flight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Request coalescing for hot read misses: while a load for `key` is in
+    flight, identical calls wait for it and share its result (or exception)
+    instead of running the same query again. Nothing is kept once the load
+    finishes, so results are never older than the request that made them.
+
+    If the caller running the load is cancelled (client gone), one of the
+    waiters runs it again.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        while (shared := self._inflight.get(key)) is not None:
+            self.followers += 1
+            try:
+                return await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise  # this caller was cancelled
+                self.followers -= 1
+
+        self.leaders += 1
+        shared = asyncio.get_running_loop().create_future()
+        self._inflight[key] = shared
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            shared.cancel()
+            raise
+        except Exception as exc:
+            shared.set_exception(exc)
+            shared.exception()  # retrieved: no "never retrieved" warning without waiters
+            raise
+        else:
+            shared.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"leaders": self.leaders, "followers": self.followers, "in_flight": len(self._inflight)}
+
+    def reset(self) -> None:
+        self.leaders = 0
+        self.followers = 0
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,269 @@
+# app/services/snapshot.py
+"""
+Shared read snapshot for multi-worker deployments: the valid game ids and
+the all-time leaderboard top-N in one compact binary file that every
+worker memory-maps read-only, so memory does not grow with the number of
+workers and all workers see the same data.
+
+One worker at a time (whichever holds an exclusive `flock` on
+`<path>.lock`) rebuilds the file from the tables every `refresh` seconds,
+writes it next to the old one and swaps it in with `os.replace`. Readers
+notice the new inode and map it; a worker that dies releases the lock and
+another takes over.
+
+Layout (little-endian):
+
+    header   HEADER
+    games    n_games × int64, ascending
+    entries  n_entries × ENTRY (player_id, best, game_id, played_at µs, name offset, name length)
+    names    UTF-8 player names
+"""
+import asyncio
+import fcntl
+import logging
+import mmap
+import os
+import random
+import struct
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..db import AsyncSessionLocal
+from ..models import Game
+from .invalidation import invalidation_bus
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PPSNAP01"
+# magic, built_at (unix time), leaderboard capacity, n_games, n_entries, names length
+HEADER = struct.Struct("<8sdqqqq")
+ENTRY = struct.Struct("<qqqqII")
+GAME_ID = struct.Struct("<q")
+
+_EPOCH = datetime(1970, 1, 1)
+_NO_TIME = -(2 ** 63)
+
+
+def _micros(at: Optional[datetime]) -> int:
+    return _NO_TIME if at is None else (at - _EPOCH) // timedelta(microseconds=1)
+
+
+def _datetime(micros: int) -> Optional[datetime]:
+    return None if micros == _NO_TIME else _EPOCH + timedelta(microseconds=micros)
+
+
+def encode_snapshot(game_ids: List[int], entries: List[Dict[str, Any]], capacity: int,
+                    built_at: Optional[float] = None) -> bytes:
+    """The file contents for sorted `game_ids` and leaderboard `entries` (player_id, player, best, game_id, played_at)."""
+    names = bytearray()
+    packed = bytearray()
+    for e in entries:
+        name = e["player"].encode()
+        packed += ENTRY.pack(e["player_id"], e["best"], e["game_id"], _micros(e["played_at"]), len(names), len(name))
+        names += name
+    header = HEADER.pack(MAGIC, time.time() if built_at is None else built_at, capacity,
+                         len(game_ids), len(entries), len(names))
+    return b"".join((header, struct.pack(f"<{len(game_ids)}q", *game_ids), bytes(packed), bytes(names)))
+
+
+class SharedSnapshot:
+    """
+    Reader and (when elected) refresher of the snapshot at `path`. Every
+    read returns None when there is no snapshot or it is older than
+    `max_age`, and the caller falls back to the database.
+    """
+
+    def __init__(self, path: Optional[str] = None, refresh: float = 5.0, max_age: float = 30.0,
+                 leaderboard_size: int = 100, session_factory=AsyncSessionLocal, check_interval: float = 0.5):
+        self.path = path
+        self.refresh = refresh
+        self.max_age = max_age
+        self.leaderboard_size = leaderboard_size
+        self.session_factory = session_factory
+        self.check_interval = check_interval
+        self._task: Optional[asyncio.Task] = None
+        self._lock_fd: Optional[int] = None
+        self.reset()
+
+    def reset(self) -> None:
+        self._map: Optional[mmap.mmap] = None
+        self._inode: Optional[tuple] = None
+        self._checked_at = 0.0
+        # deleted by this worker, until a snapshot without them is mapped
+        self._deleted: Set[int] = set()
+
+    # ── reading ──────────────────────────────────────────────────────────
+    def _current(self) -> Optional[mmap.mmap]:
+        if self.path is None:
+            return None
+        now = time.monotonic()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._remap()
+        if self._map is None or time.time() - self._header()[1] > self.max_age:
+            return None
+        return self._map
+
+    def _remap(self) -> None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._map, self._inode = None, None
+            return
+        inode = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        if inode == self._inode:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            valid = HEADER.unpack_from(mapped)[0] == MAGIC
+        except (ValueError, struct.error):  # empty or truncated
+            valid = False
+        if not valid:
+            logger.warning("Ignoring %s: not a snapshot file", self.path)
+            self._map, self._inode = None, inode
+            return
+        # the previous mapping is unmapped once nothing references it
+        self._map, self._inode = mapped, inode
+        # a rebuild may have raced the delete's commit: keep tombstones while the game is still listed
+        self._deleted = {g for g in self._deleted if self._contains(g)}
+
+    def _header(self) -> tuple:
+        return HEADER.unpack_from(self._map)
+
+    def _contains(self, game_id: int) -> bool:
+        n_games = self._header()[3]
+        lo, hi = 0, n_games
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if GAME_ID.unpack_from(self._map, HEADER.size + mid * GAME_ID.size)[0] < game_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo < n_games and GAME_ID.unpack_from(self._map, HEADER.size + lo * GAME_ID.size)[0] == game_id
+
+    def has_game(self, game_id: int) -> Optional[bool]:
+        if self._current() is None:
+            return None
+        return game_id not in self._deleted and self._contains(game_id)
+
+    def random_game_id(self, attempts: int = 5) -> Optional[int]:
+        """A uniformly drawn game id, or None (no snapshot, no games, or only deleted ones drawn)."""
+        mapped = self._current()
+        if mapped is None:
+            return None
+        n_games = self._header()[3]
+        for _ in range(attempts if n_games else 0):
+            game_id = GAME_ID.unpack_from(mapped, HEADER.size + random.randrange(n_games) * GAME_ID.size)[0]
+            if game_id not in self._deleted:
+                return game_id
+        return None
+
+    def leaderboard(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """The top `limit` entries, or None unless the snapshot holds all of them."""
+        mapped = self._current()
+        if mapped is None:
+            return None
+        _, _, capacity, n_games, n_entries, _ = self._header()
+        if limit > n_entries and n_entries >= capacity:
+            return None
+        entries_at = HEADER.size + n_games * GAME_ID.size
+        names_at = entries_at + n_entries * ENTRY.size
+        top = []
+        for i in range(min(limit, n_entries)):
+            player_id, best, game_id, played_at, offset, length = ENTRY.unpack_from(mapped, entries_at + i * ENTRY.size)
+            top.append({
+                "player_id": player_id,
+                "player": mapped[names_at + offset:names_at + offset + length].decode(),
+                "best": best,
+                "game_id": game_id,
+                "played_at": _datetime(played_at),
+            })
+        return top
+
+    def forget_game(self, game_id: int) -> None:
+        """A game this worker deleted: stop reporting it before the next rebuild."""
+        self._deleted.add(game_id)
+
+    # ── refreshing ───────────────────────────────────────────────────────
+    def try_elect(self) -> bool:
+        """Become the refresher if no other process is (non-blocking)."""
+        if self._lock_fd is not None:
+            return True
+        fd = os.open(f"{self.path}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def resign(self) -> None:
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # releases the flock
+            self._lock_fd = None
+
+    async def rebuild(self, db: AsyncSession, leaderboard_query: Callable) -> None:
+        """Read the tables and atomically replace the snapshot file."""
+        game_ids = list((await db.execute(select(Game.id).order_by(Game.id))).scalars())
+        rows = (await db.execute(leaderboard_query(self.leaderboard_size, db.bind.dialect.name))).all()
+        entries = [r._asdict() for r in rows]
+        # encoding and fsync block for as long as the file is large: keep them off the event loop
+        await asyncio.to_thread(self._write, game_ids, entries)
+        self._checked_at = 0.0
+
+    def _write(self, game_ids: List[int], entries: List[Dict[str, Any]]) -> None:
+        data = encode_snapshot(game_ids, entries, self.leaderboard_size)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    async def run_once(self, leaderboard_query: Callable) -> bool:
+        if not self.try_elect():
+            return False
+        async with self.session_factory() as db:
+            await self.rebuild(db, leaderboard_query)
+        return True
+
+    async def _run(self, leaderboard_query: Callable) -> None:
+        while True:
+            try:
+                await self.run_once(leaderboard_query)
+            except Exception:
+                logger.exception("Snapshot refresh failed")
+            await asyncio.sleep(self.refresh)
+
+    def start(self, leaderboard_query: Callable) -> None:
+        """`leaderboard_query(limit, dialect_name)` selects player_id, player, best, game_id, played_at."""
+        if self.path is None:
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(leaderboard_query))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.resign()
+
+
+shared_snapshot = SharedSnapshot(
+    path=settings.SNAPSHOT_PATH,
+    refresh=settings.SNAPSHOT_REFRESH_SECONDS,
+    max_age=settings.SNAPSHOT_MAX_AGE_SECONDS,
+    leaderboard_size=settings.SNAPSHOT_LEADERBOARD_SIZE,
+)
+invalidation_bus.subscribe("game_deleted", lambda key: shared_snapshot.forget_game(int(key)))
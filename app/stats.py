@@ -0,0 +1,10 @@
+# app/stats.py
+"""Small statistics helpers shared by the app and the benchmark scripts (no settings or DB imports)."""
+import math
+from typing import List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(len(sorted_values) * pct / 100))
+    return sorted_values[rank - 1]
@@ -0,0 +1,65 @@
+# scripts/_db.py
+"""Engine and schema helpers shared by the benchmark and seeding scripts."""
+import os
+import random
+import tempfile
+
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(_type, _compiler, **_kw):
+    # lets the production models (app.models) run on a local SQLite file
+    return "JSON"
+
+
+def default_sqlite_url(name: str) -> str:
+    return f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), name)}"
+
+
+def ensure_app_env(database_url: str) -> None:
+    """Settings() is built at import time; give it enough to import `app`."""
+    os.environ.setdefault("DATABASE_URL", database_url)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("ADMIN_API_KEY", "sk-bench-admin")
+
+
+def make_engine(database_url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    connect_args = {"timeout": 30} if database_url.startswith("sqlite") else {}
+    return create_async_engine(database_url, future=True, connect_args=connect_args)
+
+
+async def reset_schema(engine) -> None:
+    from app.models import Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+
+CATEGORIES = [
+    "History", "Geography", "Science", "Arts & Literature", "Sports",
+    "Pop Culture", "Food & Drink", "Nature", "Tech & Innovation", "World Cultures",
+]
+
+
+def sample_question(game_no: int, difficulty: int, kind: str = "question") -> dict:
+    return {
+        "q": f"Synthetic {kind} {difficulty} of game {game_no}?",
+        "correct": f"Answer {game_no}-{difficulty}",
+        "wrong": [f"Wrong {game_no}-{difficulty}-{i}" for i in range(3)],
+        "difficulty": difficulty,
+        "category": CATEGORIES[(game_no + difficulty) % len(CATEGORIES)],
+        "hint": f"Hint for {game_no}-{difficulty}.",
+    }
+
+
+def sample_game_payload(game_no: int) -> dict:
+    """A full-size game: 15 questions plus a bonus, shaped like generate_questions output."""
+    return {
+        "questions": [sample_question(game_no, d) for d in range(1, 16)],
+        "bonus_question": sample_question(game_no, random.randint(8, 10), kind="bonus"),
+    }
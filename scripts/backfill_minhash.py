@@ -0,0 +1,63 @@
+# scripts/backfill_minhash.py
+"""
+Compute the MinHash signature of every bank question stored without one
+(games split into the bank by migration b81f4c6e2d57, or written before
+near-duplicate detection), then report the near-duplicate pairs found.
+
+    python -m scripts.backfill_minhash --batch-size 1000 --report 20
+
+Each batch is its own short transaction, so it can run against a live
+database and be interrupted and rerun. Defaults to the application's
+DATABASE_URL.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from scripts._db import ensure_app_env, make_engine
+
+
+async def run(database_url: str, batch_size: int) -> Tuple[int, List[Tuple[str, str, float]]]:
+    ensure_app_env(database_url)
+
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+    from app.services.near_duplicates import NearDuplicateIndex, backfill_signatures
+
+    engine = make_engine(database_url)
+    try:
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+        signed = await backfill_signatures(session_factory, batch_size)
+        index = NearDuplicateIndex(session_factory=session_factory)
+        async with session_factory() as session:
+            await index.ensure(session)
+        return signed, index.pairs()
+    finally:
+        await engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="defaults to $DATABASE_URL")
+    parser.add_argument("--batch-size", type=int, default=1_000, help="questions per transaction")
+    parser.add_argument("--report", type=int, default=20, help="near-duplicate pairs to print")
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    started = time.perf_counter()
+    signed, pairs = asyncio.run(run(args.database_url, args.batch_size))
+    print(f"signed {signed} questions ({time.perf_counter() - started:.1f}s); "
+          f"{len(pairs)} near-duplicate pairs")
+    for a, b, score in pairs[:args.report]:
+        print(f"  {score:.2f}  {a[:12]}  {b[:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
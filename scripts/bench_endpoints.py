@@ -0,0 +1,239 @@
+# scripts/bench_endpoints.py
+"""
+Endpoint benchmark: drives the real FastAPI app in-process through
+httpx.ASGITransport against a seeded database and reports throughput and
+latency percentiles per endpoint.
+
+    python -m scripts.bench_endpoints --requests 200 --concurrency 16 \\
+        --out bench-results.json --baseline bench-baseline.json
+
+Runs against a temporary SQLite file by default; pass
+`--database-url postgresql+asyncpg://...` to use a local Postgres (the
+schema in that database is dropped and recreated).
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.stats import percentile
+from scripts._db import default_sqlite_url, ensure_app_env, make_engine, reset_schema, sample_game_payload
+
+ENDPOINTS = ["get_game", "random_game", "list_games", "submit_score", "get_leaderboard", "game_exists"]
+
+# (method, url, json body) for one request
+RequestSpec = Tuple[str, str, Optional[dict]]
+
+
+def summarize(latencies_s: List[float], errors: int, wall_s: float) -> Dict[str, Any]:
+    ms = sorted(v * 1000 for v in latencies_s)
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "throughput_rps": round(len(ms) / wall_s, 2) if wall_s else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ms, 50), 3),
+            "p90": round(percentile(ms, 90), 3),
+            "p99": round(percentile(ms, 99), 3),
+            "mean": round(statistics.fmean(ms), 3),
+            "max": round(ms[-1], 3),
+        },
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Return one message per regression: p50/p99 latency above, or throughput
+    below, the baseline by more than `tolerance` (a fraction).
+    """
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        for pct in ("p50", "p99"):
+            old, new = base["latency_ms"][pct], cur["latency_ms"][pct]
+            if old and new > old * (1 + tolerance):
+                regressions.append(f"{name}: {pct} {old:.2f}ms -> {new:.2f}ms")
+        old, new = base["throughput_rps"], cur["throughput_rps"]
+        if old and new < old * (1 - tolerance):
+            regressions.append(f"{name}: throughput {old:.1f} -> {new:.1f} req/s")
+    return regressions
+
+
+async def seed(session_factory, games: int, players: int, scores: int) -> List[int]:
+    """Bulk-load games, players and scores; returns the game ids."""
+    from sqlalchemy import insert, select
+    from app.models import Game, Player, Score
+
+    async with session_factory() as session:
+        await session.execute(insert(Game), [
+            {"questions_json": sample_game_payload(i), "questions_hash": f"bench-{i:08d}"}
+            for i in range(games)
+        ])
+        await session.execute(insert(Player), [{"name": f"bench-player-{i}"} for i in range(players)])
+        game_ids = list((await session.execute(select(Game.id))).scalars())
+        player_ids = list((await session.execute(select(Player.id))).scalars())
+        for start in range(0, scores, 10_000):
+            await session.execute(insert(Score), [
+                {
+                    "player_id": random.choice(player_ids),
+                    "game_id": random.choice(game_ids),
+                    "score": random.randint(0, 1_000_000),
+                }
+                for _ in range(min(10_000, scores - start))
+            ])
+        await session.commit()
+    return game_ids
+
+
+def request_factories(game_ids: List[int], players: int) -> Dict[str, Callable[[], RequestSpec]]:
+    return {
+        "get_game": lambda: ("GET", f"/games/{random.choice(game_ids)}", None),
+        "random_game": lambda: ("GET", "/games/random", None),
+        "list_games": lambda: ("GET", "/games/list", None),
+        "submit_score": lambda: ("POST", f"/games/{random.choice(game_ids)}/score", {
+            "player_name": f"bench-player-{random.randrange(players)}",
+            "score": random.randint(0, 1_000_000),
+        }),
+        "get_leaderboard": lambda: ("GET", "/leaderboard/?limit=10", None),
+        "game_exists": lambda: ("GET", f"/games/{random.choice(game_ids)}/exists", None),
+    }
+
+
+async def run_endpoint(client, make_request: Callable[[], RequestSpec], requests: int,
+                       concurrency: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        method, url, body = make_request()
+        await client.request(method, url, json=body)
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, body = make_request()
+            t0 = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run_benchmarks(database_url: str, endpoints: List[str], requests: int, concurrency: int,
+                         warmup: int, games: int, players: int, scores: int) -> Dict[str, Any]:
+    ensure_app_env(database_url)
+
+    from httpx import ASGITransport, AsyncClient
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+    from app.deps import get_db, get_read_db, make_read_db
+    from app.main import app
+
+    engine = make_engine(database_url)
+    await reset_schema(engine)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def bench_get_db():
+        async with session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    game_ids = await seed(session_factory, games, players, scores)
+    factories = request_factories(game_ids, players)
+
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = bench_get_db
+    app.dependency_overrides[get_read_db] = make_read_db(session_factory, session_factory)
+    results = {}
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in endpoints:
+                results[name] = await run_endpoint(client, factories[name], requests, concurrency, warmup)
+                print(f"{name:<16} {results[name]['throughput_rps']:>9.1f} req/s  "
+                      f"p50 {results[name]['latency_ms']['p50']:>8.2f}ms  "
+                      f"p99 {results[name]['latency_ms']['p99']:>8.2f}ms  "
+                      f"errors {results[name]['errors']}")
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous_overrides)
+        await engine.dispose()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "requests": requests,
+            "concurrency": concurrency,
+            "seed": {"games": games, "players": players, "scores": scores},
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=default_sqlite_url("millionaire-bench.db"))
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        help=f"comma-separated subset of {', '.join(ENDPOINTS)}")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--scores", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=1234, help="random seed for data and request mix")
+    parser.add_argument("--out", help="write JSON results to this path")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed relative slowdown before reporting a regression")
+    args = parser.parse_args(argv)
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    random.seed(args.seed)
+    report = asyncio.run(run_benchmarks(
+        args.database_url, endpoints, args.requests, args.concurrency, args.warmup,
+        args.games, args.players, args.scores,
+    ))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_results(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# scripts/bench_startup.py
+"""
+Cold-start benchmark: each run is a fresh interpreter that imports
+`app.main`, runs the lifespan (pool warm-up and cache priming) and serves
+one request, the way the first request after a scale-from-zero is served.
+
+    python -m scripts.bench_startup --runs 5 --out startup.json
+
+Reported per run, in milliseconds: `import_ms` (import app.main),
+`lifespan_ms` (startup), `first_response_ms` (from the start of the import
+to the end of the first response) and `process_ms` (wall time of the whole
+process, interpreter start included), plus whether `openai` was loaded.
+The medians are checked against IMPORT_BUDGET_MS and
+FIRST_RESPONSE_BUDGET_MS.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from scripts._db import ensure_app_env, make_engine, reset_schema
+
+IMPORT_BUDGET_MS = 1500
+FIRST_RESPONSE_BUDGET_MS = 2500
+
+# runs in the child; the HTTP client is imported before timing since it is not part of the app
+PROBE = r"""
+import asyncio, json, sys, time
+from httpx import ASGITransport, AsyncClient
+
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+
+async def serve_first(path):
+    async with app.main.app.router.lifespan_context(app.main.app):
+        ready = time.perf_counter()
+        async with AsyncClient(transport=ASGITransport(app=app.main.app), base_url="http://bench") as client:
+            response = await client.get(path)
+        done = time.perf_counter()
+    return response.status_code, ready, done
+
+
+status, ready, done = asyncio.run(serve_first(sys.argv[1]))
+print(json.dumps({
+    "status": status,
+    "import_ms": (imported - started) * 1000,
+    "lifespan_ms": (ready - imported) * 1000,
+    "first_response_ms": (done - started) * 1000,
+    "openai_loaded": "openai" in sys.modules,
+}))
+"""
+
+
+async def create_schema(database_url: str) -> None:
+    engine = make_engine(database_url)
+    try:
+        await reset_schema(engine)
+    finally:
+        await engine.dispose()
+
+
+def measure(database_url: str, path: str) -> Dict[str, Any]:
+    env = dict(os.environ, DATABASE_URL=database_url, OPENAI_API_KEY="sk-bench", ADMIN_API_KEY="sk-bench-admin")
+    env.pop("READ_DATABASE_URL", None)
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE, path], env=env, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def run(runs: int = 5, path: str = "/games/list") -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'startup.db')}"
+        ensure_app_env(database_url)
+        asyncio.run(create_schema(database_url))
+        samples = [measure(database_url, path) for _ in range(runs)]
+
+    median = {
+        key: round(statistics.median(s[key] for s in samples), 1)
+        for key in ("import_ms", "lifespan_ms", "first_response_ms", "process_ms")
+    }
+    return {
+        "runs": runs,
+        "path": path,
+        "median": median,
+        "statuses": sorted({s["status"] for s in samples}),
+        "openai_loaded": any(s["openai_loaded"] for s in samples),
+        "within_budget": (median["import_ms"] <= IMPORT_BUDGET_MS
+                          and median["first_response_ms"] <= FIRST_RESPONSE_BUDGET_MS),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--path", default="/games/list", help="the first request")
+    parser.add_argument("--out", help="write JSON results to this path")
+    args = parser.parse_args(argv)
+
+    results = run(args.runs, args.path)
+    for key, value in results["median"].items():
+        print(f"{key:<18} {value:>9.1f}ms")
+    print(f"openai loaded: {results['openai_loaded']}  within budget: {results['within_budget']}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# scripts/compact_scores.py
+"""
+Fold raw scores older than the retention window into score_summaries.
+
+    python -m scripts.compact_scores --retention-days 90 --batch-size 5000
+
+Each batch deletes the oldest raw rows and merges them into the summaries
+in its own short transaction, so it is safe against a live database and
+can be interrupted and rerun at any point. Leaderboards are unchanged.
+Defaults to the application's DATABASE_URL and SCORE_RETENTION_DAYS.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import List, Optional
+
+from scripts._db import ensure_app_env, make_engine
+
+
+async def run(database_url: str, retention_days: int, batch_size: int, pause: float) -> int:
+    ensure_app_env(database_url)
+
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+    from app.services.compaction import compact, retention_cutoff
+
+    cutoff = retention_cutoff(retention_days)
+    engine = make_engine(database_url)
+    try:
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+        return await compact(session_factory, cutoff, batch_size, pause)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="defaults to $DATABASE_URL")
+    parser.add_argument("--retention-days", type=int,
+                        default=int(os.environ["SCORE_RETENTION_DAYS"]) if os.environ.get("SCORE_RETENTION_DAYS") else None,
+                        help="keep raw scores this many days (defaults to $SCORE_RETENTION_DAYS)")
+    parser.add_argument("--batch-size", type=int, default=5_000, help="raw rows per transaction")
+    parser.add_argument("--pause", type=float, default=0.05, help="seconds to sleep between batches")
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+    if args.retention_days is None:
+        parser.error("--retention-days or SCORE_RETENTION_DAYS is required")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    started = time.perf_counter()
+    try:
+        moved = asyncio.run(run(args.database_url, args.retention_days, args.batch_size, args.pause))
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(f"compacted {moved:,} raw scores in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
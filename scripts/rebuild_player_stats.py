@@ -0,0 +1,54 @@
+# scripts/rebuild_player_stats.py
+"""
+Recompute every player_stats row from the scores table.
+
+    python -m scripts.rebuild_player_stats --batch-size 5000
+
+Works through player id ranges, one DELETE + INSERT ... SELECT ... GROUP BY
+per batch in its own transaction, so it can run against a live database
+(submissions for a batch in progress wait on its row locks only briefly).
+Defaults to the application's DATABASE_URL.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import List, Optional
+
+from scripts._db import ensure_app_env, make_engine
+
+
+async def rebuild(database_url: str, batch_size: int) -> int:
+    ensure_app_env(database_url)
+
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+    from app.services.player_stats import rebuild_all
+
+    engine = make_engine(database_url)
+    try:
+        session_factory = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+        return await rebuild_all(session_factory, batch_size)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="defaults to $DATABASE_URL")
+    parser.add_argument("--batch-size", type=int, default=5_000, help="player ids per transaction")
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    started = time.perf_counter()
+    batches = asyncio.run(rebuild(args.database_url, args.batch_size))
+    print(f"rebuilt player_stats in {batches} batches ({time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+# scripts/seed_scale.py
+"""
+Synthetic data generator for leaderboard / score scaling tests.
+
+Bulk-loads games, players and scores into the schema from app.models with
+skewed distributions, and captures query plans (EXPLAIN) for the
+leaderboard and score queries each time the score table reaches one of
+the requested scales:
+
+    python -m scripts.seed_scale --games 2000 --players 200k \\
+        --scales 100k,1M,10M --explain-out plans.json
+
+Scores are streamed in batches (COPY on Postgres, executemany on SQLite),
+so tens of millions of rows never sit in memory at once.
+
+Distributions:
+  * player activity and game popularity are Zipf-like (`--player-skew`,
+    `--game-skew`; 0 = uniform), so a few players own most attempts;
+  * a score is the prize-ladder tier reached when each question is
+    survived with probability `--survival`, so most runs bust early and
+    ties on the common tiers are frequent, like production data;
+  * played_at is spread over `--days`, biased towards recent days.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from scripts._db import default_sqlite_url, ensure_app_env, make_engine, reset_schema, sample_game_payload
+
+PRIZE_LADDER = [
+    0, 100, 200, 300, 500, 1_000, 2_000, 4_000, 8_000, 16_000,
+    32_000, 64_000, 125_000, 250_000, 500_000, 1_000_000,
+]
+
+
+def parse_count(value: str) -> int:
+    """'250', '10k', '1.5M' → int."""
+    value = value.strip().lower().replace("_", "")
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    if multiplier != 1:
+        value = value[:-1]
+    return int(float(value) * multiplier)
+
+
+def zipf_cum_weights(n: int, skew: float) -> List[float]:
+    """Cumulative weights of a Zipf(skew) distribution over n ranks."""
+    return list(itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+class ScoreGenerator:
+    """Streams (player_id, game_id, score, played_at) rows."""
+
+    def __init__(self, player_ids: Sequence[int], game_ids: Sequence[int], player_skew: float,
+                 game_skew: float, survival: float, days: int, rng: random.Random):
+        self.rng = rng
+        # shuffle so the heavy hitters are not simply the lowest ids
+        self.player_ids = list(player_ids)
+        self.game_ids = list(game_ids)
+        rng.shuffle(self.player_ids)
+        rng.shuffle(self.game_ids)
+        self.player_cum = zipf_cum_weights(len(self.player_ids), player_skew)
+        self.game_cum = zipf_cum_weights(len(self.game_ids), game_skew)
+        self.log_survival = math.log(survival) if 0 < survival < 1 else None
+        self.days = days
+        self.now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def _tiers(self, k: int) -> List[int]:
+        if self.log_survival is None:
+            return [len(PRIZE_LADDER) - 1] * k
+        top = len(PRIZE_LADDER) - 1
+        # geometric number of questions survived, capped at the top tier
+        return [
+            min(top, int(math.log(1.0 - self.rng.random()) / self.log_survival))
+            for _ in range(k)
+        ]
+
+    def batch(self, k: int) -> List[Tuple[int, int, int, datetime]]:
+        rng = self.rng
+        players = rng.choices(self.player_ids, cum_weights=self.player_cum, k=k)
+        games = rng.choices(self.game_ids, cum_weights=self.game_cum, k=k)
+        tiers = self._tiers(k)
+        mean_age = max(self.days, 1) / 3
+        return [
+            (
+                players[i],
+                games[i],
+                PRIZE_LADDER[tiers[i]],
+                self.now - timedelta(days=min(rng.expovariate(1 / mean_age), self.days),
+                                     seconds=rng.randrange(86_400)),
+            )
+            for i in range(k)
+        ]
+
+
+# ── bulk load paths ──────────────────────────────────────────────────────
+async def _prepare_sqlite(conn) -> None:
+    await conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    await conn.exec_driver_sql("PRAGMA synchronous=OFF")
+
+
+async def bulk_insert(conn, table: str, columns: List[str], rows: List[tuple]) -> None:
+    """COPY on Postgres (asyncpg), a single executemany elsewhere."""
+    if not rows:
+        return
+    if conn.dialect.name == "postgresql":
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(table, records=rows, columns=columns)
+    else:
+        placeholders = ", ".join("?" for _ in columns)
+        await conn.exec_driver_sql(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", rows
+        )
+
+
+async def load_games_and_players(engine, games: int, players: int) -> Tuple[List[int], List[int]]:
+    from sqlalchemy import func, insert, select
+    from app.models import Game, Player
+
+    async with engine.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            await _prepare_sqlite(conn)
+        existing_games = (await conn.execute(select(func.count()).select_from(Game))).scalar_one()
+        existing_players = (await conn.execute(select(func.count()).select_from(Player))).scalar_one()
+        for start in range(0, games, 1_000):
+            await conn.execute(insert(Game), [
+                {"questions_json": sample_game_payload(i), "questions_hash": f"seed-{i:09d}"}
+                for i in range(existing_games + start, existing_games + min(games, start + 1_000))
+            ])
+        await bulk_insert(conn, "players", ["name"], [
+            (f"player-{i:09d}",) for i in range(existing_players, existing_players + players)
+        ])
+        game_ids = list((await conn.execute(select(Game.id))).scalars())
+        player_ids = list((await conn.execute(select(Player.id))).scalars())
+    return game_ids, player_ids
+
+
+async def load_scores(engine, generator: ScoreGenerator, count: int, batch_size: int) -> None:
+    columns = ["player_id", "game_id", "score", "played_at"]
+    loaded = 0
+    started = time.perf_counter()
+    while loaded < count:
+        rows = generator.batch(min(batch_size, count - loaded))
+        async with engine.begin() as conn:
+            if conn.dialect.name == "sqlite":
+                await _prepare_sqlite(conn)
+            await bulk_insert(conn, "scores", columns, rows)
+        loaded += len(rows)
+        rate = loaded / (time.perf_counter() - started)
+        print(f"  scores +{loaded:,}/{count:,} ({rate:,.0f} rows/s)", end="\r", flush=True)
+    print()
+
+
+async def count_scores(engine) -> int:
+    from sqlalchemy import func, select
+    from app.models import Score
+
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(Score))).scalar_one()
+
+
+async def analyze(engine) -> None:
+    """Refresh planner statistics so EXPLAIN reflects the new volume."""
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+
+
+# ── query plans ──────────────────────────────────────────────────────────
+def explain_targets(dialect_name: str, game_id: int, player_id: int) -> Dict[str, Any]:
+    """The leaderboard and score statements the API runs, with sample parameters."""
+    from sqlalchemy import select, func
+    from app.models import Player, Score
+    from app.routers.leaderboard import build_leaderboard_query
+
+    return {
+        "leaderboard_top10": build_leaderboard_query(10, dialect_name),
+        "leaderboard_top100": build_leaderboard_query(100, dialect_name),
+        # rows removed by delete_game
+        "scores_for_game": select(Score.id).where(Score.game_id == game_id),
+        "game_top_scores": (
+            select(Score.player_id, Score.score)
+            .where(Score.game_id == game_id)
+            .order_by(Score.score.desc())
+            .limit(10)
+        ),
+        "player_best": select(func.max(Score.score)).where(Score.player_id == player_id),
+        "player_by_name": select(Player.id).where(Player.name == "player-000000001"),
+    }
+
+
+async def capture_plans(engine, game_id: int, player_id: int, analyze_plans: bool,
+                        execute: bool = True) -> Dict[str, Any]:
+    plans = {}
+    async with engine.connect() as conn:
+        dialect = conn.dialect
+        if dialect.name == "postgresql":
+            prefix = "EXPLAIN (ANALYZE, BUFFERS) " if analyze_plans else "EXPLAIN "
+        else:
+            prefix = "EXPLAIN QUERY PLAN "
+        for name, stmt in explain_targets(dialect.name, game_id, player_id).items():
+            sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+            result = await conn.exec_driver_sql(prefix + sql)
+            if dialect.name == "postgresql":
+                plan = [row[0] for row in result]
+            else:
+                plan = [row[-1] for row in result]
+
+            elapsed_ms = None
+            if execute:
+                t0 = time.perf_counter()
+                await conn.exec_driver_sql(sql)
+                elapsed_ms = round((time.perf_counter() - t0) * 1000, 3)
+
+            plans[name] = {"sql": sql, "plan": plan, "elapsed_ms": elapsed_ms}
+    return plans
+
+
+def print_plans(scale: int, plans: Dict[str, Any]) -> None:
+    print(f"── plans at {scale:,} scores ──")
+    for name, entry in plans.items():
+        timing = f"  ({entry['elapsed_ms']:.1f} ms)" if entry["elapsed_ms"] is not None else ""
+        print(f"{name}{timing}")
+        for line in entry["plan"]:
+            print(f"    {line}")
+
+
+async def seed(args) -> List[Dict[str, Any]]:
+    ensure_app_env(args.database_url)
+    engine = make_engine(args.database_url)
+    rng = random.Random(args.seed)
+    reports = []
+    try:
+        if not args.append:
+            await reset_schema(engine)
+
+        print(f"loading {args.games:,} games and {args.players:,} players")
+        game_ids, player_ids = await load_games_and_players(engine, args.games, args.players)
+        generator = ScoreGenerator(player_ids, game_ids, args.player_skew, args.game_skew,
+                                   args.survival, args.days, rng)
+
+        loaded = await count_scores(engine)
+        for scale in sorted(args.scales):
+            if scale > loaded:
+                await load_scores(engine, generator, scale - loaded, args.batch_size)
+                loaded = scale
+            await analyze(engine)
+            # plan against the most popular game / most active player
+            plans = await capture_plans(engine, generator.game_ids[0], generator.player_ids[0],
+                                        args.analyze, execute=not args.explain_only)
+            print_plans(scale, plans)
+            reports.append({
+                "scale": scale,
+                "database": engine.dialect.name,
+                "games": len(game_ids),
+                "players": len(player_ids),
+                "plans": plans,
+            })
+    finally:
+        await engine.dispose()
+    return reports
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=default_sqlite_url("millionaire-scale.db"))
+    parser.add_argument("--games", type=parse_count, default=1_000)
+    parser.add_argument("--players", type=parse_count, default=parse_count("50k"))
+    parser.add_argument("--scores", type=parse_count, default=None,
+                        help="total scores to load (defaults to the largest --scales value)")
+    parser.add_argument("--scales", default="100k",
+                        help="comma-separated score counts at which query plans are captured")
+    parser.add_argument("--player-skew", type=float, default=1.1, help="Zipf exponent of player activity")
+    parser.add_argument("--game-skew", type=float, default=0.8, help="Zipf exponent of game popularity")
+    parser.add_argument("--survival", type=float, default=0.8,
+                        help="probability of surviving each question (shapes the score distribution)")
+    parser.add_argument("--days", type=int, default=90, help="spread played_at over this many days")
+    parser.add_argument("--batch-size", type=parse_count, default=parse_count("50k"))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--append", action="store_true", help="keep existing rows instead of recreating the schema")
+    parser.add_argument("--analyze", action="store_true", help="use EXPLAIN ANALYZE on Postgres")
+    parser.add_argument("--explain-only", action="store_true",
+                        help="only EXPLAIN the statements, do not time them")
+    parser.add_argument("--explain-out", help="write plans per scale to this JSON file")
+    args = parser.parse_args(argv)
+
+    args.scales = [parse_count(s) for s in args.scales.split(",") if s.strip()]
+    if args.scores is not None:
+        args.scales = [s for s in args.scales if s < args.scores] + [args.scores]
+
+    reports = asyncio.run(seed(args))
+    if args.explain_out:
+        with open(args.explain_out, "w") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@ import os
 import uuid
 import pytest
 
+from contextlib import ExitStack
+
 from unittest.mock import patch
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
@@ -11,8 +13,19 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.deps import get_db, get_admin_key
-from tests.test_models import BaseTest, Game, Player, Score
+from app.compression import compression_stats, payload_cache
+from app.deps import get_db, get_admin_key, get_read_db, make_read_db
+from app.services.assembly import question_pool
+from app.services.cache import game_leaderboard_cache, game_question_cache
+from app.services.generation_ledger import generation_ledger
+from app.services.live_leaderboard import live_leaderboard
+from app.services.near_duplicates import near_duplicates
+from app.services.pool_warmup import pool_warmup
+from app.services.ranking import rank_index
+from app.services.single_flight import single_flight
+from app.services.snapshot import shared_snapshot
+from tests.test_models import BaseTest, Game, Player, Score, GenerationRun, LeaderboardRollup, PlayerGame, PlayerStats, ScoreSummary, QuestionRecord, GameQuestion
+from tests.query_counter import QueryCounter
 
 # ── Shared in-memory DB engine and sessionmaker ───────────────────────────
 TEST_DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
@@ -43,9 +56,16 @@ async def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+# no replica in tests: reads share the primary test database
+app.dependency_overrides[get_read_db] = make_read_db(TestSessionLocal, TestSessionLocal)
 
 app.dependency_overrides[get_admin_key] = lambda: "sk-test-admin-key"
 
+# Ledger batches are written through their own sessions
+generation_ledger.session_factory = TestSessionLocal
+live_leaderboard.session_factory = TestSessionLocal
+near_duplicates.session_factory = TestSessionLocal
+
 
 # ── Drop and (re)create tables between tests ───────────────────────────
 @pytest.fixture(autouse=True)
@@ -58,6 +78,17 @@ async def reset_db_for_tests():
     async with test_engine.begin() as conn:
         await conn.run_sync(BaseTest.metadata.drop_all)
         await conn.run_sync(BaseTest.metadata.create_all)
+    generation_ledger.reset()
+    game_leaderboard_cache.clear()
+    game_question_cache.clear()
+    rank_index.reset()
+    question_pool.reset()
+    near_duplicates.reset()
+    payload_cache.clear()
+    compression_stats.reset()
+    pool_warmup.reset()
+    shared_snapshot.reset()
+    single_flight.reset()
     yield
 
 
@@ -78,6 +109,12 @@ async def db_session():
             await session.rollback()
 
 
+# ── Sessionmaker for code that opens its own sessions ───────────────────
+@pytest.fixture
+def session_factory():
+    return TestSessionLocal
+
+
 # ── Async HTTP client mounted in-process via ASGI ────────────────────────
 @pytest.fixture
 async def client():
@@ -86,6 +123,13 @@ async def client():
         yield ac
 
 
+# ── Count statements sent to the test DB ─────────────────────────────────
+@pytest.fixture
+def count_queries():
+    """Returns a context manager recording the statements run inside it."""
+    return lambda: QueryCounter(test_engine)
+
+
 # ── Optional sync TestClient ───────────────────────────────────────────
 @pytest.fixture
 def test_client():
@@ -103,14 +147,30 @@ def mock_settings():
 
 
 # ── Patch models to use test-specific models ────────────────────────────
+# module → test models it imports from app.models
+PATCHED_MODELS = {
+    "app.routers.games": [Game, GameQuestion, Score, ScoreSummary],
+    "app.routers.scores": [Game, LeaderboardRollup, Player, PlayerGame, PlayerStats, Score],
+    "app.routers.leaderboard": [Game, Player, Score, ScoreSummary],
+    "app.routers.players": [Player, PlayerStats],
+    "app.routers.admin": [GenerationRun],
+    "app.services.generation_ledger": [GenerationRun],
+    "app.services.rollups": [LeaderboardRollup, Player, Score],
+    "app.services.player_stats": [Player, PlayerGame, PlayerStats, Score, ScoreSummary],
+    "app.services.compaction": [Score, ScoreSummary],
+    "app.services.question_bank": [Game, GameQuestion, QuestionRecord],
+    "app.services.assembly": [QuestionRecord],
+    "app.services.near_duplicates": [QuestionRecord],
+    "app.services.snapshot": [Game],
+}
+
+
 @pytest.fixture(autouse=True)
 def patch_models():
-    with patch("app.routers.games.Game", Game), \
-            patch("app.routers.scores.Game", Game), \
-            patch("app.routers.scores.Player", Player), \
-            patch("app.routers.scores.Score", Score), \
-            patch("app.routers.leaderboard.Player", Player), \
-            patch("app.routers.leaderboard.Score", Score):
+    with ExitStack() as stack:
+        for module, models in PATCHED_MODELS.items():
+            for model in models:
+                stack.enter_context(patch(f"{module}.{model.__name__}", model))
         yield
 
 
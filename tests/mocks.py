@@ -1,5 +1,6 @@
 # tests/mocks.py
 import json
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 import pytest
 
@@ -40,6 +41,9 @@ MOCK_OPENAI_RESPONSE = {
     "bonus_question": SAMPLE_BONUS_QUESTION.model_dump()
 }
 
+MOCK_PROMPT_TOKENS = 420
+MOCK_COMPLETION_TOKENS = 1337
+
 
 @pytest.fixture
 def mock_openai():
@@ -54,8 +58,10 @@ def mock_openai():
     mock_message.content = json.dumps(MOCK_OPENAI_RESPONSE)
     mock_choice.message = mock_message
     mock_completion.choices = [mock_choice]
+    mock_completion.usage = SimpleNamespace(prompt_tokens=MOCK_PROMPT_TOKENS, completion_tokens=MOCK_COMPLETION_TOKENS)
 
     mock_client.chat.completions.create.return_value = mock_completion
 
-    with patch('app.services.questions.client', mock_client):
+    # the shared client both generation and updates get from get_openai_client()
+    with patch('app.services.openai_client._client', mock_client):
         yield mock_client
@@ -0,0 +1,34 @@
+# tests/query_counter.py
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """
+    Records every statement sent to the database while active, via the
+    engine's `before_cursor_execute` event (one entry per round trip;
+    an executemany counts once).
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine.sync_engine
+        self.statements: List[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self._engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self._engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def report(self) -> str:
+        return "\n".join(f"  {i + 1}. {s}" for i, s in enumerate(self.statements))
@@ -0,0 +1,34 @@
+# tests/test_bench_endpoints.py
+from scripts.bench_endpoints import compare_results, summarize
+
+
+def _report(p50, p99, rps):
+    return {"results": {"get_game": {"latency_ms": {"p50": p50, "p99": p99}, "throughput_rps": rps}}}
+
+
+def test_summarize_percentiles():
+    latencies = [i / 1000 for i in range(1, 101)]  # 1..100 ms
+    result = summarize(latencies, errors=2, wall_s=0.5)
+
+    assert result["requests"] == 100
+    assert result["errors"] == 2
+    assert result["throughput_rps"] == 200.0
+    assert result["latency_ms"]["p50"] == 50.0  # nearest rank, like the generation ledger
+    assert result["latency_ms"]["max"] == 100.0
+
+
+def test_compare_results_flags_regressions():
+    baseline = _report(p50=10.0, p99=20.0, rps=500.0)
+
+    assert compare_results(_report(10.5, 21.0, 480.0), baseline, tolerance=0.15) == []
+
+    regressions = compare_results(_report(10.0, 30.0, 300.0), baseline, tolerance=0.15)
+    assert len(regressions) == 2
+    assert any("p99" in r for r in regressions)
+    assert any("throughput" in r for r in regressions)
+
+
+def test_compare_results_ignores_new_endpoints():
+    current = _report(10.0, 20.0, 500.0)
+    current["results"]["list_games"] = current["results"]["get_game"]
+    assert compare_results(current, _report(10.0, 20.0, 500.0), tolerance=0.1) == []
@@ -0,0 +1,10 @@
+# tests/test_bench_serialization.py
+from scripts.bench_serialization import run
+
+
+def test_every_stage_is_timed():
+    results = run(number=2, repeat=1)
+
+    assert set(results) == {"validate", "dump", "hash", "response", "total"}
+    for timings in results.values():
+        assert timings["previous_us"] > 0 and timings["current_us"] > 0
@@ -0,0 +1,32 @@
+# tests/test_bench_startup.py
+import os
+
+import pytest
+
+from scripts.bench_startup import FIRST_RESPONSE_BUDGET_MS, IMPORT_BUDGET_MS, run
+
+# wall-clock budgets depend on the machine: opt in with BENCH_BUDGETS=1 (e.g. on a dedicated runner)
+timing_budgets = pytest.mark.skipif(os.environ.get("BENCH_BUDGETS") != "1", reason="set BENCH_BUDGETS=1")
+
+
+def test_cold_start_serves_without_openai():
+    results = run(runs=1)
+
+    assert results["statuses"] == [200]
+    # read-only instances never import the OpenAI SDK
+    assert results["openai_loaded"] is False
+
+
+@timing_budgets
+def test_cold_start_is_within_budget():
+    results = run(runs=3)
+
+    assert results["median"]["import_ms"] <= IMPORT_BUDGET_MS
+    assert results["median"]["first_response_ms"] <= FIRST_RESPONSE_BUDGET_MS
+
+
+def test_openai_client_is_created_once_on_first_use():
+    from app.services.openai_client import get_openai_client
+
+    client = get_openai_client()
+    assert client is get_openai_client()
@@ -0,0 +1,139 @@
+# tests/test_compaction.py
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.cache import game_leaderboard_cache
+from app.services.compaction import ScoreCompactor, compact, fold, retention_cutoff
+from app.services.player_stats import rebuild_all
+from app.services.ranking import rank_index
+from tests.test_models import Game, Player, Score, ScoreSummary
+
+NOW = datetime(2026, 10, 19, 12, 0)
+NAMES = ["Alice", "Bob", "Carol", "Dave"]
+
+
+async def seed(db_session: AsyncSession):
+    games = [Game(questions_json={"questions": []}, questions_hash=f"compact_{i}") for i in range(2)]
+    players = [Player(name=name) for name in NAMES]
+    db_session.add_all(games + players)
+    await db_session.flush()
+    g1, g2 = (g.id for g in games)
+    alice, bob, carol, dave = (p.id for p in players)
+
+    def at(days_ago: float) -> datetime:
+        return NOW - timedelta(days=days_ago)
+
+    db_session.add_all([
+        # Alice: old best ties a recent raw score; the older attempt must keep winning
+        Score(player_id=alice, game_id=g1, score=1000, played_at=at(40)),
+        Score(player_id=alice, game_id=g2, score=500, played_at=at(35)),
+        Score(player_id=alice, game_id=g1, score=1000, played_at=at(1)),
+        # Bob: ties within the compacted range, across games
+        Score(player_id=bob, game_id=g2, score=2000, played_at=at(30)),
+        Score(player_id=bob, game_id=g1, score=2000, played_at=at(50)),
+        Score(player_id=bob, game_id=g1, score=100, played_at=at(20)),
+        # Carol: best is recent, older attempts get compacted
+        Score(player_id=carol, game_id=g1, score=300, played_at=at(60)),
+        Score(player_id=carol, game_id=g2, score=4000, played_at=at(2)),
+        # Dave: everything old, several attempts per game
+        Score(player_id=dave, game_id=g2, score=700, played_at=at(45)),
+        Score(player_id=dave, game_id=g2, score=900, played_at=at(44)),
+        Score(player_id=dave, game_id=g2, score=900, played_at=at(43)),
+        Score(player_id=dave, game_id=g1, score=50, played_at=at(15)),
+    ])
+    await db_session.commit()
+    return g1, g2
+
+
+async def observe(client: AsyncClient, session_factory, game_ids) -> dict:
+    """Everything a client can read about rankings and stats."""
+    game_leaderboard_cache.clear()
+    rank_index.reset()
+    await rebuild_all(session_factory)
+    snapshot = {
+        "leaderboard": (await client.get("/leaderboard/?limit=100")).json(),
+        "games": [(await client.get(f"/games/{g}/leaderboard?limit=100")).json() for g in game_ids],
+        "ranks": [(await client.get(f"/leaderboard/player/{n}?radius=3")).json() for n in NAMES],
+        "stats": [(await client.get(f"/players/{n}/stats")).json() for n in NAMES],
+    }
+    pages, last = [], None
+    while True:
+        url = "/leaderboard/?limit=1"
+        if last:
+            url += f"&after_best={last['best']}&after_player_id={last['player_id']}"
+        page = (await client.get(url)).json()
+        if not page:
+            break
+        pages.extend(page)
+        last = page[-1]
+    snapshot["pages"] = pages
+    return snapshot
+
+
+async def count(session_factory, model) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_compaction_preserves_leaderboards(client: AsyncClient, db_session: AsyncSession, session_factory):
+    game_ids = await seed(db_session)
+    before = await observe(client, session_factory, game_ids)
+    assert [e["player"] for e in before["leaderboard"]] == ["Carol", "Bob", "Alice", "Dave"]
+
+    # two passes, small batches: the second merges into summaries from the first
+    moved = await compact(session_factory, NOW - timedelta(days=40), batch_size=2)
+    assert moved == 5
+    moved = await compact(session_factory, NOW - timedelta(days=10), batch_size=2)
+    assert moved == 5
+
+    assert await count(session_factory, Score) == 2
+    assert await count(session_factory, ScoreSummary) == 7
+    assert await observe(client, session_factory, game_ids) == before
+
+
+@pytest.mark.asyncio
+async def test_new_score_on_compacted_game_is_not_a_new_distinct_game(
+        client: AsyncClient, db_session: AsyncSession, session_factory):
+    g1, _ = await seed(db_session)
+    await compact(session_factory, NOW, batch_size=100)
+    await rebuild_all(session_factory)
+    before = (await client.get("/players/Dave/stats")).json()
+
+    await client.post(f"/games/{g1}/score", json={"player_name": "Dave", "score": 10})
+
+    after = (await client.get("/players/Dave/stats")).json()
+    assert after["distinct_games"] == before["distinct_games"] == 2
+    assert after["games_played"] == before["games_played"] + 1
+
+
+@pytest.mark.asyncio
+async def test_compactor_uses_retention(db_session: AsyncSession, session_factory):
+    await seed(db_session)
+    compactor = ScoreCompactor(retention_days=30, pause=0, session_factory=session_factory)
+    # rows played more than 30 days before NOW
+    assert await compactor.run_once(now=NOW) == 7
+
+
+def test_fold_keeps_earliest_best():
+    t = datetime(2026, 1, 1)
+    rows = [
+        SimpleNamespace(id=3, player_id=1, game_id=1, score=500, played_at=t + timedelta(hours=2)),
+        SimpleNamespace(id=1, player_id=1, game_id=1, score=500, played_at=t + timedelta(hours=1)),
+        SimpleNamespace(id=2, player_id=1, game_id=1, score=100, played_at=t + timedelta(hours=3)),
+    ]
+    summary = fold(rows)[(1, 1)]
+    assert (summary["best"], summary["best_score_id"]) == (500, 1)
+    assert (summary["attempts"], summary["total_score"]) == (3, 1100)
+    assert summary["last_played_at"] == t + timedelta(hours=3)
+
+
+def test_retention_must_cover_leaderboard_windows():
+    with pytest.raises(ValueError):
+        retention_cutoff(3)
+    assert retention_cutoff(30, NOW) == NOW - timedelta(days=30)
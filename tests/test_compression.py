@@ -0,0 +1,94 @@
+# tests/test_compression.py
+import gzip
+
+import brotli
+import pytest
+from httpx import AsyncClient
+
+from app.compression import choose_encoding, compression_stats
+from scripts._db import sample_game_payload
+from tests.test_models import Game
+
+
+async def seed_games(session_factory, count: int = 1) -> int:
+    async with session_factory() as session:
+        games = [Game(questions_json=sample_game_payload(i), questions_hash=f"compress_{i}") for i in range(count)]
+        session.add_all(games)
+        await session.commit()
+        return games[0].id
+
+
+async def raw_get(client: AsyncClient, url: str, accept_encoding: str):
+    """Response and its body as sent, before httpx decodes it."""
+    async with client.stream("GET", url, headers={"Accept-Encoding": accept_encoding}) as response:
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    return response, raw
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("*", "br"),
+    ("identity", None),
+    ("", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+@pytest.mark.asyncio
+async def test_game_payload_is_compressed_once(client: AsyncClient, session_factory):
+    game_id = await seed_games(session_factory)
+
+    plain, identity = await raw_get(client, f"/games/{game_id}", "identity")
+    assert "content-encoding" not in plain.headers
+
+    first, compressed = await raw_get(client, f"/games/{game_id}", "br")
+    assert first.headers["content-encoding"] == "br"
+    assert first.headers["vary"] == "Accept-Encoding"
+    assert brotli.decompress(compressed) == identity
+    assert len(compressed) < len(identity) / 2
+
+    second, again = await raw_get(client, f"/games/{game_id}", "br")
+    assert again == compressed
+    stats = compression_stats.snapshot()
+    assert (stats["cache_misses"], stats["cache_hits"]) == (1, 1)
+
+    gzipped_response, gzipped = await raw_get(client, f"/games/{game_id}", "gzip")
+    assert gzipped_response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(gzipped) == identity
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_compressed_by_the_middleware(client: AsyncClient, session_factory):
+    await seed_games(session_factory, count=30)
+
+    response, raw = await raw_get(client, "/games/list", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) == len(raw)
+    assert len(gzip.decompress(raw)) > len(raw)
+
+
+@pytest.mark.asyncio
+async def test_small_responses_are_not_compressed(client: AsyncClient, session_factory):
+    game_id = await seed_games(session_factory)
+
+    for url in ("/health", f"/games/{game_id}/exists"):
+        response, _ = await raw_get(client, url, "br, gzip")
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+    assert compression_stats.snapshot()["responses"] == 0
+
+
+@pytest.mark.asyncio
+async def test_compression_stats_report_savings(client: AsyncClient, session_factory):
+    game_id = await seed_games(session_factory)
+    await raw_get(client, f"/games/{game_id}", "br")
+
+    response = await client.get("/admin/compression-stats")
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["responses"] == 1
+    assert stats["bytes_saved"] == stats["bytes_in"] - stats["bytes_out"] > 0
+    assert stats["cpu_ms"] >= 0
@@ -0,0 +1,49 @@
+# tests/test_deferred_questions.py
+"""questions_json is only read by the paths that return or rewrite questions."""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Game as AppGame
+from tests.test_models import Game
+
+
+def test_questions_json_is_deferred():
+    assert "questions_json" not in str(select(AppGame))
+    assert "questions_json" not in str(select(Game))
+
+
+async def _seed(db_session: AsyncSession) -> int:
+    game = Game(questions_json={"questions": [], "bonus_question": None}, questions_hash="deferred_hash")
+    db_session.add(game)
+    await db_session.commit()
+    return game.id
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, path, body", [
+    ("POST", "/games/{id}/score", {"player_name": "Alice", "score": 100}),
+    ("POST", "/games/999/score", {"player_name": "Alice", "score": 100}),
+    ("GET", "/games/{id}/exists", None),
+    ("GET", "/games/999/exists", None),
+    ("GET", "/games/list", None),
+    ("GET", "/games/{id}/leaderboard", None),
+    ("DELETE", "/games/{id}", None),
+])
+async def test_blob_not_fetched(client: AsyncClient, db_session: AsyncSession, count_queries,
+                                method, path, body):
+    game_id = await _seed(db_session)
+
+    with count_queries() as counter:
+        response = await client.request(method, path.format(id=game_id), json=body)
+    assert response.status_code < 500
+    assert counter.statements
+    assert not [s for s in counter.statements if "questions_json" in s], counter.report()
+
+
+@pytest.mark.asyncio
+async def test_exists_reports_both_cases(client: AsyncClient, db_session: AsyncSession):
+    game_id = await _seed(db_session)
+    assert (await client.get(f"/games/{game_id}/exists")).json() == {"exists": True}
+    assert (await client.get("/games/999/exists")).json() == {"exists": False}
@@ -0,0 +1,114 @@
+# tests/test_game_assembly.py
+import random
+from collections import Counter
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.services.assembly import question_pool
+from app.services.question_bank import question_hash
+from tests.test_models import GameQuestion, GenerationRun, QuestionRecord
+
+CATEGORIES = ["History", "Geography", "Science", "Sports", "Nature", "Pop Culture", "Food & Drink", "Arts"]
+
+
+def make_question(difficulty: int, category: str, n: int) -> dict:
+    return {
+        "q": f"{category} question {n} at level {difficulty}?",
+        "correct": "Right",
+        "wrong": ["Wrong 1", "Wrong 2", "Wrong 3"],
+        "difficulty": difficulty,
+        "category": category,
+        "hint": None,
+    }
+
+
+async def seed_bank(session_factory, per_cell: int = 1, categories=CATEGORIES) -> None:
+    rows = []
+    for difficulty in range(1, 16):
+        for category in categories:
+            for n in range(per_cell):
+                body = make_question(difficulty, category, n)
+                rows.append(QuestionRecord(
+                    content_hash=question_hash(body), difficulty=difficulty, category=category, body=body,
+                ))
+    async with session_factory() as session:
+        session.add_all(rows)
+        await session.commit()
+
+
+def assert_valid_game(game: dict) -> None:
+    assert [q["difficulty"] for q in game["questions"]] == list(range(1, 16))
+    assert max(Counter(q["category"] for q in game["questions"]).values()) <= 2
+    assert 8 <= game["bonus_question"]["difficulty"] <= 10
+    assert game["bonus_question"] not in game["questions"]
+
+
+@pytest.mark.asyncio
+async def test_assemble_game_from_bank(client: AsyncClient, session_factory):
+    await seed_bank(session_factory)
+
+    # no OpenAI mock: a generation call would fail the request
+    response = await client.post("/games/", json={"mode": "assemble"})
+    assert response.status_code == 200
+    game = response.json()
+    assert_valid_game(game)
+
+    async with session_factory() as session:
+        bank_size = (await session.execute(select(func.count()).select_from(QuestionRecord))).scalar_one()
+        links = (await session.execute(
+            select(func.count()).select_from(GameQuestion).where(GameQuestion.game_id == game["game_id"])
+        )).scalar_one()
+        runs = (await session.execute(select(func.count()).select_from(GenerationRun))).scalar_one()
+    assert bank_size == 15 * len(CATEGORIES)
+    assert links == 16
+    assert runs == 0
+
+    fetched = await client.get(f"/games/{game['game_id']}")
+    assert fetched.json() == game
+
+
+@pytest.mark.asyncio
+async def test_recently_used_questions_are_skipped(client: AsyncClient, session_factory):
+    await seed_bank(session_factory, per_cell=2)
+
+    first = (await client.post("/games/", json={"mode": "assemble"})).json()
+    second = (await client.post("/games/", json={"mode": "assemble"})).json()
+    assert_valid_game(second)
+
+    used = {q["q"] for q in first["questions"]} | {first["bonus_question"]["q"]}
+    assert not used & ({q["q"] for q in second["questions"]} | {second["bonus_question"]["q"]})
+
+
+@pytest.mark.asyncio
+async def test_same_draw_returns_existing_game(client: AsyncClient, session_factory):
+    await seed_bank(session_factory)
+
+    question_pool.rng = random.Random(7)
+    first = (await client.post("/games/", json={"mode": "assemble"})).json()
+    question_pool.reset()
+    question_pool.rng = random.Random(7)
+    second = (await client.post("/games/", json={"mode": "assemble"})).json()
+
+    assert second["game_id"] == first["game_id"]
+
+
+@pytest.mark.asyncio
+async def test_category_cap_is_respected_on_a_tight_bank(client: AsyncClient, session_factory):
+    # 8 categories x 2 = 16 slots for 15 questions: only a careful draw fits
+    await seed_bank(session_factory, categories=CATEGORIES)
+
+    for _ in range(5):
+        response = await client.post("/games/", json={"mode": "assemble"})
+        assert response.status_code == 200
+        assert_valid_game(response.json())
+
+
+@pytest.mark.asyncio
+async def test_assemble_fails_when_bank_is_too_small(client: AsyncClient, session_factory):
+    # 7 categories x 2 = 14 slots for 15 questions
+    await seed_bank(session_factory, categories=CATEGORIES[:7])
+
+    response = await client.post("/games/", json={"mode": "assemble"})
+    assert response.status_code == 409
@@ -0,0 +1,109 @@
+# tests/test_game_leaderboard.py
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.cache import TTLCache, game_leaderboard_cache
+from tests.test_models import Game, Player, Score
+
+
+async def setup_game_scores(db_session: AsyncSession):
+    games = [
+        Game(questions_json={"questions": []}, questions_hash="game_lb_1"),
+        Game(questions_json={"questions": []}, questions_hash="game_lb_2"),
+    ]
+    players = [Player(name="Alice"), Player(name="Bob"), Player(name="Carol")]
+    db_session.add_all(games + players)
+    await db_session.flush()
+    alice, bob, carol = players
+    db_session.add_all([
+        Score(player_id=alice.id, game_id=games[0].id, score=500, played_at=datetime(2025, 5, 1)),
+        Score(player_id=alice.id, game_id=games[0].id, score=1000, played_at=datetime(2025, 5, 2)),
+        Score(player_id=bob.id, game_id=games[0].id, score=2000, played_at=datetime(2025, 5, 3)),
+        # Carol's big score is on the other game
+        Score(player_id=carol.id, game_id=games[1].id, score=9000, played_at=datetime(2025, 5, 4)),
+        Score(player_id=carol.id, game_id=games[0].id, score=100, played_at=datetime(2025, 5, 5)),
+    ])
+    await db_session.commit()
+    return games
+
+
+@pytest.mark.asyncio
+async def test_game_leaderboard_best_per_player(client: AsyncClient, db_session: AsyncSession):
+    games = await setup_game_scores(db_session)
+
+    response = await client.get(f"/games/{games[0].id}/leaderboard")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [(e["player"], e["best"]) for e in data] == [("Bob", 2000), ("Alice", 1000), ("Carol", 100)]
+    assert all(e["game_id"] == games[0].id for e in data)
+
+    response = await client.get(f"/games/{games[0].id}/leaderboard?limit=1")
+    assert [e["player"] for e in response.json()] == ["Bob"]
+
+
+@pytest.mark.asyncio
+async def test_game_leaderboard_is_cached(client: AsyncClient, db_session: AsyncSession, count_queries):
+    games = await setup_game_scores(db_session)
+    await client.get(f"/games/{games[0].id}/leaderboard")
+
+    with count_queries() as counter:
+        response = await client.get(f"/games/{games[0].id}/leaderboard?limit=2")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert counter.count == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_score_invalidates_only_that_game(client: AsyncClient, db_session: AsyncSession):
+    games = await setup_game_scores(db_session)
+    await client.get(f"/games/{games[0].id}/leaderboard")
+    await client.get(f"/games/{games[1].id}/leaderboard")
+
+    response = await client.post(f"/games/{games[0].id}/score", json={"player_name": "Alice", "score": 5000})
+    assert response.status_code == 201
+
+    assert game_leaderboard_cache.get(games[0].id) is None
+    assert game_leaderboard_cache.get(games[1].id) is not None
+
+    response = await client.get(f"/games/{games[0].id}/leaderboard")
+    top = response.json()[0]
+    assert (top["player"], top["best"]) == ("Alice", 5000)
+
+
+@pytest.mark.asyncio
+async def test_game_leaderboard_unknown_game_vs_no_scores(client: AsyncClient, db_session: AsyncSession,
+                                                          count_queries):
+    game = Game(questions_json={"questions": []}, questions_hash="game_lb_empty")
+    db_session.add(game)
+    await db_session.commit()
+
+    with count_queries() as counter:
+        assert (await client.get(f"/games/{game.id}/leaderboard")).json() == []
+        assert (await client.get(f"/games/{game.id + 1}/leaderboard")).status_code == 404
+    assert counter.count == 2
+    assert game_leaderboard_cache.get(game.id + 1) is None
+
+
+@pytest.mark.asyncio
+async def test_game_leaderboard_limit_bounds(client: AsyncClient):
+    response = await client.get("/games/1/leaderboard?limit=0")
+    assert response.status_code == 422
+
+
+def test_ttl_cache_expiry_and_eviction(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("app.services.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(ttl=5, max_entries=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts least recently used "b"
+    assert cache.get("b") is None
+
+    now[0] += 5
+    assert cache.get("a") is None
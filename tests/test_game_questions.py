@@ -0,0 +1,64 @@
+# tests/test_game_questions.py
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+
+from tests.mocks import mock_openai, SAMPLE_QUESTIONS, SAMPLE_BONUS_QUESTION
+from tests.test_models import Game
+
+
+@pytest.mark.asyncio
+async def test_questions_match_the_full_game(client: AsyncClient, mock_openai):
+    game = (await client.post("/games/")).json()
+    game_id = game["game_id"]
+
+    for index, question in enumerate(game["questions"]):
+        response = await client.get(f"/games/{game_id}/questions/{index}")
+        assert response.status_code == 200
+        assert response.json() == question
+    bonus = await client.get(f"/games/{game_id}/bonus")
+    assert bonus.json() == game["bonus_question"]
+
+    missing = await client.get(f"/games/{game_id}/questions/{len(game['questions'])}")
+    assert missing.status_code == 404
+    assert (await client.get(f"/games/{game_id}/questions/-1")).status_code == 422
+    assert (await client.get("/games/999/questions/0")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_game_is_read_once_for_all_its_questions(client: AsyncClient, mock_openai, count_queries):
+    game_id = (await client.post("/games/")).json()["game_id"]
+
+    with count_queries() as counter:
+        for index in range(len(SAMPLE_QUESTIONS)):
+            await client.get(f"/games/{game_id}/questions/{index}")
+        await client.get(f"/games/{game_id}/bonus")
+    assert counter.count == 1
+
+
+@pytest.mark.asyncio
+async def test_legacy_game_without_bonus(client: AsyncClient, db_session):
+    game = Game(questions_json={"questions": [SAMPLE_QUESTIONS[0].model_dump()], "bonus_question": None},
+                questions_hash="single_question")
+    db_session.add(game)
+    await db_session.commit()
+
+    first = await client.get(f"/games/{game.id}/questions/0")
+    assert first.json() == SAMPLE_QUESTIONS[0].model_dump()
+    bonus = await client.get(f"/games/{game.id}/bonus")
+    assert bonus.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_update_replaces_cached_questions(client: AsyncClient, mock_openai):
+    game_id = (await client.post("/games/")).json()["game_id"]
+    await client.get(f"/games/{game_id}/questions/0")
+
+    updated = [SAMPLE_QUESTIONS[1], SAMPLE_QUESTIONS[0]]
+    ai_result = (updated, SAMPLE_BONUS_QUESTION, "reordered_hash")
+    with patch("app.routers.games.update_game_questions", AsyncMock(return_value=ai_result)):
+        await client.put(f"/games/{game_id}", json={"prompt": "swap them"})
+
+    response = await client.get(f"/games/{game_id}/questions/0")
+    assert response.json() == updated[0].model_dump()
@@ -0,0 +1,75 @@
+# tests/test_generation_ledger.py
+import pytest
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.generation_ledger import generation_ledger
+from app.stats import percentile
+from app.services.questions import generate_questions
+from tests.test_models import GenerationRun
+from tests.mocks import mock_openai, MOCK_PROMPT_TOKENS, MOCK_COMPLETION_TOKENS
+
+
+@pytest.mark.asyncio
+async def test_create_game_records_run(client: AsyncClient, db_session: AsyncSession, mock_openai):
+    """Creating a game buffers one ledger row linked to the new game."""
+    response = await client.post("/games/")
+    assert response.status_code == 200
+    game_id = response.json()["game_id"]
+
+    # Nothing is written on the request path
+    assert generation_ledger.pending() == 1
+    assert await generation_ledger.flush() == 1
+
+    result = await db_session.execute(select(GenerationRun))
+    run = result.scalars().one()
+    assert run.kind == "generate"
+    assert run.model == "gpt-4o"
+    assert run.outcome == "success"
+    assert run.game_id == game_id
+    assert run.prompt_tokens == MOCK_PROMPT_TOKENS
+    assert run.completion_tokens == MOCK_COMPLETION_TOKENS
+    assert run.latency_ms >= 0
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_is_recorded(mock_openai):
+    """A failing AI call is still recorded, with its outcome."""
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = "not json"
+
+    with pytest.raises(HTTPException):
+        await generate_questions()
+
+    assert generation_ledger.pending() == 1
+    assert generation_ledger._buffer[0].outcome == "invalid_json"
+    assert generation_ledger._buffer[0].game_id is None
+
+
+@pytest.mark.asyncio
+async def test_generation_stats(client: AsyncClient, mock_openai):
+    """The admin report aggregates buffered and stored runs per day and model."""
+    await client.post("/games/")
+    await generation_ledger.flush()
+    await client.post("/games/")
+
+    response = await client.get("/admin/generation-stats")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert len(data) == 1
+    stats = data[0]
+    assert stats["model"] == "gpt-4o"
+    assert stats["runs"] == 2
+    assert stats["failures"] == 0
+    assert stats["prompt_tokens"] == 2 * MOCK_PROMPT_TOKENS
+    assert stats["total_tokens"] == 2 * (MOCK_PROMPT_TOKENS + MOCK_COMPLETION_TOKENS)
+    assert stats["latency_p50_ms"] <= stats["latency_p99_ms"] <= stats["latency_max_ms"]
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 99) == 7.0
@@ -0,0 +1,175 @@
+# tests/test_invalidation.py
+import asyncio
+import os
+import socket
+
+import pytest
+from httpx import AsyncClient
+
+from app.services.cache import TTLCache, game_question_cache
+from app.services import invalidation
+from app.services.invalidation import (
+    MAX_MESSAGE_BYTES, InvalidationBus, LocalBackend, PostgresBackend, UnixSocketBackend, invalidation_bus,
+)
+from tests.test_models import Game
+
+
+async def until(condition, timeout: float = 1.0) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+class Worker:
+    """Another worker: its own bus on the shared socket directory, with a per-game cache."""
+
+    def __init__(self, directory: str):
+        self.bus = InvalidationBus(UnixSocketBackend(directory))
+        self.cache = TTLCache(ttl=60)
+        self.received = []
+        self.bus.subscribe("game_leaderboard", lambda key: self.cache.invalidate(int(key)))
+        self.bus.subscribe("game", self.received.append)
+
+
+@pytest.fixture
+async def socket_dir(tmp_path):
+    directory = str(tmp_path / "bus")
+    await invalidation_bus.use(UnixSocketBackend(directory))
+    yield directory
+    await invalidation_bus.use(LocalBackend())
+
+
+@pytest.mark.asyncio
+async def test_local_bus_delivers_by_topic():
+    bus = InvalidationBus()
+    seen = []
+
+    def broken(_key):
+        raise RuntimeError("handler bug")
+
+    bus.subscribe("game", broken)
+    bus.subscribe("game", seen.append)
+    bus.subscribe("player", lambda key: seen.append(f"player {key}"))
+    await bus.publish("game:1", "leaderboard:all", "player:7")
+    assert seen == ["1", "player 7"]
+
+
+@pytest.mark.asyncio
+async def test_unix_backend_reaches_every_other_worker(tmp_path):
+    directory = str(tmp_path / "bus")
+    first, second, third = Worker(directory), Worker(directory), Worker(directory)
+    for worker in (first, second, third):
+        await worker.bus.start()
+    try:
+        await first.bus.publish("game:5")
+        assert await until(lambda: second.received == ["5"] and third.received == ["5"])
+        # delivered to itself directly, never echoed back through the socket
+        await asyncio.sleep(0.05)
+        assert first.received == ["5"]
+    finally:
+        for worker in (first, second, third):
+            await worker.bus.stop()
+    assert os.listdir(directory) == []
+
+
+@pytest.mark.asyncio
+async def test_sockets_of_dead_workers_are_removed(tmp_path):
+    directory = tmp_path / "bus"
+    directory.mkdir()
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    stale.bind(str(directory / "gone.sock"))
+    stale.close()
+
+    bus = InvalidationBus(UnixSocketBackend(str(directory)))
+    bus.subscribe("game", lambda _key: None)
+    await bus.start()
+    try:
+        await bus.publish("game:1")
+        assert not (directory / "gone.sock").exists()
+    finally:
+        await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_mutating_routes_invalidate_other_workers(client: AsyncClient, session_factory, socket_dir):
+    other = Worker(socket_dir)
+    await other.bus.start()
+    try:
+        async with session_factory() as session:
+            game = Game(questions_json={"questions": []}, questions_hash="bus_game")
+            session.add(game)
+            await session.commit()
+
+        other.cache.set(game.id, ["cached leaderboard"])
+        response = await client.post(f"/games/{game.id}/score", json={"player_name": "Ann", "score": 100})
+        assert response.status_code == 201
+        assert await until(lambda: other.cache.get(game.id) is None)
+
+        game_question_cache.set(game.id, ([], None))
+        assert (await client.delete(f"/games/{game.id}")).status_code == 204
+        assert game_question_cache.get(game.id) is None
+        assert await until(lambda: other.received == [str(game.id)])
+    finally:
+        await other.bus.stop()
+
+
+class RecordingBackend(LocalBackend):
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, keys):
+        self.sent.append(list(keys))
+
+
+@pytest.mark.asyncio
+async def test_only_subscribed_keys_are_sent_in_bounded_messages():
+    backend = RecordingBackend()
+    bus = InvalidationBus(backend)
+    bus.subscribe("game", lambda _key: None)
+
+    await bus.publish("player:1", "leaderboard:all")
+    assert backend.sent == []
+
+    keys = [f"game:{i}" for i in range(2000)]
+    await bus.publish(*keys)
+    messages = list(invalidation._messages("origin", backend.sent[0]))
+    assert len(messages) > 1
+    assert all(len(m) <= MAX_MESSAGE_BYTES for m in messages)
+    assert [k for m in messages for k in invalidation._decode(m)["keys"]] == keys
+
+
+@pytest.mark.asyncio
+async def test_postgres_backend_ignores_bad_payloads_and_reconnects(monkeypatch):
+    monkeypatch.setattr(invalidation, "RECONNECT_MIN_SECONDS", 0.01)
+    backend = PostgresBackend("postgresql+asyncpg://u:p@db/app", "cache_invalidation")
+    received, attempts = [], []
+
+    async def connect():
+        attempts.append(True)
+        if len(attempts) < 3:
+            raise OSError("database unreachable")
+        backend._conn = object()
+
+    monkeypatch.setattr(backend, "_connect", connect)
+    await backend.start(received.extend)
+    try:
+        for payload in ("not json", '{"keys": 1}', '["game:1"]'):
+            backend._on_notify(None, 0, "cache_invalidation", payload)
+        backend._on_notify(None, 0, "cache_invalidation", invalidation._encode(backend.origin, ["game:1"]).decode())
+        backend._on_notify(None, 0, "cache_invalidation", invalidation._encode("other", ["game:2"]).decode())
+        assert received == ["game:2"]
+
+        # failed at start: retried in the background with backoff
+        assert await until(lambda: backend._conn is not None)
+        assert len(attempts) == 3
+
+        backend._on_terminated(None)
+        assert backend._conn is None
+        assert await until(lambda: backend._conn is not None)
+        assert len(attempts) == 4
+    finally:
+        backend._conn = None
+        await backend.stop()
@@ -102,3 +102,31 @@ async def test_get_leaderboard_limit(client: AsyncClient, db_session: AsyncSessi
     names = [e["player"] for e in data]
     assert any(n.startswith("Player1_") for n in names)
     assert any(n.startswith("Player2_") for n in names)
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_one_row_per_player_on_ties(client: AsyncClient, db_session: AsyncSession):
+    """A player who hit their best score twice is listed once, with the earliest attempt."""
+    from datetime import datetime
+
+    game1 = Game(questions_json={"questions": []}, questions_hash="tie_hash_1")
+    game2 = Game(questions_json={"questions": []}, questions_hash="tie_hash_2")
+    player = Player(name="TiePlayer")
+    db_session.add_all([game1, game2, player])
+    await db_session.flush()
+    db_session.add_all([
+        Score(player_id=player.id, game_id=game2.id, score=800, played_at=datetime(2025, 5, 2)),
+        Score(player_id=player.id, game_id=game1.id, score=800, played_at=datetime(2025, 5, 1)),
+        Score(player_id=player.id, game_id=game2.id, score=300, played_at=datetime(2025, 4, 1)),
+    ])
+    await db_session.commit()
+
+    response = await client.get("/leaderboard/")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert len(data) == 1
+    assert data[0]["player"] == "TiePlayer"
+    assert data[0]["best"] == 800
+    assert data[0]["game_id"] == game1.id
+    assert data[0]["played_at"].startswith("2025-05-01")
@@ -0,0 +1,113 @@
+# tests/test_live_leaderboard.py
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.main import app
+from app.services.live_leaderboard import LeaderboardBroadcaster, diff_entries
+from tests.test_models import Game
+
+
+def test_diff_entries():
+    old = [{"player": "A", "best": 300}, {"player": "B", "best": 200}, {"player": "C", "best": 100}]
+    new = [{"player": "A", "best": 300}, {"player": "D", "best": 250}, {"player": "B", "best": 200}]
+    diff = diff_entries(old, new)
+    assert diff["changed"] == [
+        {"player": "D", "best": 250, "rank": 2},
+        {"player": "B", "best": 200, "rank": 3},
+    ]
+    assert diff["removed"] == ["C"]
+    assert diff["size"] == 3
+
+
+class FakeBoard:
+    """Stands in for the database: a mutable top list and a load counter."""
+
+    def __init__(self):
+        self.top = [{"player": "A", "best": 100}]
+        self.loads = 0
+
+    async def load(self, _db, size):
+        self.loads += 1
+        return [dict(e) for e in self.top[:size]]
+
+    @asynccontextmanager
+    async def session(self):
+        yield None
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced_into_one_diff():
+    board = FakeBoard()
+    broadcaster = LeaderboardBroadcaster(size=3, coalesce=0.05, refresh=60, session_factory=board.session)
+    viewers = [await broadcaster.subscribe(board.load) for _ in range(50)]
+    try:
+        snapshot = json.loads(await viewers[0].get())
+        assert snapshot["type"] == "snapshot"
+        assert snapshot["entries"] == [{"player": "A", "best": 100, "rank": 1}]
+        assert board.loads == 1
+
+        for score in (200, 300, 400):
+            board.top = [{"player": "B", "best": score}, {"player": "A", "best": 100}]
+            broadcaster.notify()
+        await asyncio.sleep(0.2)
+
+        assert board.loads == 2
+        for viewer in viewers:
+            if viewer is not viewers[0]:
+                assert json.loads(await viewer.get())["type"] == "snapshot"
+            diff = json.loads(await viewer.get())
+            assert diff["type"] == "diff"
+            assert diff["changed"] == [
+                {"player": "B", "best": 400, "rank": 1},
+                {"player": "A", "best": 100, "rank": 2},
+            ]
+            assert viewer.queue.empty()
+    finally:
+        await broadcaster.stop()
+
+
+@pytest.mark.asyncio
+async def test_lagging_subscriber_is_resynced_with_snapshot():
+    board = FakeBoard()
+    broadcaster = LeaderboardBroadcaster(size=3, refresh=60, max_queue=2, session_factory=board.session)
+    viewer = await broadcaster.subscribe(board.load)
+    try:
+        for score in (200, 300, 400):
+            board.top = [{"player": "B", "best": score}]
+            await broadcaster.refresh_now()
+
+        # the backlog was replaced by the state at overflow; later diffs follow it
+        snapshot = json.loads(await viewer.get())
+        assert snapshot["type"] == "snapshot"
+        assert snapshot["entries"] == [{"player": "B", "best": 300, "rank": 1}]
+        diff = json.loads(await viewer.get())
+        assert diff["version"] == snapshot["version"] + 1 == broadcaster.version
+        assert diff["changed"] == [{"player": "B", "best": 400, "rank": 1}]
+        assert viewer.queue.empty()
+    finally:
+        await broadcaster.stop()
+
+
+@pytest.mark.asyncio
+async def test_websocket_pushes_score_changes(db_session: AsyncSession):
+    game = Game(questions_json={"questions": []}, questions_hash="live_hash")
+    db_session.add(game)
+    await db_session.commit()
+
+    with TestClient(app) as tc:
+        tc.post(f"/games/{game.id}/score", json={"player_name": "Alice", "score": 500})
+        with tc.websocket_connect("/leaderboard/ws") as ws:
+            snapshot = ws.receive_json()
+            assert snapshot["type"] == "snapshot"
+            assert [(e["player"], e["best"], e["rank"]) for e in snapshot["entries"]] == [("Alice", 500, 1)]
+
+            tc.post(f"/games/{game.id}/score", json={"player_name": "Bob", "score": 900})
+            diff = ws.receive_json()
+            assert diff["type"] == "diff"
+            assert [(e["player"], e["rank"]) for e in diff["changed"]] == [("Bob", 1), ("Alice", 2)]
+            assert diff["version"] > snapshot["version"]
@@ -0,0 +1,92 @@
+# tests/test_near_duplicates.py
+import json
+import logging
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.services.minhash import signature, similarity
+from app.services.near_duplicates import NearDuplicateIndex, backfill_signatures, near_duplicates
+from app.services.question_bank import question_hash
+from tests.mocks import mock_openai, MOCK_OPENAI_RESPONSE
+from tests.test_models import QuestionRecord
+
+ORIGINAL = "Which planet in our solar system is known as the Red Planet?"
+REWORDED = "Which planet of our solar system is known as the Red Planet?"
+UNRELATED = "In which year did the Berlin Wall fall, ending the division of the city?"
+
+
+def reworded_response() -> dict:
+    payload = json.loads(json.dumps(MOCK_OPENAI_RESPONSE))
+    for q in payload["questions"]:
+        q["q"] = "So, " + q["q"][0].lower() + q["q"][1:]
+    return payload
+
+
+def test_signature_similarity():
+    assert similarity(signature(ORIGINAL), signature(ORIGINAL)) == 1.0
+    assert similarity(signature(ORIGINAL), signature(REWORDED)) > 0.7
+    assert similarity(signature(ORIGINAL), signature(UNRELATED)) < 0.2
+
+
+def test_index_query_finds_rewordings_only():
+    index = NearDuplicateIndex(threshold=0.7)
+    index._loaded = True
+    index._insert("original", signature(ORIGINAL))
+
+    match = index.query(REWORDED)
+    assert match is not None and match[0] == "original"
+    assert index.query(UNRELATED) is None
+    assert index.query(REWORDED, ignore={"original"}) is None
+    index._insert("reworded", signature(REWORDED))
+    assert [p[:2] for p in index.pairs()] == [("original", "reworded")]
+
+
+@pytest.mark.asyncio
+async def test_new_games_are_signed_and_indexed(client: AsyncClient, mock_openai, session_factory):
+    await client.post("/games/")
+
+    async with session_factory() as session:
+        unsigned = (await session.execute(
+            select(func.count()).select_from(QuestionRecord).where(QuestionRecord.minhash.is_(None))
+        )).scalar_one()
+    assert unsigned == 0
+
+    async with session_factory() as session:
+        found = await near_duplicates.find(session, reworded_response())
+    assert len(found) == len(MOCK_OPENAI_RESPONSE["questions"])
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_generation_is_retried(client: AsyncClient, mock_openai, caplog):
+    first = (await client.post("/games/")).json()
+    assert mock_openai.chat.completions.create.await_count == 1
+
+    completion = mock_openai.chat.completions.create.return_value
+    completion.choices[0].message.content = json.dumps(reworded_response())
+    with caplog.at_level(logging.WARNING, logger="app.services.near_duplicates"):
+        second = await client.post("/games/")
+
+    assert second.status_code == 200
+    assert second.json()["game_id"] != first["game_id"]
+    # one retry, still reworded: stored anyway and flagged
+    assert mock_openai.chat.completions.create.await_count == 3
+    assert "near-duplicate" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_backfill_signs_legacy_questions(session_factory):
+    body = dict(MOCK_OPENAI_RESPONSE["questions"][0])
+    async with session_factory() as session:
+        session.add(QuestionRecord(content_hash=question_hash(body), difficulty=body["difficulty"],
+                                   category=body["category"], body=body))
+        await session.commit()
+
+    assert await backfill_signatures(session_factory, batch_size=1) == 1
+    assert await backfill_signatures(session_factory) == 0
+
+    index = NearDuplicateIndex()
+    async with session_factory() as session:
+        await index.ensure(session)
+    assert index.query(body["q"])[0] == question_hash(body)
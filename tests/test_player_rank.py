@@ -0,0 +1,117 @@
+# tests/test_player_rank.py
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.ranking import RankIndex, rank_index
+from tests.test_models import Game
+
+SCORES = [
+    ("Alice", 500), ("Bob", 2000), ("Carol", 1000), ("Dave", 1000),
+    ("Erin", 8000), ("Frank", 100), ("Alice", 3000),
+]
+
+
+async def seed_scores(client: AsyncClient, db_session: AsyncSession) -> int:
+    game = Game(questions_json={"questions": []}, questions_hash="rank_hash")
+    db_session.add(game)
+    await db_session.commit()
+    for name, score in SCORES:
+        response = await client.post(f"/games/{game.id}/score", json={"player_name": name, "score": score})
+        assert response.status_code == 201
+    return game.id
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("window", ["all", "day", "week"])
+async def test_player_rank_and_neighbours(client: AsyncClient, db_session: AsyncSession, window):
+    await seed_scores(client, db_session)
+
+    response = await client.get(f"/leaderboard/player/Carol?radius=1&window={window}")
+    assert response.status_code == 200
+    data = response.json()
+    # Erin 8000, Alice 3000, Bob 2000, Carol 1000, Dave 1000 (later id), Frank 100
+    assert (data["player"], data["rank"], data["best"]) == ("Carol", 4, 1000)
+    assert [(e["player"], e["rank"]) for e in data["around"]] == [("Bob", 3), ("Carol", 4), ("Dave", 5)]
+
+    edge = (await client.get(f"/leaderboard/player/Erin?radius=2&window={window}")).json()
+    assert [e["player"] for e in edge["around"]] == ["Erin", "Alice", "Bob"]
+
+
+@pytest.mark.asyncio
+async def test_player_rank_follows_new_scores(client: AsyncClient, db_session: AsyncSession):
+    game_id = await seed_scores(client, db_session)
+    assert (await client.get("/leaderboard/player/Frank")).json()["rank"] == 6
+
+    await client.post(f"/games/{game_id}/score", json={"player_name": "Frank", "score": 9000})
+    await client.post(f"/games/{game_id}/score", json={"player_name": "Gina", "score": 50})
+
+    assert (await client.get("/leaderboard/player/Frank")).json()["rank"] == 1
+    assert (await client.get("/leaderboard/player/Gina")).json()["rank"] == 7
+
+
+@pytest.mark.asyncio
+async def test_player_rank_unknown_player(client: AsyncClient, db_session: AsyncSession):
+    await seed_scores(client, db_session)
+    for window in ("all", "day"):
+        response = await client.get(f"/leaderboard/player/Nobody?window={window}")
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("window", ["all", "week"])
+async def test_keyset_pages_match_full_leaderboard(client: AsyncClient, db_session: AsyncSession, window):
+    await seed_scores(client, db_session)
+    full = (await client.get(f"/leaderboard/?limit=100&window={window}")).json()
+    assert len(full) == 6
+
+    pages = []
+    page = (await client.get(f"/leaderboard/?limit=2&window={window}")).json()
+    while page:
+        pages.extend(page)
+        last = page[-1]
+        page = (await client.get(
+            f"/leaderboard/?limit=2&window={window}"
+            f"&after_best={last['best']}&after_player_id={last['player_id']}"
+        )).json()
+
+    assert [(e["player"], e["best"]) for e in pages] == [(e["player"], e["best"]) for e in full]
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_include_scores_from_other_workers(
+        client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    """Pages read the database, not this worker's (possibly stale) rank index."""
+    game_id = await seed_scores(client, db_session)
+    assert (await client.get("/leaderboard/player/Frank")).json()["rank"] == 6  # index loaded
+
+    # as if another worker took the write: this worker's index never hears of it
+    monkeypatch.setattr(rank_index, "offer", lambda *args: None)
+    await client.post(f"/games/{game_id}/score", json={"player_name": "Gina", "score": 1500})
+
+    page = (await client.get("/leaderboard/?limit=2&after_best=2000&after_player_id=0")).json()
+    assert [(e["player"], e["best"]) for e in page] == [("Bob", 2000), ("Gina", 1500)]
+
+
+@pytest.mark.asyncio
+async def test_keyset_cursor_needs_both_fields(client: AsyncClient):
+    response = await client.get("/leaderboard/?after_best=100")
+    assert response.status_code == 422
+
+
+def test_rank_index_offer_keeps_earliest_tie():
+    index = RankIndex()
+    index._loaded_at = 0.0  # treat as loaded
+    played = datetime(2026, 1, 1)
+    index.offer(1, "Alice", 100, 10, played)
+    index.offer(2, "Bob", 200, 10, played)
+    index.offer(1, "Alice", 100, 11, played)  # tie: ignored
+    index.offer(1, "Alice", 300, 12, played)
+
+    assert [(e["player"], e["rank"], e["game_id"]) for e in index.page(10)] == [
+        ("Alice", 1, 12), ("Bob", 2, 10),
+    ]
+    assert index.page(10, after=(300, 1))[0]["player"] == "Bob"
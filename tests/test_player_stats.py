@@ -0,0 +1,110 @@
+# tests/test_player_stats.py
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services import player_stats
+from app.services.player_stats import rebuild_all
+from tests.test_models import Game, Player, PlayerGame, PlayerStats
+
+
+async def setup_games(client: AsyncClient, db_session: AsyncSession):
+    games = [Game(questions_json={"questions": []}, questions_hash=f"stats_{i}") for i in range(2)]
+    db_session.add_all(games)
+    await db_session.commit()
+    game_a, game_b = (g.id for g in games)
+    for game_id, name, score in [
+        (game_a, "Alice", 500),
+        (game_a, "Alice", 1500),
+        (game_b, "Alice", 1000),
+        (game_a, "Bob", 100),
+    ]:
+        response = await client.post(f"/games/{game_id}/score", json={"player_name": name, "score": score})
+        assert response.status_code == 201
+    return game_a, game_b
+
+
+async def get_stats(client: AsyncClient, name: str) -> dict:
+    response = await client.get(f"/players/{name}/stats")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_stats_are_maintained_on_submit(client: AsyncClient, db_session: AsyncSession):
+    await setup_games(client, db_session)
+
+    alice = await get_stats(client, "Alice")
+    assert alice["games_played"] == 3
+    assert alice["distinct_games"] == 2
+    assert alice["best"] == 1500
+    assert alice["average"] == 1000.0
+    assert alice["last_played_at"] is not None
+
+    bob = await get_stats(client, "Bob")
+    assert (bob["games_played"], bob["distinct_games"], bob["best"]) == (1, 1, 100)
+
+
+@pytest.mark.asyncio
+async def test_first_attempts_that_cannot_see_each_other_count_once(session_factory):
+    """The (player, game) primary key decides, not the visibility of the other attempt's score."""
+    async with session_factory() as session:
+        player = Player(name="Racer")
+        session.add(player)
+        await session.commit()
+
+    # no score rows at all: like two transactions each blind to the other's uncommitted score
+    for score in (100, 200):
+        async with session_factory() as session:
+            await player_stats.record_score(session, player.id, 1, score, datetime(2026, 10, 19))
+            await session.commit()
+
+    async with session_factory() as session:
+        stats = (await session.execute(select(PlayerStats).where(PlayerStats.player_id == player.id))).scalar_one()
+    assert (stats.games_played, stats.distinct_games, stats.best) == (2, 1, 200)
+
+
+@pytest.mark.asyncio
+async def test_stats_unknown_player(client: AsyncClient):
+    response = await client.get("/players/Nobody/stats")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_incremental_stats(client: AsyncClient, db_session: AsyncSession, session_factory):
+    await setup_games(client, db_session)
+    expected = {name: await get_stats(client, name) for name in ("Alice", "Bob")}
+
+    # corrupt one row and lose the other, then rebuild in small batches
+    async with session_factory() as session:
+        await session.execute(update(PlayerStats).values(games_played=99, best=0))
+        await session.execute(delete(PlayerStats).where(PlayerStats.total_score == 100))
+        await session.commit()
+
+    # and lose the (player, game) pairs: the rebuild restores them
+    async with session_factory() as session:
+        pairs = set((await session.execute(select(PlayerGame.player_id, PlayerGame.game_id))).all())
+        await session.execute(delete(PlayerGame))
+        await session.commit()
+
+    assert await rebuild_all(session_factory, batch_size=1) == 2
+    assert {name: await get_stats(client, name) for name in ("Alice", "Bob")} == expected
+    async with session_factory() as session:
+        assert set((await session.execute(select(PlayerGame.player_id, PlayerGame.game_id))).all()) == pairs
+
+
+@pytest.mark.asyncio
+async def test_delete_game_recomputes_stats(client: AsyncClient, db_session: AsyncSession):
+    game_a, game_b = await setup_games(client, db_session)
+
+    response = await client.delete(f"/admin/games/{game_a}")
+    assert response.status_code == 204
+
+    alice = await get_stats(client, "Alice")
+    assert (alice["games_played"], alice["distinct_games"], alice["best"]) == (1, 1, 1000)
+    # Bob only played the deleted game
+    response = await client.get("/players/Bob/stats")
+    assert response.status_code == 404
@@ -0,0 +1,72 @@
+# tests/test_pool_warmup.py
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db import engine_options
+from app.services.pool_warmup import PoolWarmup, pool_warmup
+
+
+@pytest.fixture
+async def file_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'warm.db'}", pool_size=4)
+    yield engine
+    await engine.dispose()
+
+
+def test_engine_options_size_postgres_pools_only():
+    options = engine_options("postgresql+asyncpg://u:p@db/app")
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_recycle"} <= options.keys()
+    assert "statement_cache_size" in options["connect_args"]
+    assert "pool_size" not in engine_options("sqlite+aiosqlite:///:memory:")
+
+
+@pytest.mark.asyncio
+async def test_warmup_fills_the_pool_and_primes(file_engine):
+    primed = []
+
+    async def prime():
+        primed.append(True)
+
+    warmup = PoolWarmup(connections=3)
+    assert await warmup.run({"primary": file_engine}, prime=prime)
+
+    status = warmup.status()
+    assert status["state"] == "ready"
+    assert status["warmed_connections"] == 3
+    assert status["pools"]["primary"]["checked_in"] == 3
+    assert primed == [True]
+
+
+@pytest.mark.asyncio
+async def test_priming_failure_does_not_fail_warmup(file_engine):
+    async def prime():
+        raise RuntimeError("no tables yet")
+
+    warmup = PoolWarmup(connections=1)
+    assert await warmup.run({"primary": file_engine}, prime=prime)
+    assert warmup.state == "ready"
+
+
+@pytest.mark.asyncio
+async def test_health_is_503_only_while_warmup_fails(client: AsyncClient, tmp_path):
+    assert (await client.get("/health")).json()["pool"]["state"] == "pending"
+
+    missing = tmp_path / "missing"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{missing / 'app.db'}")
+    try:
+        assert not await pool_warmup.run({"primary": engine})
+        response = await client.get("/health")
+        assert response.status_code == 503
+        assert response.json()["pool"]["error"] == "OperationalError"
+
+        # the database becomes reachable: a health check starts a retry in the background
+        # and answers with the current state instead of waiting for it
+        missing.mkdir()
+        assert (await client.get("/health")).status_code == 503
+        await pool_warmup._retry_task
+        response = await client.get("/health")
+        assert response.status_code == 200
+        assert response.json()["pool"]["state"] == "ready"
+    finally:
+        await engine.dispose()
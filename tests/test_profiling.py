@@ -0,0 +1,109 @@
+# tests/test_profiling.py
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.profiling import ProfileStore, Profile, SamplingProfiler
+
+ADMIN_KEY = "sk-test-admin-key"
+ADMIN_HEADERS = {"X-Admin-Key": ADMIN_KEY, "X-Profile": "1"}
+
+
+@pytest.fixture
+def admin_key(monkeypatch):
+    # the middleware checks the key itself (dependency overrides do not apply), against these settings
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", ADMIN_KEY)
+
+
+@pytest.mark.asyncio
+async def test_profiled_request(client: AsyncClient, admin_key):
+    """An admin request with X-Profile: 1 gets a retrievable collapsed-stack profile."""
+    response = await client.get("/games/list", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    profile_id = response.headers["x-profile-id"]
+
+    response = await client.get(f"/admin/profiles/{profile_id}")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for line in response.text.splitlines():
+        stack, count = line.rsplit(" ", 1)
+        assert stack
+        assert int(count) > 0
+
+    response = await client.get("/admin/profiles")
+    assert response.json()[0]["profile_id"] == profile_id
+    assert response.json()[0]["path"] == "/games/list"
+
+
+@pytest.mark.asyncio
+async def test_unprofiled_requests(client: AsyncClient, admin_key):
+    """Requests without the header, or without a valid admin key, are not profiled."""
+    response = await client.get("/health")
+    assert "x-profile-id" not in response.headers
+
+    response = await client.get("/health", headers={"X-Profile": "1", "X-Admin-Key": "wrong"})
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_unknown_profile(client: AsyncClient):
+    response = await client.get("/admin/profiles/missing")
+    assert response.status_code == 404
+
+
+def test_sampling_profiler_collects_stacks():
+    import threading
+    import time
+
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.0005)
+    profiler.start()
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    stacks = profiler.stop()
+
+    assert sum(stacks.values()) > 0
+    assert any("test_sampling_profiler_collects_stacks" in stack for stack in stacks)
+
+
+def test_profile_store_evicts_oldest():
+    store = ProfileStore(max_profiles=2)
+    for i in range(3):
+        store.add(Profile(str(i), "GET", "/", None, 0.0, 0, {}))
+    assert store.get("0") is None
+    assert [p.profile_id for p in store.list()] == ["2", "1"]
+
+
+@pytest.mark.asyncio
+async def test_sampling_profiler_leaves_out_other_tasks():
+    """Concurrent work on the same event loop is not recorded in a request's profile."""
+    import asyncio
+    import sys
+    import threading
+    import time
+
+    def spin(seconds):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            pass
+
+    async def other_work():
+        for _ in range(3):
+            spin(0.02)
+            await asyncio.sleep(0)
+
+    async def profiled_work():
+        profiler = SamplingProfiler(threading.get_ident(), interval=0.0005, root=sys._getframe())
+        profiler.start()
+        other = asyncio.create_task(other_work())
+        for _ in range(3):
+            spin(0.02)
+            await asyncio.sleep(0)
+        await other
+        return profiler.stop(), profiler.skipped
+
+    stacks, skipped = await profiled_work()
+    assert any("profiled_work" in stack for stack in stacks)
+    assert not any("other_work" in stack for stack in stacks)
+    assert skipped > 0
@@ -0,0 +1,168 @@
+# tests/test_query_budgets.py
+"""
+Round-trip budgets for the hot endpoints. A failure here means a change
+added statements to a request path; raise a budget only deliberately.
+"""
+import os
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.routers.scores import submit_statement
+from app.services.question_bank import question_hash
+from tests.mocks import mock_openai, SAMPLE_QUESTIONS, SAMPLE_BONUS_QUESTION
+from tests.test_models import Game, Player, QuestionRecord, Score
+
+BUDGETS = {
+    "get_game": 1,
+    "get_game_question": 1,
+    "game_exists": 1,
+    "list_games": 1,
+    "random_game": 1,
+    "get_leaderboard": 1,
+    "get_game_leaderboard": 1,
+    # one statement of data-modifying CTEs: player insert or lookup, score insert,
+    # day/week rollup upsert, player_games insert, player_stats upsert
+    "submit_score": 1,
+    # near-duplicate index load (first call per worker), hash lookup, game insert,
+    # question bank upsert, game_questions insert
+    "create_game": 5,
+    # bank load (first draw per worker), hash lookup, game insert, game_questions insert
+    "assemble_game": 4,
+    # payload read, near-duplicate index load (first call per worker), game update,
+    # then relink: game_questions delete, bank upsert, insert
+    "update_game": 6,
+    # scores, score summaries, game_questions, game, rollup entries (+ rebuild only when
+    # the game held a bucket best), player_games, player_stats delete + re-aggregate for its players
+    "delete_game": 8,
+}
+
+# SQLite has no data-modifying CTEs, so there the same steps are separate statements
+SQLITE_BUDGETS = {
+    # player insert (+ id lookup for an existing player), score insert,
+    # day/week rollup upsert, player_games insert, player_stats upsert
+    "submit_score": 6,
+}
+
+
+async def _seed(db_session: AsyncSession) -> int:
+    game = Game(
+        questions_json={
+            "questions": [q.model_dump() for q in SAMPLE_QUESTIONS],
+            "bonus_question": SAMPLE_BONUS_QUESTION.model_dump(),
+        },
+        questions_hash="budget_hash",
+    )
+    db_session.add(game)
+    await db_session.flush()
+    player = Player(name="BudgetPlayer")
+    db_session.add(player)
+    await db_session.flush()
+    db_session.add(Score(player_id=player.id, game_id=game.id, score=100))
+    await db_session.commit()
+    return game.id
+
+
+def _assert_budget(name: str, counter) -> None:
+    on_sqlite = os.environ.get("DATABASE_URL", "sqlite").startswith("sqlite")  # as in conftest
+    budget = (SQLITE_BUDGETS if on_sqlite else {}).get(name, BUDGETS[name])
+    assert counter.count <= budget, (
+        f"{name} ran {counter.count} statements (budget {budget}):\n{counter.report()}"
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name, method, path", [
+    ("get_game", "GET", "/games/{id}"),
+    ("get_game_question", "GET", "/games/{id}/questions/0"),
+    ("game_exists", "GET", "/games/{id}/exists"),
+    ("list_games", "GET", "/games/list"),
+    ("random_game", "GET", "/games/random"),
+    ("get_leaderboard", "GET", "/leaderboard/"),
+    ("get_game_leaderboard", "GET", "/games/{id}/leaderboard"),
+    ("delete_game", "DELETE", "/games/{id}"),
+])
+async def test_read_and_delete_budgets(client: AsyncClient, db_session: AsyncSession, count_queries,
+                                       name, method, path):
+    game_id = await _seed(db_session)
+
+    with count_queries() as counter:
+        response = await client.request(method, path.format(id=game_id))
+    assert response.status_code < 300
+    _assert_budget(name, counter)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("player_name", ["BudgetPlayer", "NewPlayer"])
+async def test_submit_score_budget(client: AsyncClient, db_session: AsyncSession, count_queries, player_name):
+    game_id = await _seed(db_session)
+
+    with count_queries() as counter:
+        response = await client.post(f"/games/{game_id}/score", json={"player_name": player_name, "score": 5})
+    assert response.status_code == 201
+    _assert_budget("submit_score", counter)
+
+
+def test_submit_score_is_one_statement_on_postgres():
+    sql = str(submit_statement("Ann", 1, 500, datetime(2026, 10, 19)).compile(dialect=postgresql.dialect()))
+    assert sql.startswith("WITH ")
+    tables = ("players", "scores", "leaderboard_rollups", "player_games", "player_stats")
+    assert [sql.count(f"INSERT INTO {table} ") for table in tables] == [1] * len(tables)
+
+
+@pytest.mark.asyncio
+async def test_create_game_budget(client: AsyncClient, count_queries, mock_openai):
+    with count_queries() as counter:
+        response = await client.post("/games/")
+    assert response.status_code == 200
+    _assert_budget("create_game", counter)
+
+
+@pytest.mark.asyncio
+async def test_assemble_game_budget(client: AsyncClient, db_session: AsyncSession, count_queries):
+    for difficulty in range(1, 16):
+        for category in ("History", "Science", "Sports", "Nature", "Arts", "Geography", "Food", "Tech"):
+            body = SAMPLE_QUESTIONS[0].model_copy(update={"difficulty": difficulty, "category": category,
+                                                          "q": f"{category} {difficulty}?"}).model_dump()
+            db_session.add(QuestionRecord(content_hash=question_hash(body), difficulty=difficulty,
+                                          category=category, body=body))
+    await db_session.commit()
+
+    with count_queries() as counter:
+        response = await client.post("/games/", json={"mode": "assemble"})
+    assert response.status_code == 200
+    _assert_budget("assemble_game", counter)
+
+
+@pytest.mark.asyncio
+async def test_update_game_budget(client: AsyncClient, db_session: AsyncSession, count_queries):
+    game_id = await _seed(db_session)
+    ai_result = (SAMPLE_QUESTIONS, SAMPLE_BONUS_QUESTION, "updated_hash")
+
+    with patch("app.routers.games.update_game_questions", AsyncMock(return_value=ai_result)):
+        with count_queries() as counter:
+            response = await client.put(f"/games/{game_id}", json={"prompt": "make it harder"})
+    assert response.status_code == 200
+    _assert_budget("update_game", counter)
+
+
+@pytest.mark.asyncio
+async def test_submit_score_unknown_game_leaves_no_player(client: AsyncClient, db_session: AsyncSession):
+    """The player upsert is rolled back when the game does not exist."""
+    from sqlalchemy import select
+
+    response = await client.post("/games/999/score", json={"player_name": "Ghost", "score": 1})
+    assert response.status_code == 404
+
+    result = await db_session.execute(select(Player).where(Player.name == "Ghost"))
+    assert result.scalars().first() is None
+
+
+@pytest.mark.asyncio
+async def test_delete_unknown_game(client: AsyncClient):
+    response = await client.delete("/games/999")
+    assert response.status_code == 404
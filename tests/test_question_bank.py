@@ -0,0 +1,101 @@
+# tests/test_question_bank.py
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.question_bank import question_hash, split_payload
+from tests.mocks import mock_openai, MOCK_OPENAI_RESPONSE
+from tests.test_models import Game, GameQuestion, QuestionRecord
+
+MIGRATION = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "b81f4c6e2d57_add_question_bank.py"
+
+
+def load_migration():
+    spec = importlib.util.spec_from_file_location("question_bank_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+async def count(session_factory, model) -> int:
+    async with session_factory() as session:
+        return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+def test_split_payload_orders_slots_and_dedupes():
+    payload = dict(MOCK_OPENAI_RESPONSE)
+    payload["questions"] = payload["questions"] + [payload["questions"][0]]
+    questions, links = split_payload(7, payload)
+
+    assert len(questions) == len(MOCK_OPENAI_RESPONSE["questions"]) + 1  # + bonus, repeat stored once
+    assert [link["slot"] for link in links] == list(range(len(links)))
+    assert links[-1]["is_bonus"] and not any(link["is_bonus"] for link in links[:-1])
+    assert links[0]["question_hash"] == links[-2]["question_hash"] == question_hash(payload["questions"][0])
+
+
+def test_migration_split_matches_the_app():
+    # the migration carries a frozen copy; bank keys must stay the ones the app computes
+    payload = dict(MOCK_OPENAI_RESPONSE)
+    assert load_migration().split_payload(3, payload) == split_payload(3, payload)
+
+
+@pytest.mark.asyncio
+async def test_new_games_are_stored_in_the_bank(client: AsyncClient, mock_openai, session_factory):
+    created = await client.post("/games/")
+    assert created.status_code == 200
+    game_id = created.json()["game_id"]
+
+    async with session_factory() as session:
+        blob = (await session.execute(select(Game.questions_json).where(Game.id == game_id))).scalar_one()
+    assert blob is None
+    total = len(MOCK_OPENAI_RESPONSE["questions"]) + 1
+    assert await count(session_factory, QuestionRecord) == total
+    assert await count(session_factory, GameQuestion) == total
+
+    fetched = await client.get(f"/games/{game_id}")
+    assert fetched.content == created.content
+
+
+@pytest.mark.asyncio
+async def test_shared_questions_are_stored_once(client: AsyncClient, mock_openai, session_factory):
+    first = (await client.post("/games/")).json()["game_id"]
+    # same questions, reworded bonus: a different game sharing 15 questions
+    changed = dict(MOCK_OPENAI_RESPONSE, bonus_question=dict(MOCK_OPENAI_RESPONSE["bonus_question"], q="Other?"))
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = json.dumps(changed)
+    second = (await client.post("/games/")).json()["game_id"]
+    assert first != second
+
+    questions = len(MOCK_OPENAI_RESPONSE["questions"])
+    assert await count(session_factory, QuestionRecord) == questions + 2
+    assert await count(session_factory, GameQuestion) == 2 * (questions + 1)
+
+
+@pytest.mark.asyncio
+async def test_migration_keeps_game_output_identical(client: AsyncClient, db_session: AsyncSession,
+                                                     session_factory):
+    legacy = [
+        Game(questions_json=MOCK_OPENAI_RESPONSE, questions_hash="legacy_1"),
+        Game(questions_json=dict(MOCK_OPENAI_RESPONSE, bonus_question=None), questions_hash="legacy_2"),
+        Game(questions_json=MOCK_OPENAI_RESPONSE, questions_hash="legacy_3"),
+        Game(questions_json={"test": "data"}, questions_hash="not_a_game"),
+    ]
+    db_session.add_all(legacy)
+    await db_session.commit()
+    ids = [g.id for g in legacy[:3]]
+    before = [(await client.get(f"/games/{i}")).content for i in ids]
+
+    migration = load_migration()
+    async with session_factory() as session:
+        await session.run_sync(lambda s: migration.split_legacy_games(s.connection(), batch_size=2))
+        await session.commit()
+
+    assert [(await client.get(f"/games/{i}")).content for i in ids] == before
+    async with session_factory() as session:
+        blobs = dict((await session.execute(select(Game.questions_hash, Game.questions_json))).all())
+    assert blobs == {"legacy_1": None, "legacy_2": None, "legacy_3": None, "not_a_game": {"test": "data"}}
+    assert await count(session_factory, QuestionRecord) == len(MOCK_OPENAI_RESPONSE["questions"]) + 1
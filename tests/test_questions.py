@@ -1,9 +1,15 @@
 # tests/test_questions.py
 import pytest
 import json
+import orjson
 import hashlib
+from fastapi import HTTPException
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
 from app.services.questions import generate_questions
 from tests.mocks import mock_openai, SAMPLE_QUESTIONS
+from tests.test_models import Game
 
 
 @pytest.mark.asyncio
@@ -22,3 +28,51 @@ async def test_generate_questions(mock_openai):
     }
     expected_hash = hashlib.sha256(json.dumps(game_data, sort_keys=True).encode()).hexdigest()
     assert questions_hash == expected_hash
+
+
+@pytest.mark.asyncio
+async def test_schema_errors_are_reported_as_such(mock_openai):
+    """Valid JSON that does not match the schema is not an invalid-JSON error."""
+    mock_openai.chat.completions.create.return_value.choices[0].message.content = (
+        orjson.dumps({"questions": [{"q": "no answers"}]}).decode()
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        await generate_questions()
+    assert excinfo.value.status_code == 502
+    assert "schema" in excinfo.value.detail
+
+
+@pytest.mark.asyncio
+async def test_game_response_is_the_canonical_encoding(client: AsyncClient, mock_openai):
+    """The body served is the sorted-key orjson encoding of the payload, plus the game id."""
+    response = await client.post("/games/")
+    assert response.headers["content-type"] == "application/json"
+    game_id = response.json()["game_id"]
+
+    questions, bonus_question, _ = await generate_questions()
+    payload = {
+        "questions": [q.model_dump() for q in questions],
+        "bonus_question": bonus_question.model_dump(),
+    }
+    assert response.content == b'{"game_id":%d,' % game_id + orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)[1:]
+
+
+@pytest.mark.asyncio
+async def test_games_stored_before_orjson_are_still_duplicates(client: AsyncClient, mock_openai, session_factory):
+    """A game hashed with json.dumps(sort_keys=True) before the orjson switch is found again, not re-inserted."""
+    questions, bonus_question, _ = await generate_questions()
+    payload = {
+        "questions": [q.model_dump() for q in questions],
+        "bonus_question": bonus_question.model_dump(),
+    }
+    async with session_factory() as session:
+        stored = Game(questions_json=payload,
+                      questions_hash=hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest())
+        session.add(stored)
+        await session.commit()
+
+    response = await client.post("/games/")
+    assert response.json()["game_id"] == stored.id
+    async with session_factory() as session:
+        assert (await session.execute(select(func.count()).select_from(Game))).scalar_one() == 1
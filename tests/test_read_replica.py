@@ -0,0 +1,90 @@
+# tests/test_read_replica.py
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.deps import PRIMARY_READS_COOKIE, get_db, get_read_db, make_read_db, primary_reads_cookie
+from app.main import app
+from scripts._db import sample_game_payload
+from tests.mocks import mock_openai
+from tests.test_models import BaseTest, Game
+
+
+@pytest.fixture
+async def primary_and_replica(tmp_path):
+    """Two SQLite files standing in for a primary and a replica that never catches up."""
+    engines = [create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}.db") for name in ("primary", "replica")]
+    for engine in engines:
+        async with engine.begin() as conn:
+            await conn.run_sync(BaseTest.metadata.create_all)
+    primary, replica = (async_sessionmaker(bind=e, expire_on_commit=False, class_=AsyncSession) for e in engines)
+
+    async def primary_db():
+        async with primary() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    previous_overrides = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = primary_db
+    app.dependency_overrides[get_read_db] = make_read_db(primary, replica)
+    try:
+        yield primary, replica
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous_overrides)
+        for engine in engines:
+            await engine.dispose()
+
+
+async def new_client() -> AsyncClient:
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver")
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_the_replica(primary_and_replica):
+    _, replica = primary_and_replica
+    async with replica() as session:
+        session.add(Game(questions_json=sample_game_payload(1), questions_hash="replica_only"))
+        await session.commit()
+
+    async with await new_client() as client:
+        listed = (await client.get("/games/list")).json()
+        assert len(listed) == 1
+        game_id = listed[0]["game_id"]
+        assert (await client.get(f"/games/{game_id}/exists")).json() == {"exists": True}
+        assert (await client.get(f"/games/{game_id}")).status_code == 200
+        assert (await client.get("/leaderboard/")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_admin_writes_read_their_own_writes(primary_and_replica, mock_openai):
+    async with await new_client() as admin:
+        created = await admin.post("/games/")
+        assert created.status_code == 200
+        assert PRIMARY_READS_COOKIE in created.cookies
+        game_id = created.json()["game_id"]
+
+        # the replica has not caught up, but the admin's reads are pinned to the primary
+        assert (await admin.get(f"/games/{game_id}")).status_code == 200
+        assert (await admin.get(f"/games/{game_id}/exists")).json() == {"exists": True}
+
+        # once the window has passed, reads go back to the (lagging) replica
+        admin.cookies.set(PRIMARY_READS_COOKIE, primary_reads_cookie(time.time() - 1))
+        assert (await admin.get(f"/games/{game_id}/exists")).json() == {"exists": False}
+
+    async with await new_client() as player:
+        assert (await player.get(f"/games/{game_id}")).status_code == 404
+        # forged pins (unsigned, or signed for another time) are ignored
+        for forged in ("not-a-time", f"{time.time() + 3600:.3f}",
+                       primary_reads_cookie(time.time() - 1).replace(".", "9.", 1)):
+            player.cookies.set(PRIMARY_READS_COOKIE, forged)
+            assert (await player.get(f"/games/{game_id}")).status_code == 404
+
+        # single questions are cached for minutes: always read from the primary
+        assert (await player.get(f"/games/{game_id}/questions/0")).status_code == 200
@@ -0,0 +1,36 @@
+# tests/test_seed_scale.py
+import random
+from collections import Counter
+
+from scripts.seed_scale import PRIZE_LADDER, ScoreGenerator, parse_count
+
+
+def test_parse_count():
+    assert parse_count("250") == 250
+    assert parse_count("10k") == 10_000
+    assert parse_count("1.5M") == 1_500_000
+    assert parse_count("20_000") == 20_000
+
+
+def test_score_generator_is_skewed():
+    generator = ScoreGenerator(
+        player_ids=range(1, 1001), game_ids=range(1, 51),
+        player_skew=1.1, game_skew=0.8, survival=0.8, days=30, rng=random.Random(7),
+    )
+    rows = generator.batch(20_000)
+
+    assert len(rows) == 20_000
+    assert all(score in PRIZE_LADDER for _, _, score, _ in rows)
+
+    # heavy-tailed activity: the busiest 1% of players own a large share of attempts
+    activity = Counter(player for player, _, _, _ in rows)
+    top = sum(count for _, count in activity.most_common(10))
+    assert top > 0.2 * len(rows)
+
+    # most runs bust early, so low tiers dominate
+    tiers = Counter(score for _, _, score, _ in rows)
+    assert tiers[0] > tiers[1_000_000]
+
+    # played_at stays within the configured window
+    oldest = min(played_at for _, _, _, played_at in rows)
+    assert (generator.now - oldest).days <= 31
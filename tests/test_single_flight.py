@@ -0,0 +1,78 @@
+# tests/test_single_flight.py
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from app.services.single_flight import SingleFlight, single_flight
+from tests.test_models import Game
+
+BURST = 100
+
+
+async def seed_game(session_factory) -> int:
+    async with session_factory() as session:
+        game = Game(questions_json={"questions": [], "bonus_question": None}, questions_hash="flight_game")
+        session.add(game)
+        await session.commit()
+        return game.id
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_load():
+    flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"rows": calls}
+
+    results = await asyncio.gather(*(flight.do("key", load) for _ in range(10)))
+    assert calls == 1
+    assert all(r is results[0] for r in results)
+    assert flight.stats() == {"leaders": 1, "followers": 9, "in_flight": 0}
+
+    # nothing is kept: the next call loads again
+    assert (await flight.do("key", load)) == {"rows": 2}
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_cancelled_leaders_are_replaced():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "done"
+
+    leader = asyncio.create_task(flight.do("slow", slow))
+    await started.wait()
+    follower = asyncio.create_task(flight.do("slow", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == "done"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/games/{id}", "/leaderboard/?limit=10", "/games/{id}/leaderboard"])
+async def test_burst_of_identical_reads_runs_one_query(client: AsyncClient, session_factory, count_queries, path):
+    game_id = await seed_game(session_factory)
+    url = path.format(id=game_id)
+
+    with count_queries() as counter:
+        responses = await asyncio.gather(*(client.get(url) for _ in range(BURST)))
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.content for r in responses}) == 1
+    assert counter.count == 1, counter.report()
+    assert single_flight.stats()["followers"] == BURST - 1
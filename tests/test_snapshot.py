@@ -0,0 +1,117 @@
+# tests/test_snapshot.py
+import time
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+
+from app.deps import PRIMARY_READS_COOKIE, primary_reads_cookie
+from app.routers.leaderboard import build_leaderboard_query
+from app.services.snapshot import SharedSnapshot, encode_snapshot, shared_snapshot
+from tests.test_models import Game
+
+ENTRIES = [
+    {"player_id": 2, "player": "Zoë", "best": 8000, "game_id": 7, "played_at": datetime(2026, 10, 1, 12, 30, 0, 123456)},
+    {"player_id": 1, "player": "Al", "best": 500, "game_id": 3, "played_at": None},
+]
+
+
+def write(path, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def reader(path) -> SharedSnapshot:
+    return SharedSnapshot(path=str(path), check_interval=0)
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / "snap.bin"
+    write(path, encode_snapshot([3, 7, 11], ENTRIES, capacity=2))
+    snap = reader(path)
+
+    assert [snap.has_game(g) for g in (3, 7, 11, 5, 12)] == [True, True, True, False, False]
+    assert snap.leaderboard(2) == ENTRIES
+    assert snap.leaderboard(1) == ENTRIES[:1]
+    # a full snapshot cannot answer for more entries than it holds
+    assert snap.leaderboard(3) is None
+    assert snap.random_game_id() in {3, 7, 11}
+
+    snap.forget_game(7)
+    assert snap.has_game(7) is False
+
+
+def test_missing_stale_or_foreign_snapshots_are_not_used(tmp_path):
+    path = tmp_path / "snap.bin"
+    snap = reader(path)
+    assert snap.has_game(1) is None
+
+    write(path, encode_snapshot([1], [], capacity=10, built_at=time.time() - 3600))
+    assert snap.has_game(1) is None
+    assert snap.leaderboard(10) is None
+
+    write(path, b"not a snapshot at all, just some bytes of the wrong kind")
+    assert snap.has_game(1) is None
+
+
+def test_only_one_refresher_is_elected(tmp_path):
+    first, second = reader(tmp_path / "snap.bin"), reader(tmp_path / "snap.bin")
+    assert first.try_elect()
+    assert not second.try_elect()
+    first.resign()
+    assert second.try_elect()
+    second.resign()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_is_seen_by_every_reader(tmp_path, session_factory):
+    path = tmp_path / "snap.bin"
+    refresher, other_worker = reader(path), reader(path)
+    refresher.session_factory = session_factory
+
+    async with session_factory() as session:
+        session.add(Game(questions_json={"questions": []}, questions_hash="snap_1"))
+        await session.commit()
+    assert await refresher.run_once(build_leaderboard_query)
+    assert other_worker.has_game(1) and not other_worker.has_game(2)
+    assert other_worker.leaderboard(10) == []
+
+    async with session_factory() as session:
+        session.add(Game(questions_json={"questions": []}, questions_hash="snap_2"))
+        await session.commit()
+    assert await refresher.run_once(build_leaderboard_query)
+    assert other_worker.has_game(2)
+    refresher.resign()
+
+
+@pytest.mark.asyncio
+async def test_routes_read_the_shared_snapshot(client: AsyncClient, session_factory, count_queries,
+                                               monkeypatch, tmp_path):
+    async with session_factory() as session:
+        game = Game(questions_json={"questions": []}, questions_hash="snap_routes")
+        session.add(game)
+        await session.commit()
+    for name, score in (("Alice", 500), ("Bob", 2000)):
+        await client.post(f"/games/{game.id}/score", json={"player_name": name, "score": score})
+    from_db = (await client.get("/leaderboard/")).json()
+
+    monkeypatch.setattr(shared_snapshot, "path", str(tmp_path / "snap.bin"))
+    monkeypatch.setattr(shared_snapshot, "check_interval", 0)
+    async with session_factory() as session:
+        await shared_snapshot.rebuild(session, build_leaderboard_query)
+
+    with count_queries() as counter:
+        assert (await client.get(f"/games/{game.id}/exists")).json() == {"exists": True}
+        assert (await client.get("/leaderboard/")).json() == from_db
+    assert counter.count == 0
+
+    # pinned to the primary after a write: the leaderboard comes from the database
+    client.cookies.set(PRIMARY_READS_COOKIE, primary_reads_cookie(time.time() + 5))
+    with count_queries() as counter:
+        assert (await client.get("/leaderboard/")).json() == from_db
+    assert counter.count == 1
+    client.cookies.clear()
+
+    # deleted here: gone at once, without waiting for the next rebuild
+    assert (await client.delete(f"/games/{game.id}")).status_code == 204
+    assert (await client.get(f"/games/{game.id}/exists")).json() == {"exists": False}
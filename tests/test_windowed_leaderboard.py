@@ -0,0 +1,119 @@
+# tests/test_windowed_leaderboard.py
+from datetime import date, datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.rollups import bucket_start, prune_buckets, utcnow
+from tests.test_models import Game, LeaderboardRollup, Player
+
+
+async def create_games(db_session: AsyncSession, n: int = 2, commit: bool = True):
+    games = [Game(questions_json={"questions": []}, questions_hash=f"window_{i}") for i in range(n)]
+    db_session.add_all(games)
+    await db_session.flush()
+    if commit:
+        await db_session.commit()
+    return [g.id for g in games]
+
+
+async def submit(client: AsyncClient, game_id: int, name: str, score: int):
+    response = await client.post(f"/games/{game_id}/score", json={"player_name": name, "score": score})
+    assert response.status_code == 201
+
+
+def test_bucket_start():
+    wednesday = datetime(2026, 10, 14, 23, 59)
+    assert bucket_start("day", wednesday) == date(2026, 10, 14)
+    assert bucket_start("week", wednesday) == date(2026, 10, 12)
+    assert bucket_start("week", datetime(2026, 10, 12)) == date(2026, 10, 12)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("window", ["day", "week"])
+async def test_window_keeps_best_per_player(client: AsyncClient, db_session: AsyncSession, window):
+    game_a, game_b = await create_games(db_session)
+    await submit(client, game_a, "Alice", 500)
+    await submit(client, game_b, "Alice", 2000)
+    await submit(client, game_a, "Alice", 1000)
+    await submit(client, game_a, "Bob", 2000)
+    await submit(client, game_b, "Bob", 2000)  # tie: the earlier attempt stays
+
+    response = await client.get(f"/leaderboard/?window={window}")
+    assert response.status_code == 200
+    data = response.json()
+    assert [(e["player"], e["best"], e["game_id"]) for e in data] == [
+        ("Alice", 2000, game_b),
+        ("Bob", 2000, game_a),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_window_ignores_older_buckets(client: AsyncClient, db_session: AsyncSession):
+    (game_id,) = await create_games(db_session, 1, commit=False)
+
+    # a big score from a bucket two weeks ago must not leak into this week
+    old = utcnow() - timedelta(days=14)
+    bob = Player(name="Bob")
+    db_session.add(bob)
+    await db_session.flush()
+    db_session.add_all([
+        LeaderboardRollup(period=period, bucket_start=bucket_start(period, old), player_id=bob.id,
+                          best=1_000_000, game_id=game_id, played_at=old)
+        for period in ("day", "week")
+    ])
+    await db_session.commit()
+    await submit(client, game_id, "Alice", 100)
+
+    for window in ("day", "week"):
+        data = (await client.get(f"/leaderboard/?window={window}")).json()
+        assert [e["player"] for e in data] == ["Alice"]
+
+    # all-time still reads the raw scores
+    data = (await client.get("/leaderboard/?window=all")).json()
+    assert [e["player"] for e in data] == ["Alice"]
+
+
+@pytest.mark.asyncio
+async def test_delete_game_rebuilds_buckets(client: AsyncClient, db_session: AsyncSession):
+    game_a, game_b = await create_games(db_session)
+    await submit(client, game_a, "Alice", 300)
+    await submit(client, game_b, "Alice", 9000)
+    await submit(client, game_b, "Bob", 50)
+
+    response = await client.delete(f"/admin/games/{game_b}")
+    assert response.status_code == 204
+
+    for window in ("day", "week"):
+        data = (await client.get(f"/leaderboard/?window={window}")).json()
+        assert [(e["player"], e["best"], e["game_id"]) for e in data] == [("Alice", 300, game_a)]
+
+
+@pytest.mark.asyncio
+async def test_prune_drops_buckets_older_than_a_week(client: AsyncClient, db_session: AsyncSession, session_factory):
+    (game_id,) = await create_games(db_session, 1, commit=False)
+    bob = Player(name="Bob")
+    db_session.add(bob)
+    await db_session.flush()
+    old = utcnow() - timedelta(days=14)
+    db_session.add_all([
+        LeaderboardRollup(period=period, bucket_start=bucket_start(period, old), player_id=bob.id,
+                          best=1, game_id=game_id, played_at=old)
+        for period in ("day", "week")
+    ])
+    await db_session.commit()
+    await submit(client, game_id, "Alice", 100)
+
+    async with session_factory() as session:
+        assert await prune_buckets(session) == 2
+        await session.commit()
+        kept = (await session.execute(select(LeaderboardRollup.period, LeaderboardRollup.bucket_start))).all()
+    assert sorted(kept) == sorted((p, bucket_start(p, utcnow())) for p in ("day", "week"))
+
+
+@pytest.mark.asyncio
+async def test_invalid_window(client: AsyncClient):
+    response = await client.get("/leaderboard/?window=month")
+    assert response.status_code == 422